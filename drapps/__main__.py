@@ -6,23 +6,54 @@
 #  This is proprietary source code of DataRobot, Inc. and its affiliates.
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
+from pathlib import Path
+from typing import Optional
+
+import click
 from click import Group
 
 from drapps.create import create
 from drapps.env import create_env
 from drapps.externalshare import external_share
+from drapps.helpers.http_trace import start_trace, stop_trace
 from drapps.logs import logs
 from drapps.ls import ls
 from drapps.publish import publish, revert_publish
 from drapps.terminate import terminate
 
+
+def print_trace_summary() -> None:
+    trace = stop_trace()
+    if trace is not None:
+        click.echo(trace.get_summary(), err=True)
+
+
+def setup_trace(trace: Optional[Path]) -> None:
+    """Start recording of API requests, summary is printed even if command fails."""
+    if trace is None:
+        return
+    start_trace(trace)
+    click.get_current_context().call_on_close(print_trace_summary)
+
+
 help_text = (
     'CLI tools for custom applications.\n\n'
     'You can use drapps COMMAND --help for getting more info about command.'
 )
+trace_option = click.Option(
+    ['--trace'],
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    default=None,
+    help=(
+        'Write every API request (method, endpoint, status, bytes, latency, retries) '
+        'as JSON line to this file and print summary per endpoint at the end.'
+    ),
+)
 drapps = Group(
     commands=[create, ls, logs, terminate, create_env, publish, revert_publish, external_share],
     help=help_text,
+    params=[trace_option],
+    callback=setup_trace,
 )
 
 if __name__ == "__main__":
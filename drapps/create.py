@@ -5,26 +5,49 @@
 #  This is proprietary source code of DataRobot, Inc. and its affiliates.
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
-from itertools import islice, repeat
+import io
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from itertools import repeat
 from pathlib import Path
-from time import sleep
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from time import monotonic, sleep
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 import click
 from bson import ObjectId
 from click._termui_impl import ProgressBar
-from requests import Session
-from requests_toolbelt import MultipartEncoderMonitor
+from requests import (
+    ConnectionError as RequestsConnectionError,
+    ConnectTimeout,
+    RequestException,
+    Session,
+)
+from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
+from tabulate import tabulate
+from urllib3.exceptions import NewConnectionError
 
-from .helpers.app_projects_functions import check_project, get_io_stream, get_project_files_list
+from .helpers.api_session import POOL_MAXSIZE, create_api_session
+from .helpers.app_projects_functions import (
+    LazyFileReader,
+    check_project,
+    get_project_files_list,
+    iter_project_archive,
+)
 from .helpers.custom_app_sources_functions import (
+    CPU_SIZES,
     create_application_source_version,
     create_custom_app_source,
-    get_custom_app_source_by_name,
-    get_custom_app_source_versions_list,
-    update_application_source_version,
+    get_custom_app_source,
+    get_custom_app_source_version_by_id,
+    get_custom_app_source_versions_count,
+    get_resources_payload,
+    get_runtime_params_payload,
+    is_custom_app_source_version_present,
+    update_application_source_version_multipart,
     update_resources,
     update_runtime_params,
+    upload_application_source_version_archive,
 )
 from .helpers.custom_apps_functions import (
     FINAL_STATUSES,
@@ -34,22 +57,68 @@ from .helpers.custom_apps_functions import (
     get_custom_app_logs,
     is_app_name_in_use,
 )
-from .helpers.exceptions import ClientResponseError
+from .helpers.deploy_manifest_functions import AppSpec, read_deploy_manifest
+from .helpers.exceptions import ClientResponseError, PollingTimeoutError
 from .helpers.execution_environments_functions import (
     IMAGE_BUILD_FAILED_STATUSES,
     IMAGE_BUILD_FINAL_STATUSES,
+    BuildLogTail,
     create_execution_environment,
     create_execution_environment_version,
-    get_execution_environment_by_id,
-    get_execution_environment_by_name,
+    get_execution_environment,
     get_execution_environment_version_buildlog,
     get_execution_environment_version_by_id,
 )
-from .helpers.runtime_params_functions import verify_runtime_env_vars
-from .helpers.wrappers import api_endpoint, api_token
+from .helpers.metadata_cache import (
+    ENV_ID,
+    ENV_LATEST_VERSION_ID,
+    forget_cached,
+    get_cached,
+    set_cached,
+)
+from .helpers.poller import poll_until
+from .helpers.project_index import ProjectIndex
+from .helpers.runtime_params_functions import get_reset_runtime_params, verify_runtime_env_vars
+from .helpers.source_manifest_functions import (
+    SourceManifest,
+    diff_manifest_files,
+    get_project_digests,
+    load_source_manifest,
+    save_source_manifest,
+)
+from .helpers.upload_journal_functions import (
+    UploadJournal,
+    load_upload_journal,
+    remove_upload_journal,
+    save_upload_journal,
+)
+from .helpers.wrappers import api_endpoint, api_token, build_abort_patterns
 
-UPLOAD_CHUNK_SIZE = 50
+UPLOAD_CHUNK_MAX_FILES = 50
+UPLOAD_CHUNK_MAX_BYTES = 8 * 1024 * 1024
+UPLOAD_CONCURRENCY = 4
+UPLOAD_RETRIES = 3
+UPLOAD_RETRY_WAIT_TIME = 2
+# responses meaning that server doesn't know how to handle archive field
+ARCHIVE_NOT_SUPPORTED_STATUSES = {400, 415, 422}
+# responses meaning that request was refused without processing, so even request that
+# deletes files or changes version settings can be sent again
+NOT_PROCESSED_STATUSES = {429, 503}
+# responses meaning that server doesn't accept version settings together with files
+FINALIZE_MERGE_REJECTED_STATUSES = {400, 422}
+# responses meaning that server can't decode compressed request body
+COMPRESSION_REJECTED_STATUSES = {415}
+# upper limit of interval between status checks
 CHECK_STATUS_WAIT_TIME = 5
+# lower limit of interval between build log downloads, the whole log is sent every time
+BUILD_LOG_WAIT_TIME = 30
+IMAGE_BUILD_TIMEOUT = 2500
+APP_START_TIMEOUT = 3600
+DEPLOY_PARALLELISM = 4
+# name check, environment and application source lookups
+PREFLIGHT_CONCURRENCY = 3
+# statuses of applications from deploy manifest, that are deployed successfully
+DEPLOY_SUCCESS_STATUSES = SUCCESS_STATUSES | {'CREATED'}
 
 
 def validate_parameters(
@@ -84,11 +153,27 @@ def validate_parameters(
 
 
 def get_base_env_version(session: Session, endpoint: str, base_env: str) -> str:
+    """
+    Get ID of the latest version of environment, it is cached for a short time.
+    Cached version is used only if it still exists.
+    """
+    version_id = get_cached(session, endpoint, ENV_LATEST_VERSION_ID, base_env)
+    if ObjectId.is_valid(base_env):
+        env_id: Optional[str] = base_env
+    else:
+        env_id = get_cached(session, endpoint, ENV_ID, base_env)
+    if version_id and env_id:
+        try:
+            get_execution_environment_version_by_id(session, endpoint, env_id, version_id)
+            return version_id
+        except ClientResponseError as error:
+            if error.status != 404:
+                raise
+    if version_id:
+        forget_cached(session, endpoint, ENV_LATEST_VERSION_ID, name=base_env)
+
     try:
-        if ObjectId.is_valid(base_env):
-            env = get_execution_environment_by_id(session, endpoint, base_env)
-        else:
-            env = get_execution_environment_by_name(session, endpoint, base_env)
+        env = get_execution_environment(session, endpoint, base_env)
     except ClientResponseError as error:
         if error.status != 404:
             raise error
@@ -99,6 +184,7 @@ def get_base_env_version(session: Session, endpoint: str, base_env: str) -> str:
         message = f"Can't find last version for environment {base_env}."
         raise click.BadParameter(message, param_hint='--base-env')
 
+    set_cached(session, endpoint, ENV_LATEST_VERSION_ID, base_env, env['latestVersion']['id'])
     return env['latestVersion']['id']
 
 
@@ -138,35 +224,172 @@ def get_runtime_params(
     return runtime_params
 
 
-def create_new_custom_app_source_version(
-    session: Session,
-    endpoint: str,
-    source_name: str,
-) -> Tuple[str, str]:
+def find_custom_app_source(
+    session: Session, endpoint: str, source_name: str
+) -> Tuple[Optional[Dict[str, Any]], int]:
+    """
+    Find application source by name and number of its versions.
+    Returns None if source doesn't exist.
+    """
     try:
-        app_source = get_custom_app_source_by_name(session, endpoint, source_name)
-        versions = get_custom_app_source_versions_list(session, endpoint, app_source['id'])
-        version_count = len(versions)
+        app_source = get_custom_app_source(session, endpoint, source_name)
     except ClientResponseError as error:
         if error.status != 404:
             raise error
+        return None, 0
+    return app_source, get_custom_app_source_versions_count(session, endpoint, app_source['id'])
+
+
+def create_new_custom_app_source_version(
+    session: Session,
+    endpoint: str,
+    source_name: str,
+    app_source: Optional[Dict[str, Any]],
+    version_count: int,
+) -> Tuple[str, str, Optional[SourceManifest]]:
+    """
+    Create new version for application source, source is created if it doesn't exist yet.
+    If files of one of existing versions are known from previous uploads, new version
+    is based on it and manifest of that version is returned.
+    """
+    base_manifest = None
+    if app_source:
+        manifest = load_source_manifest(app_source['id'])
+        if manifest and is_custom_app_source_version_present(
+            session, endpoint, app_source['id'], manifest.version_id
+        ):
+            base_manifest = manifest
+    else:
         # create a new app source if we can't find existing
         app_source = create_custom_app_source(session, endpoint, source_name)
-        version_count = 0
 
     click.echo(f'Using {source_name} custom application source.')
-    version_label = f'v{version_count +1 }'
+    version_label = f'v{version_count + 1}'
     new_version = create_application_source_version(
-        session, endpoint, app_source['id'], version_label
+        session,
+        endpoint,
+        app_source['id'],
+        version_label,
+        base_version_id=base_manifest.version_id if base_manifest else None,
     )
     click.echo(f'Creating new version for {source_name} custom application source.')
-    return app_source['id'], new_version['id']
+    return app_source['id'], new_version['id'], base_manifest
+
+
+def find_interrupted_upload(
+    session: Session, endpoint: str, app_source: Optional[Dict[str, Any]], project: Path
+) -> Optional[UploadJournal]:
+    """Find journal of unfinished upload of the project, which version still exists."""
+    if not app_source:
+        return None
+    journal = load_upload_journal(app_source['id'])
+    if journal is None or journal.project != str(project):
+        return None
+    if not is_custom_app_source_version_present(
+        session, endpoint, journal.source_id, journal.version_id
+    ):
+        return None
+    return journal
+
+
+def plan_upload_chunks(
+    project_files: List[Tuple[Path, str]], max_chunk_bytes: int, max_chunk_files: int
+) -> List[Tuple[Tuple[Path, str], ...]]:
+    """
+    Pack project files into upload chunks, so every chunk has at most max_chunk_files files
+    and max_chunk_bytes bytes. Files bigger than max_chunk_bytes are uploaded one per chunk.
+    """
+    chunks: List[Tuple[Tuple[Path, str], ...]] = []
+    chunk: List[Tuple[Path, str]] = []
+    chunk_bytes = 0
+    for file_tuple in project_files:
+        file_size = file_tuple[0].stat().st_size
+        if file_size >= max_chunk_bytes:
+            chunks.append((file_tuple,))
+            continue
+        if chunk and (chunk_bytes + file_size > max_chunk_bytes or len(chunk) >= max_chunk_files):
+            chunks.append(tuple(chunk))
+            chunk, chunk_bytes = [], 0
+        chunk.append(file_tuple)
+        chunk_bytes += file_size
+    if chunk:
+        chunks.append(tuple(chunk))
+    return chunks
+
+
+class ProjectScan(NamedTuple):
+    """Result of local project folder processing."""
+
+    files: List[Tuple[Path, str]]
+    digests: Dict[str, str]
+    runtime_params: List[str]
+
 
+class Preflight(NamedTuple):
+    """Everything needed before application source version is created."""
 
-def split_list_into_chunks(iterable: List[Any], chunk_size: int) -> Iterator[Tuple[Any, ...]]:
-    """Generator that splits a list into chunks of specified size."""
-    iterator = iter(iterable)
-    return iter(lambda: tuple(islice(iterator, chunk_size)), ())
+    base_env_version_id: str
+    app_source: Optional[Dict[str, Any]]
+    version_count: int
+    project_scan: ProjectScan
+
+
+def scan_project(project: Path, runtime_params: List[Dict]) -> ProjectScan:
+    """List project files, get their digests and validate runtime params with metadata.yaml."""
+    project_index = ProjectIndex.load(project)
+    project_files = get_project_files_list(project, ignore_cache=project_index.ignored)
+    project_digests = get_project_digests(project_files, index=project_index)
+    project_index.save()
+
+    metadata_file = extract_metadata_yaml(project_files)
+    valid_runtime_params = []
+    if metadata_file and runtime_params:
+        valid_runtime_params = verify_runtime_env_vars(metadata_file, runtime_params)
+    return ProjectScan(project_files, project_digests, valid_runtime_params)
+
+
+def run_preflight(
+    session: Session,
+    endpoint: str,
+    app_name: str,
+    base_env: str,
+    project: Path,
+    runtime_params: List[Dict],
+    base_env_version_id: Optional[str] = None,
+) -> Preflight:
+    """
+    Run independent checks and lookups before deploy. API requests are sent at the same
+    time, while local project folder is processed in current thread.
+    """
+    with ThreadPoolExecutor(max_workers=PREFLIGHT_CONCURRENCY) as executor:
+        name_check = executor.submit(is_app_name_in_use, session, endpoint, app_name)
+        base_env_lookup = None
+        if not base_env_version_id:
+            base_env_lookup = executor.submit(get_base_env_version, session, endpoint, base_env)
+        source_lookup = executor.submit(
+            find_custom_app_source, session, endpoint, f'{app_name}Source'
+        )
+        try:
+            project_scan = scan_project(project, runtime_params)
+        except BaseException:
+            # project error is reported as is, results of lookups are not needed anymore
+            for lookup in (name_check, base_env_lookup, source_lookup):
+                if lookup:
+                    lookup.cancel()
+            raise
+        if name_check.result():
+            message = f'Name {app_name} is used by other custom application'
+            raise click.BadParameter(message, param_hint='APPLICATION_NAME')
+        if base_env_lookup:
+            base_env_version_id = base_env_lookup.result()
+        app_source, version_count = source_lookup.result()
+
+    return Preflight(
+        base_env_version_id=base_env_version_id,  # type: ignore[arg-type]
+        app_source=app_source,
+        version_count=version_count,
+        project_scan=project_scan,
+    )
 
 
 def extract_metadata_yaml(project_files: List[Tuple[Path, str]]) -> Optional[Path]:
@@ -179,6 +402,357 @@ def extract_metadata_yaml(project_files: List[Tuple[Path, str]]) -> Optional[Pat
     return None
 
 
+def get_incremental_upload_plan(
+    session: Session,
+    endpoint: str,
+    custom_app_source_id: str,
+    custom_app_source_version_id: str,
+    project_files: List[Tuple[Path, str]],
+    project_digests: Dict[str, str],
+    base_manifest: SourceManifest,
+) -> Tuple[List[Tuple[Path, str]], List[str], Dict[str, str]]:
+    """
+    Find which files should be uploaded to and which file items should be removed from
+    the version seeded from the base version, and which files are already uploaded.
+    If seeded version content does not match the base manifest, the whole project is
+    uploaded and all items that are not part of the project are removed.
+    """
+    version = get_custom_app_source_version_by_id(
+        session, endpoint, custom_app_source_id, custom_app_source_version_id
+    )
+    version_items = {item['filePath']: item['id'] for item in version.get('items', [])}
+    if not set(base_manifest.files).issubset(version_items):
+        click.echo('Files of previous version are not available, uploading whole project.')
+        items_to_delete = [
+            item_id for path, item_id in version_items.items() if path not in project_digests
+        ]
+        return project_files, items_to_delete, {}
+
+    changed, deleted = diff_manifest_files(base_manifest.files, project_digests)
+    changed_paths = set(changed)
+    files_to_upload = [file for file in project_files if file[1] in changed_paths]
+    items_to_delete = [version_items[path] for path in deleted]
+    uploaded_files = {
+        path: digest
+        for path, digest in base_manifest.files.items()
+        if project_digests.get(path) == digest
+    }
+    click.echo(
+        f'{len(files_to_upload)} of {len(project_files)} files changed, '
+        f'{len(items_to_delete)} removed since previous version.'
+    )
+    return files_to_upload, items_to_delete, uploaded_files
+
+
+def get_resume_upload_plan(
+    session: Session,
+    endpoint: str,
+    project_files: List[Tuple[Path, str]],
+    project_digests: Dict[str, str],
+    journal: UploadJournal,
+) -> Tuple[List[Tuple[Path, str]], List[str]]:
+    """
+    Find which files are still missing in the version of interrupted upload and which
+    file items of the version are not part of the project anymore.
+    """
+    version = get_custom_app_source_version_by_id(
+        session, endpoint, journal.source_id, journal.version_id
+    )
+    version_items = {item['filePath']: item['id'] for item in version.get('items', [])}
+    files_to_upload = [
+        (file_path, relative_path)
+        for file_path, relative_path in project_files
+        if relative_path not in version_items
+        or journal.files.get(relative_path) != project_digests[relative_path]  # noqa: W503
+    ]
+    items_to_delete = [
+        item_id for path, item_id in version_items.items() if path not in project_digests
+    ]
+    return files_to_upload, items_to_delete
+
+
+def is_retryable_upload_error(error: Exception) -> bool:
+    """Connection problems and server side failures are worth another try."""
+    if isinstance(error, ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, RequestException)
+
+
+def is_unprocessed_request_error(error: Exception) -> bool:
+    """Request was refused by server or connection was not established, so nothing was applied."""
+    if isinstance(error, ClientResponseError):
+        return error.status in NOT_PROCESSED_STATUSES
+    if isinstance(error, ConnectTimeout):
+        return True
+    if isinstance(error, RequestsConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+def get_chunk_multipart_fields(
+    payload: Dict[str, Any],
+    file_chunk: Tuple[Tuple[Path, str], ...],
+    readers: List[LazyFileReader],
+) -> List[Tuple[str, Any]]:
+    """Prepare multipart form fields for chunk upload, file paths go in the same order as files."""
+    fields: List[Tuple[str, Any]] = []
+    for name, value in payload.items():
+        if isinstance(value, tuple):
+            # (file name, content, content type) part
+            fields.append((name, value))
+            continue
+        values = value if isinstance(value, list) else [value]
+        fields.extend((name, str(item)) for item in values)
+    fields.extend(('filePath', relative_path) for _, relative_path in file_chunk)
+    fields.extend(
+        ('file', (file_path.name, reader, 'application/octet-stream'))
+        for (file_path, _), reader in zip(file_chunk, readers)
+    )
+    return fields
+
+
+def is_compression_rejected_error(error: Exception) -> bool:
+    """Server doesn't decode compressed body, other bad requests are real errors."""
+    if not isinstance(error, ClientResponseError):
+        return False
+    if error.status in COMPRESSION_REJECTED_STATUSES:
+        return True
+    return error.status == 400 and 'content-encoding' in str(error.message).lower()
+
+
+def upload_file_chunk(
+    session: Session,
+    endpoint: str,
+    custom_app_source_id: str,
+    custom_app_source_version_id: str,
+    file_chunk: Tuple[Tuple[Path, str], ...],
+    extra_payload: Dict[str, Any],
+    on_read: Callable[[int], None],
+    finalize_payload: Optional[Dict[str, Any]] = None,
+    compression_rejected: Optional[threading.Event] = None,
+) -> bool:
+    """
+    Upload one chunk of project files to source version. Request body is streamed, so only
+    a small part of a file is kept in memory.
+    Version settings from finalize_payload are sent in the same request if server accepts
+    them together with files. Returns True if settings were applied.
+    If compression_rejected is passed, body is gzip compressed till server rejects it,
+    then the event is set and all chunks are sent uncompressed.
+    Chunk that deletes files or sets version settings is sent again only if the failed
+    request surely was not processed, e.g. not after read timeout.
+    """
+    attempt = 0
+    merge_finalize = bool(finalize_payload)
+    while True:
+        compress = compression_rejected is not None and not compression_rejected.is_set()
+        bytes_sent = 0
+        payload = dict(extra_payload)
+        if merge_finalize and finalize_payload:
+            payload.update(finalize_payload)
+        has_changes = bool(payload.get('filesToDelete')) or bool(
+            merge_finalize and finalize_payload
+        )
+
+        def count_read_bytes(n_bytes: int) -> None:
+            nonlocal bytes_sent
+            bytes_sent += n_bytes
+            on_read(n_bytes)
+
+        # readers are consumed by request, so every attempt needs fresh ones
+        readers = [LazyFileReader(file_path, count_read_bytes) for file_path, _ in file_chunk]
+        fields = get_chunk_multipart_fields(payload, file_chunk, readers)
+        try:
+            update_application_source_version_multipart(
+                session,
+                endpoint,
+                custom_app_source_id,
+                custom_app_source_version_id,
+                multipart_data=MultipartEncoder(fields=fields),
+                compress=compress,
+            )
+            return merge_finalize
+        except Exception as error:
+            # bytes of failed request are not uploaded
+            on_read(-bytes_sent)
+            status = getattr(error, 'status', None)
+            if compress and compression_rejected and is_compression_rejected_error(error):
+                # server doesn't decode compressed body, other chunks shouldn't try it
+                compression_rejected.set()
+                continue
+            rejected = status in FINALIZE_MERGE_REJECTED_STATUSES
+            if merge_finalize and isinstance(error, ClientResponseError) and rejected:
+                # server wants version settings in separate requests, so only files are sent
+                merge_finalize = False
+                continue
+            if attempt == UPLOAD_RETRIES or not is_retryable_upload_error(error):
+                raise
+            if has_changes and not is_unprocessed_request_error(error):
+                # server could apply the failed request, deletions and settings can't be repeated
+                raise
+        finally:
+            for reader in readers:
+                reader.close()
+        sleep(UPLOAD_RETRY_WAIT_TIME * 2**attempt)
+        attempt += 1
+
+
+def get_progress_callback(progress: ProgressBar) -> Callable[[int], None]:
+    """Progress bar is updated from several upload workers, so updates need a lock."""
+    lock = threading.Lock()
+
+    def update_progress(n_bytes: int) -> None:
+        with lock:
+            progress.update(n_bytes)
+
+    return update_progress
+
+
+def upload_file_chunks(
+    session: Session,
+    endpoint: str,
+    custom_app_source_id: str,
+    custom_app_source_version_id: str,
+    file_chunks: List[Tuple[Tuple[Path, str], ...]],
+    first_chunk_payload: Dict[str, Any],
+    concurrency: int,
+    on_read: Callable[[int], None],
+    finalize_payload: Optional[Dict[str, Any]] = None,
+    on_chunk_uploaded: Optional[Callable[[Tuple[Tuple[Path, str], ...]], None]] = None,
+    compress: bool = False,
+) -> bool:
+    """
+    Upload chunks of project files to the same source version using pool of workers.
+    If some chunks fail, remaining ones are cancelled and error of the first failed
+    chunk (in project order) is raised.
+    Version settings from finalize_payload are merged into the last chunk request, which is
+    sent only after all other chunks are uploaded, so version is never configured while some
+    of its files are missing. Returns True if settings were applied.
+    """
+    last_index = len(file_chunks) - 1
+    compression_rejected = threading.Event() if compress else None
+
+    def submit_chunk(executor: ThreadPoolExecutor, index: int) -> Future:
+        return executor.submit(
+            upload_file_chunk,
+            session,
+            endpoint,
+            custom_app_source_id,
+            custom_app_source_version_id,
+            file_chunks[index],
+            first_chunk_payload if index == 0 else {},
+            on_read,
+            finalize_payload if index == last_index else None,
+            compression_rejected,
+        )
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures: List[Future] = [submit_chunk(executor, index) for index in range(last_index)]
+        try:
+            wait_for_chunks(futures, file_chunks, on_chunk_uploaded)
+            if all(not future.cancelled() and future.exception() is None for future in futures):
+                futures.append(submit_chunk(executor, last_index))
+                wait_for_chunks(futures[last_index:], file_chunks[last_index:], on_chunk_uploaded)
+        except KeyboardInterrupt:
+            # chunks in progress are finished, the rest can be uploaded with --resume
+            for pending_future in futures:
+                pending_future.cancel()
+            raise
+
+    for future in futures:
+        if not future.cancelled() and future.exception() is not None:
+            raise future.exception()  # type: ignore[misc]
+    return futures[last_index].result()
+
+
+def wait_for_chunks(
+    futures: List[Future],
+    file_chunks: List[Tuple[Tuple[Path, str], ...]],
+    on_chunk_uploaded: Optional[Callable[[Tuple[Tuple[Path, str], ...]], None]],
+) -> None:
+    """Wait till chunk uploads are done, the rest are cancelled after the first failure."""
+    chunk_by_future = dict(zip(futures, file_chunks))
+    for future in as_completed(futures):
+        if future.cancelled():
+            continue
+        if future.exception() is not None:
+            # no reason to upload the rest if version can't be completed
+            for pending_future in futures:
+                pending_future.cancel()
+        elif on_chunk_uploaded:
+            on_chunk_uploaded(chunk_by_future[future])
+
+
+def upload_project_archive(
+    session: Session,
+    endpoint: str,
+    custom_app_source_id: str,
+    custom_app_source_version_id: str,
+    project_files: List[Tuple[Path, str]],
+    payload: Dict[str, Any],
+    finalize_payload: Dict[str, Any],
+    compress: bool,
+    progress: ProgressBar,
+) -> bool:
+    """
+    Upload project files as single tar archive built on the fly.
+    Returns False if server doesn't accept archives, so files should be uploaded separately.
+    Server that doesn't know archive field could ignore it, so files of the version are
+    checked after upload. In that case removed items are dropped from filesToDelete of payload.
+    """
+    archive_name, content_type = ('project.tar', 'application/x-tar')
+    if compress:
+        archive_name, content_type = ('project.tar.gz', 'application/gzip')
+    archive = iter_project_archive(project_files, compress=compress, on_read=progress.update)
+    try:
+        upload_application_source_version_archive(
+            session,
+            endpoint,
+            custom_app_source_id,
+            custom_app_source_version_id,
+            payload={**payload, **finalize_payload},
+            archive_name=archive_name,
+            archive=archive,
+            archive_content_type=content_type,
+        )
+    except ClientResponseError as error:
+        if error.status not in ARCHIVE_NOT_SUPPORTED_STATUSES:
+            raise
+        click.echo('\nArchive upload was rejected, uploading files separately.', err=True)
+        progress.pos = 0
+        return False
+
+    version = get_custom_app_source_version_by_id(
+        session, endpoint, custom_app_source_id, custom_app_source_version_id
+    )
+    version_items = {item['filePath']: item['id'] for item in version.get('items', [])}
+    if all(relative_path in version_items for _, relative_path in project_files):
+        return True
+    click.echo('\nArchive was not unpacked by server, uploading files separately.', err=True)
+    progress.pos = 0
+    item_ids = set(version_items.values())
+    files_to_delete = [
+        item_id for item_id in payload.get('filesToDelete', []) if item_id in item_ids
+    ]
+    payload.pop('filesToDelete', None)
+    if files_to_delete:
+        payload['filesToDelete'] = files_to_delete
+    return False
+
+
+def get_finalize_payload(resources: Dict[str, Any], runtime_params: List[str]) -> Dict[str, Any]:
+    """Prepare version settings, that are set after files upload, as multipart form fields."""
+    payload: Dict[str, Any] = {'resources': (None, json.dumps(resources), 'application/json')}
+    if runtime_params:
+        payload['runtimeParameterValues'] = get_runtime_params_payload(runtime_params)
+    return payload
+
+
+def progressbar(show_progress: bool = True, **kwargs: Any) -> ProgressBar:
+    """Click progress bar, which is drawn only if show_progress is set."""
+    # bars of applications deployed in parallel would be drawn over each other
+    return click.progressbar(file=None if show_progress else io.StringIO(), **kwargs)
+
+
 def configure_custom_app_source_version(
     session: Session,
     endpoint: str,
@@ -191,38 +765,116 @@ def configure_custom_app_source_version(
     cpu_size: str,
     use_session_affinity: Optional[bool],
     service_requests_on_root_path: Optional[bool],
+    base_manifest: Optional[SourceManifest] = None,
+    upload_concurrency: int = UPLOAD_CONCURRENCY,
+    archive_compression: Optional[str] = None,
+    compress_uploads: bool = False,
+    resume_journal: Optional[UploadJournal] = None,
+    project_scan: Optional[ProjectScan] = None,
+    show_progress: bool = True,
 ) -> None:
     payload: Dict[str, Any] = {'baseEnvironmentVersionId': base_env_version_id}
-    project_files = get_project_files_list(project)
+    if project_scan is None:
+        project_scan = scan_project(project, runtime_params)
+    project_files, project_digests, valid_runtime_params = project_scan
 
-    metadata_file = extract_metadata_yaml(project_files)
-    valid_runtime_params = []
-    if metadata_file and runtime_params:
-        valid_runtime_params = verify_runtime_env_vars(metadata_file, runtime_params)
-    progress: ProgressBar  # type hinting badly needed by mypy
-    with click.progressbar(length=len(project_files), label='Uploading project:') as progress:
-        # grouping project files in chunks
-        for file_chunk in split_list_into_chunks(project_files, chunk_size=UPLOAD_CHUNK_SIZE):
-            files_streams = [get_io_stream(file_tuple[0]) for file_tuple in file_chunk]
-            files_relative_paths = [file_tuple[1] for file_tuple in file_chunk]
+    files_to_upload = project_files
+    # files which content is already in the version
+    uploaded_files: Dict[str, str] = {}
+    if resume_journal:
+        files_to_upload, items_to_delete = get_resume_upload_plan(
+            session, endpoint, project_files, project_digests, resume_journal
+        )
+        uploaded_files = dict(resume_journal.files)
+        if items_to_delete:
+            payload['filesToDelete'] = items_to_delete
+        click.echo(
+            f'{len(files_to_upload)} of {len(project_files)} files left to upload, '
+            f'{len(items_to_delete)} to remove.'
+        )
+    elif base_manifest:
+        files_to_upload, items_to_delete, uploaded_files = get_incremental_upload_plan(
+            session,
+            endpoint,
+            custom_app_source_id,
+            custom_app_source_version_id,
+            project_files,
+            project_digests,
+            base_manifest,
+        )
+        if items_to_delete:
+            payload['filesToDelete'] = items_to_delete
+
+    if base_manifest or resume_journal:
+        # version seeded from previous one keeps its settings, so settings that are not
+        # set now are reset explicitly, like in version created from scratch
+        use_session_affinity = bool(use_session_affinity)
+        service_requests_on_root_path = bool(service_requests_on_root_path)
+        metadata_file = extract_metadata_yaml(project_files)
+        if metadata_file:
+            valid_runtime_params = valid_runtime_params + get_reset_runtime_params(
+                metadata_file, valid_runtime_params
+            )
+    # resources and runtime params are sent together with the last chunk if possible
+    finalize_payload = get_finalize_payload(
+        resources=get_resources_payload(
+            service_requests_on_root_path=service_requests_on_root_path,
+            replicas=replicas,
+            cpu_size=cpu_size,
+            session_affinity=use_session_affinity,
+        ),
+        runtime_params=valid_runtime_params,
+    )
+    # base environment and removals are sent with the first chunk, so we need at least one
+    file_chunks = plan_upload_chunks(
+        files_to_upload,
+        max_chunk_bytes=UPLOAD_CHUNK_MAX_BYTES,
+        max_chunk_files=UPLOAD_CHUNK_MAX_FILES,
+    )
+    # journal allows to continue this upload with --resume if it is interrupted
+    journal = UploadJournal(
+        custom_app_source_id, custom_app_source_version_id, str(project), uploaded_files
+    )
+    save_upload_journal(journal)
 
-            payload['filePath'] = files_relative_paths
-            payload['file'] = files_streams
+    def on_chunk_uploaded(file_chunk: Tuple[Tuple[Path, str], ...]) -> None:
+        journal.files.update(
+            (relative_path, project_digests[relative_path]) for _, relative_path in file_chunk
+        )
+        save_upload_journal(journal)
 
-            update_application_source_version(
+    upload_size = sum(file_path.stat().st_size for file_path, _ in files_to_upload)
+    progress: ProgressBar  # type hinting badly needed by mypy
+    with progressbar(show_progress, length=upload_size, label='Uploading project:') as progress:
+        archive_uploaded = False
+        if archive_compression:
+            archive_uploaded = upload_project_archive(
                 session,
                 endpoint,
                 custom_app_source_id,
                 custom_app_source_version_id,
-                payload,
+                project_files=files_to_upload,
+                payload=payload,
+                finalize_payload=finalize_payload,
+                compress=archive_compression == 'gzip',
+                progress=progress,
             )
-            # closing all streams after upload
-            for files_stream in files_streams:
-                if not files_stream.closed:
-                    files_stream.close()
-
-            payload = {}
-            progress.update(len(file_chunk))
+        finalized = archive_uploaded
+        if not archive_uploaded:
+            finalized = upload_file_chunks(
+                session,
+                endpoint,
+                custom_app_source_id,
+                custom_app_source_version_id,
+                file_chunks=file_chunks or [()],
+                first_chunk_payload=payload,
+                concurrency=upload_concurrency,
+                on_read=get_progress_callback(progress),
+                finalize_payload=finalize_payload,
+                on_chunk_uploaded=on_chunk_uploaded,
+                compress=compress_uploads,
+            )
+    if not finalized:
         update_resources(
             session=session,
             endpoint=endpoint,
@@ -241,6 +893,10 @@ def configure_custom_app_source_version(
             version_id=custom_app_source_version_id,
             runtime_params=valid_runtime_params,
         )
+    save_source_manifest(
+        custom_app_source_id, SourceManifest(custom_app_source_version_id, project_digests)
+    )
+    remove_upload_journal(custom_app_source_id)
 
 
 def create_app_from_project(
@@ -254,55 +910,140 @@ def create_app_from_project(
     cpu_size: str,
     use_session_affinity: Optional[bool] = False,
     service_requests_on_root_path: Optional[bool] = False,
+    upload_concurrency: int = UPLOAD_CONCURRENCY,
+    archive_compression: Optional[str] = None,
+    compress_uploads: bool = False,
+    resume: bool = False,
+    base_env_version_id: Optional[str] = None,
+    show_progress: bool = True,
 ) -> Dict[str, Any]:
-    base_env_version_id = get_base_env_version(session, endpoint, base_env)
-    source_name = f'{app_name}Source'
-    custom_app_source_id, custom_app_source_version_id = create_new_custom_app_source_version(
-        session, endpoint, source_name
+    preflight = run_preflight(
+        session,
+        endpoint,
+        app_name=app_name,
+        base_env=base_env,
+        project=project_folder,
+        runtime_params=runtime_params,
+        base_env_version_id=base_env_version_id,
     )
+    source_name = f'{app_name}Source'
+    resume_journal = None
+    if resume:
+        resume_journal = find_interrupted_upload(
+            session, endpoint, preflight.app_source, project_folder
+        )
+        if resume_journal is None:
+            click.echo('No interrupted upload found, uploading project to new version.')
+    if resume_journal:
+        click.echo(f'Resuming upload to {source_name} custom application source.')
+        custom_app_source_id = resume_journal.source_id
+        custom_app_source_version_id = resume_journal.version_id
+        base_manifest = None
+    else:
+        (
+            custom_app_source_id,
+            custom_app_source_version_id,
+            base_manifest,
+        ) = create_new_custom_app_source_version(
+            session, endpoint, source_name, preflight.app_source, preflight.version_count
+        )
     configure_custom_app_source_version(
         session=session,
         endpoint=endpoint,
         custom_app_source_id=custom_app_source_id,
         custom_app_source_version_id=custom_app_source_version_id,
         project=project_folder,
-        base_env_version_id=base_env_version_id,
+        base_env_version_id=preflight.base_env_version_id,
         runtime_params=runtime_params,
         replicas=replicas,
         cpu_size=cpu_size,
         use_session_affinity=use_session_affinity,
         service_requests_on_root_path=service_requests_on_root_path,
+        base_manifest=base_manifest,
+        upload_concurrency=upload_concurrency,
+        archive_compression=archive_compression,
+        compress_uploads=compress_uploads,
+        resume_journal=resume_journal,
+        project_scan=preflight.project_scan,
+        show_progress=show_progress,
     )
     app_payload = {'name': app_name, 'applicationSourceId': custom_app_source_id}
     click.echo(f'Starting {app_name} custom application.')
     return create_custom_app(session, endpoint, app_payload)
 
 
+def tail_build_log(
+    session: Session, endpoint: str, base_env_id: str, version_id: str, log_tail: BuildLogTail
+) -> None:
+    """Print new lines of image build log."""
+    try:
+        build_log = get_execution_environment_version_buildlog(
+            session, endpoint, base_env_id, version_id
+        )
+    except ClientResponseError as error:
+        # log appears only after build is started
+        if error.status != 404:
+            raise error
+        return
+    for line in log_tail.feed(build_log.log or ''):
+        click.echo(line)
+
+
 def wait_for_execution_environment_version_ready(
-    session: Session, endpoint: str, base_env_id: str, version_id: str
+    session: Session,
+    endpoint: str,
+    base_env_id: str,
+    version_id: str,
+    abort_patterns: Sequence[str] = (),
 ) -> None:
-    runs = 500
-    with click.progressbar(iterable=repeat(0), label='Waiting till image is ready:') as progress:
-        for i in range(runs):
-            response = get_execution_environment_version_by_id(
-                session=session, endpoint=endpoint, base_env_id=base_env_id, version_id=version_id
-            )
-            img_status = response.get('buildStatus')
-            if img_status in IMAGE_BUILD_FINAL_STATUSES:
-                break
-            progress.update(1)
-            sleep(CHECK_STATUS_WAIT_TIME)
-        else:
-            build_log = get_execution_environment_version_buildlog(
-                session, endpoint, base_env_id, version_id
-            )
+    """
+    Wait till image build is finished, new lines of build log are printed while we wait.
+    If a log line matches one of abort_patterns, waiting is stopped with an error.
+    """
+    click.echo('Waiting till image is ready:')
+    log_tail = BuildLogTail(abort_patterns)
+    log_downloaded_at: Optional[float] = None
+
+    def on_poll(_: Dict[str, Any]) -> None:
+        nonlocal log_downloaded_at
+        if log_downloaded_at is not None and monotonic() - log_downloaded_at < BUILD_LOG_WAIT_TIME:
+            return
+        log_downloaded_at = monotonic()
+        tail_build_log(session, endpoint, base_env_id, version_id, log_tail)
+        if log_tail.fatal_line is not None:
             raise RuntimeError(
-                f'Build for execution environment version with ID {version_id} timed out with status {img_status} after {runs * CHECK_STATUS_WAIT_TIME} seconds. \nThe error was: {build_log.error} \nThe build log: {build_log.log}'
+                f'Build for execution environment version with ID {version_id} was aborted, '
+                f'build log has fatal error: {log_tail.fatal_line}'
             )
-    if img_status in IMAGE_BUILD_FAILED_STATUSES:
+
+    try:
+        result = poll_until(
+            check=lambda: get_execution_environment_version_by_id(
+                session=session,
+                endpoint=endpoint,
+                base_env_id=base_env_id,
+                version_id=version_id,
+            ),
+            is_done=lambda response: response.get('buildStatus') in IMAGE_BUILD_FINAL_STATUSES,
+            timeout=IMAGE_BUILD_TIMEOUT,
+            max_interval=CHECK_STATUS_WAIT_TIME,
+            on_poll=on_poll,
+            description=f'Build for execution environment version with ID {version_id}',
+        )
+    except PollingTimeoutError as error:
         build_log = get_execution_environment_version_buildlog(
             session, endpoint, base_env_id, version_id
         )
+        raise RuntimeError(
+            f'{error}. \nThe error was: {build_log.error} \nThe build log: {build_log.log}'
+        ) from error
+
+    build_log = get_execution_environment_version_buildlog(
+        session, endpoint, base_env_id, version_id
+    )
+    for line in log_tail.feed(build_log.log or '', final=True):
+        click.echo(line)
+    if result.value.get('buildStatus') in IMAGE_BUILD_FAILED_STATUSES:
         raise Exception(
             f"Build for execution environment version with ID {version_id} failed. \nThe error was: {build_log.error} \nThe build log: {build_log.log}"
         )
@@ -314,6 +1055,8 @@ def send_docker_image_with_progress(
     base_env_id: str,
     docker_image: Path,
     field_name: str = 'docker_image',
+    abort_patterns: Sequence[str] = (),
+    show_progress: bool = True,
 ) -> None:
     click.echo(f'Uploading {docker_image.name} to Data Robot.')
     with docker_image.open('rb') as file:
@@ -321,7 +1064,9 @@ def send_docker_image_with_progress(
             fields={field_name: (docker_image.name, file, 'application/octet-stream')}
         )
         progress: ProgressBar  # type hinting badly needed by mypy
-        with click.progressbar(length=multipart_monitor.len, label='Upload progress:') as progress:
+        with progressbar(
+            show_progress, length=multipart_monitor.len, label='Upload progress:'
+        ) as progress:
 
             def monitor_callback(monitor: MultipartEncoderMonitor):
                 bytes_send = monitor.bytes_read - progress.pos
@@ -336,12 +1081,21 @@ def send_docker_image_with_progress(
                 multipart_data=multipart_monitor,
             )
     wait_for_execution_environment_version_ready(
-        session=session, endpoint=endpoint, base_env_id=base_env_id, version_id=response['id']
+        session=session,
+        endpoint=endpoint,
+        base_env_id=base_env_id,
+        version_id=response['id'],
+        abort_patterns=abort_patterns,
     )
 
 
 def create_app_from_docker_image(
-    session: Session, endpoint: str, docker_image: Path, app_name: str
+    session: Session,
+    endpoint: str,
+    docker_image: Path,
+    app_name: str,
+    abort_patterns: Sequence[str] = (),
+    show_progress: bool = True,
 ) -> Dict[str, Any]:
     base_env_data = create_execution_environment(
         session=session,
@@ -355,6 +1109,8 @@ def create_app_from_docker_image(
         endpoint=endpoint,
         base_env_id=base_env_data['id'],
         docker_image=docker_image,
+        abort_patterns=abort_patterns,
+        show_progress=show_progress,
     )
 
     app_payload = {'name': app_name, 'environmentId': base_env_data['id']}
@@ -362,14 +1118,189 @@ def create_app_from_docker_image(
     return create_custom_app(session, endpoint, app_payload)
 
 
-def wait_for_custom_app_spinning(session: Session, status_check_url: str) -> str:
-    with click.progressbar(iterable=repeat(0), label='Waiting till app is ready:') as progress:
-        while True:
-            app_status = check_starting_status(session, status_check_url)
-            if app_status in FINAL_STATUSES:
-                return app_status
-            progress.update(1)
-            sleep(CHECK_STATUS_WAIT_TIME)
+def wait_for_custom_app_spinning(
+    session: Session, status_check_url: str, show_progress: bool = True
+) -> str:
+    with progressbar(
+        show_progress, iterable=repeat(0), label='Waiting till app is ready:'
+    ) as progress:
+        try:
+            result = poll_until(
+                check=lambda: check_starting_status(session, status_check_url),
+                is_done=lambda app_status: app_status in FINAL_STATUSES,
+                timeout=APP_START_TIMEOUT,
+                max_interval=CHECK_STATUS_WAIT_TIME,
+                on_poll=lambda _: progress.update(1),
+                description='Custom application start',
+            )
+        except PollingTimeoutError as error:
+            # application is created, it is just slow to start
+            raise click.ClickException(f'{error}. Check application status later.') from error
+    return result.value
+
+
+class DeployResult(NamedTuple):
+    """Outcome of one application deploy from manifest."""
+
+    name: str
+    status: str
+    upload_time: float
+    wait_time: float
+    details: str
+
+
+def validate_app_specs(app_specs: List[AppSpec]) -> None:
+    for app_spec in app_specs:
+        try:
+            validate_parameters(
+                app_spec.base_env,
+                app_spec.path,
+                app_spec.image,
+                app_spec.string_env_vars,
+                app_spec.numeric_env_vars,
+                app_spec.boolean_env_vars,
+            )
+            if app_spec.path:
+                check_project(app_spec.path)
+        except click.UsageError as error:
+            raise click.UsageError(f'Application {app_spec.name}: {error.message}')
+
+
+def deploy_app(
+    session: Session,
+    endpoint: str,
+    app_spec: AppSpec,
+    base_env_version_ids: Dict[str, str],
+    skip_wait: bool,
+    upload_concurrency: int,
+    archive_compression: Optional[str],
+    compress_uploads: bool,
+    resume: bool,
+    abort_patterns: Sequence[str] = (),
+    show_progress: bool = True,
+) -> DeployResult:
+    """Create and start one application from manifest. Errors are reported in result."""
+    started_at = monotonic()
+    created_at = None
+    try:
+        if app_spec.image:
+            if is_app_name_in_use(session, endpoint, app_spec.name):
+                message = f'Name {app_spec.name} is used by other custom application'
+                raise click.BadParameter(message, param_hint='APPLICATION_NAME')
+            app_data = create_app_from_docker_image(
+                session=session,
+                endpoint=endpoint,
+                docker_image=app_spec.image,
+                app_name=app_spec.name,
+                abort_patterns=abort_patterns,
+                show_progress=show_progress,
+            )
+        else:
+            app_data = create_app_from_project(
+                session=session,
+                endpoint=endpoint,
+                base_env=app_spec.base_env,  # type: ignore[arg-type]
+                project_folder=app_spec.path,  # type: ignore[arg-type]
+                app_name=app_spec.name,
+                runtime_params=get_runtime_params(
+                    app_spec.string_env_vars,
+                    app_spec.numeric_env_vars,
+                    app_spec.boolean_env_vars,
+                ),
+                replicas=app_spec.replicas,
+                cpu_size=app_spec.cpu_size,
+                use_session_affinity=app_spec.use_session_affinity,
+                service_requests_on_root_path=app_spec.service_requests_on_root_path,
+                upload_concurrency=upload_concurrency,
+                archive_compression=archive_compression,
+                compress_uploads=compress_uploads,
+                resume=resume,
+                base_env_version_id=base_env_version_ids[app_spec.base_env],  # type: ignore[index]
+                show_progress=show_progress,
+            )
+        created_at = monotonic()
+        status = 'CREATED'
+        if not skip_wait and app_data.get('statusUrl'):
+            status = wait_for_custom_app_spinning(
+                session=session,
+                status_check_url=app_data['statusUrl'],
+                show_progress=show_progress,
+            )
+        details = app_data.get('applicationUrl', '')
+    except Exception as error:
+        status, details = 'FAILED', str(error)
+
+    finished_at = monotonic()
+    created_at = created_at or finished_at
+    return DeployResult(
+        name=app_spec.name,
+        status=status,
+        upload_time=created_at - started_at,
+        wait_time=finished_at - created_at,
+        details=details,
+    )
+
+
+def deploy_apps(
+    session: Session,
+    endpoint: str,
+    app_specs: List[AppSpec],
+    parallel: int,
+    skip_wait: bool,
+    upload_concurrency: int,
+    archive_compression: Optional[str],
+    compress_uploads: bool,
+    resume: bool,
+    abort_patterns: Sequence[str] = (),
+) -> List[DeployResult]:
+    """Deploy applications from manifest, up to parallel applications at the same time."""
+    # every distinct environment is resolved only once
+    base_envs = sorted({app_spec.base_env for app_spec in app_specs if app_spec.base_env})
+    base_env_version_ids = {
+        base_env: get_base_env_version(session, endpoint, base_env) for base_env in base_envs
+    }
+    # with several applications at once only overall progress is shown
+    show_app_progress = parallel == 1 or len(app_specs) == 1
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = [
+            executor.submit(
+                deploy_app,
+                session,
+                endpoint,
+                app_spec,
+                base_env_version_ids,
+                skip_wait,
+                upload_concurrency,
+                archive_compression,
+                compress_uploads,
+                resume,
+                abort_patterns,
+                show_app_progress,
+            )
+            for app_spec in app_specs
+        ]
+        with progressbar(
+            not show_app_progress, length=len(futures), label='Deploying applications:'
+        ) as progress:
+            for _ in as_completed(futures):
+                progress.update(1)
+    return [future.result() for future in futures]
+
+
+def format_deploy_summary(results: List[DeployResult]) -> str:
+    rows = [
+        [
+            result.name,
+            result.status,
+            f'{result.upload_time:.1f}s',
+            f'{result.wait_time:.1f}s',
+            f'{result.upload_time + result.wait_time:.1f}s',
+            result.details,
+        ]
+        for result in results
+    ]
+    headers = ['name', 'status', 'upload', 'wait', 'total', 'details']
+    return tabulate(rows, headers=headers, tablefmt='simple')
 
 
 def parse_env_vars(ctx, param, value):
@@ -386,6 +1317,7 @@ def parse_env_vars(ctx, param, value):
 @click.command()
 @api_token
 @api_endpoint
+@build_abort_patterns
 @click.option(
     '-e',
     '--base-env',
@@ -417,7 +1349,7 @@ def parse_env_vars(ctx, param, value):
 @click.option(
     '--cpu-size',
     required=False,
-    type=click.Choice(['2xsmall', 'xsmall', 'small', 'medium', 'large', 'xlarge', '2xlarge']),
+    type=click.Choice(CPU_SIZES),
     default='small',
     help=(
         # This string must be 39 characters because it gets post-processed
@@ -479,7 +1411,51 @@ def parse_env_vars(ctx, param, value):
     default=None,
     help='If this flag is set then your app will service web requests + internal health checks on `/`, rather than servicing web requests on `/apps/id/ and health checks on `/apps/id`.',
 )
-@click.argument('application_name', type=click.STRING, required=True)
+@click.option(
+    '--upload-concurrency',
+    type=click.IntRange(min=1, max=32),
+    default=UPLOAD_CONCURRENCY,
+    show_default=True,
+    help='Number of project file chunks uploaded at the same time.',
+)
+@click.option(
+    '--archive',
+    is_flag=True,
+    default=False,
+    help='Upload project folder as single tar archive instead of separate files.',
+)
+@click.option(
+    '--archive-compression',
+    type=click.Choice(['gzip', 'none']),
+    default='gzip',
+    show_default=True,
+    help='Compression used for project archive when --archive is set.',
+)
+@click.option(
+    '--compress-uploads',
+    is_flag=True,
+    default=False,
+    help='Send project file chunks gzip compressed, if server accepts compressed requests.',
+)
+@click.option(
+    '--resume',
+    is_flag=True,
+    default=False,
+    help='Continue interrupted project upload into the same source version.',
+)
+@click.option(
+    '--manifest',
+    type=click.Path(exists=True, dir_okay=False, resolve_path=True, path_type=Path),
+    help='Path to YAML deploy manifest with list of applications to create.',
+)
+@click.option(
+    '--parallel',
+    type=click.IntRange(min=1, max=32),
+    default=DEPLOY_PARALLELISM,
+    show_default=True,
+    help='Number of applications from deploy manifest created at the same time.',
+)
+@click.argument('application_name', type=click.STRING, required=False)
 def create(
     token: str,
     endpoint: str,
@@ -495,6 +1471,14 @@ def create(
     cpu_size: str,
     use_session_affinity: Optional[bool],
     service_requests_on_root_path: Optional[bool],
+    upload_concurrency: int,
+    archive: bool,
+    archive_compression: str,
+    compress_uploads: bool,
+    resume: bool,
+    manifest: Optional[Path],
+    parallel: int,
+    abort_patterns: List[str],
 ) -> None:
     """
     Creates new custom application from docker image or base environment.
@@ -504,23 +1488,75 @@ def create(
 
     If you add a `.dr_apps_ignore` file, then that will use .gitignore syntax to selectively
     ignore files you don't want to upload.
+
+    Content hashes of uploaded files are kept in local cache, so next version of
+    the application source is based on the previous one and gets only changed files.
+    If upload is interrupted, it can be continued with --resume option.
+
+    Several applications can be created at once from deploy manifest (--manifest),
+    command line options are used as defaults for all applications in it.
     """
+    if manifest:
+        if application_name or path or image or stringenvvar or numericenvvar or booleanenvvar:
+            raise click.UsageError(
+                'Application name, project folder (path), docker image (image) and runtime '
+                'params should be set in deploy manifest (manifest).'
+            )
+        defaults = {
+            'base-env': base_env,
+            'replicas': replicas,
+            'cpu-size': cpu_size,
+            'use-session-affinity': use_session_affinity,
+            'service-requests-on-root-path': service_requests_on_root_path,
+        }
+        app_specs = read_deploy_manifest(manifest, defaults)
+        validate_app_specs(app_specs)
+
+        # all applications share one connection pool
+        session = create_api_session(
+            token, pool_maxsize=max(POOL_MAXSIZE, parallel * upload_concurrency)
+        )
+
+        results = deploy_apps(
+            session=session,
+            endpoint=endpoint,
+            app_specs=app_specs,
+            parallel=parallel,
+            skip_wait=skip_wait,
+            upload_concurrency=upload_concurrency,
+            archive_compression=archive_compression if archive else None,
+            compress_uploads=compress_uploads,
+            resume=resume,
+            abort_patterns=abort_patterns,
+        )
+        click.echo(format_deploy_summary(results))
+        failed = [result for result in results if result.status not in DEPLOY_SUCCESS_STATUSES]
+        if failed:
+            raise click.ClickException(
+                f'{len(failed)} of {len(results)} applications were not deployed.'
+            )
+        return
+
+    if not application_name:
+        raise click.UsageError('Missing argument \'APPLICATION_NAME\'.')
     validate_parameters(base_env, path, image, stringenvvar, numericenvvar, booleanenvvar)
     if path:
         check_project(path)
 
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
+    session = create_api_session(token, pool_maxsize=max(POOL_MAXSIZE, upload_concurrency))
 
     runtime_params = get_runtime_params(stringenvvar, numericenvvar, booleanenvvar)
 
-    if is_app_name_in_use(session, endpoint, application_name):
-        message = f'Name {application_name} is used by other custom application'
-        raise click.BadParameter(message, param_hint='APPLICATION_NAME')
-
     if image:
+        if is_app_name_in_use(session, endpoint, application_name):
+            message = f'Name {application_name} is used by other custom application'
+            raise click.BadParameter(message, param_hint='APPLICATION_NAME')
         app_data = create_app_from_docker_image(
-            session=session, endpoint=endpoint, docker_image=image, app_name=application_name
+            session=session,
+            endpoint=endpoint,
+            docker_image=image,
+            app_name=application_name,
+            abort_patterns=abort_patterns,
         )
     else:
         app_data = create_app_from_project(
@@ -534,6 +1570,10 @@ def create(
             cpu_size=cpu_size,
             use_session_affinity=use_session_affinity,
             service_requests_on_root_path=service_requests_on_root_path,
+            upload_concurrency=upload_concurrency,
+            archive_compression=archive_compression if archive else None,
+            compress_uploads=compress_uploads,
+            resume=resume,
         )
 
     if skip_wait or not app_data.get('statusUrl'):
@@ -6,19 +6,20 @@
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import click
-from requests import Session
 
 from .create import send_docker_image_with_progress
+from .helpers.api_session import create_api_session
 from .helpers.execution_environments_functions import create_execution_environment
-from .helpers.wrappers import api_endpoint, api_token
+from .helpers.wrappers import api_endpoint, api_token, build_abort_patterns
 
 
 @click.command()
 @api_token
 @api_endpoint
+@build_abort_patterns
 @click.option(
     '-n',
     '--name',
@@ -42,11 +43,15 @@ from .helpers.wrappers import api_endpoint, api_token
     help='Description of the execution env to be created',
 )
 def create_env(
-    token: str, endpoint: str, name: str, dockerfilezip: Path, description: Optional[str]
+    token: str,
+    endpoint: str,
+    name: str,
+    dockerfilezip: Path,
+    description: Optional[str],
+    abort_patterns: List[str],
 ) -> None:
     """Creates an execution environment and a first version."""
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
+    session = create_api_session(token)
     click.echo('Creating execution environment')
     create_exec_env_rsp = create_execution_environment(
         session=session,
@@ -61,5 +66,6 @@ def create_env(
         base_env_id=create_exec_env_rsp['id'],
         docker_image=dockerfilezip,
         field_name='docker_context',
+        abort_patterns=abort_patterns,
     )
     click.echo()
@@ -1,14 +1,9 @@
 from typing import Any, List, Optional
 
 import click
-from bson import ObjectId
-from requests import Session
 
-from .helpers.custom_apps_functions import (
-    get_custom_app_by_id,
-    get_custom_app_by_name,
-    update_running_custom_app,
-)
+from .helpers.api_session import create_api_session
+from .helpers.custom_apps_functions import get_custom_app, update_running_custom_app
 from .helpers.wrappers import api_endpoint, api_token
 
 
@@ -37,15 +32,10 @@ def external_share(
     add_external_user: List[str],
     remove_external_user: List[str],
 ):
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
+    session = create_api_session(token)
     payload: dict[str, Any] = dict()
-    if ObjectId.is_valid(application_name):
-        app = get_custom_app_by_id(session, endpoint, app_id=application_name)
-        app_id = application_name
-    else:
-        app = get_custom_app_by_name(session, endpoint, app_name=application_name)
-        app_id = app['id']
+    app = get_custom_app(session, endpoint, application_name)
+    app_id = app['id']
 
     if set_external_sharing is not None:
         payload['externalAccessEnabled'] = set_external_sharing
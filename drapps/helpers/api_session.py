@@ -0,0 +1,97 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from typing import Any, Optional, Tuple
+
+from requests import PreparedRequest, Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+
+from .http_trace import TracedSession, get_active_trace
+
+CONNECT_TIMEOUT = 10
+# big upload chunks can be processed by server for a long time
+READ_TIMEOUT = 300
+# default size of requests connection pool, commands with concurrent requests need more
+POOL_MAXSIZE = 10
+
+API_RETRIES = 3
+API_RETRY_BACKOFF_FACTOR = 1
+# server asked to wait, but no longer than this number of seconds
+MAX_RETRY_AFTER = 60
+# only requests that can be repeated without side effects are retried after a response.
+# PATCH and POST are not here: upload chunks are retried by create command itself,
+# because streamed multipart body can't be sent again by transport
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'DELETE'})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class ApiRetry(Retry):
+    """Retry policy that follows Retry-After header, but doesn't wait too long."""
+
+    def get_retry_after(self, response: Any) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+class ApiHTTPAdapter(HTTPAdapter):
+    """HTTP adapter that sets default timeout for requests that were sent without it."""
+
+    def __init__(self, timeout: Tuple[float, float], **kwargs: Any):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, timeout: Any = None, **kwargs: Any
+    ) -> Response:
+        return super().send(request, timeout=timeout or self.timeout, **kwargs)
+
+
+def get_retry_policy() -> Retry:
+    """
+    Retry policy for API requests. Failed connection is always retried, because
+    request was not sent yet. Read errors and 429/5xx gateway responses are retried
+    only for idempotent methods, with exponential backoff or after Retry-After delay.
+    """
+    return ApiRetry(
+        total=API_RETRIES,
+        connect=API_RETRIES,
+        read=API_RETRIES,
+        status=API_RETRIES,
+        other=0,
+        allowed_methods=RETRY_METHODS,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=API_RETRY_BACKOFF_FACTOR,
+        respect_retry_after_header=True,
+        # last response is returned, so handle_dr_response shows the API error
+        raise_on_status=False,
+    )
+
+
+def create_api_session(token: str, pool_maxsize: int = POOL_MAXSIZE) -> Session:
+    """
+    Create session for DataRobot Public API with authorization header, default timeouts
+    and retry policy. Connection pool should be at least as big as number of threads,
+    that send requests through the session at the same time. Requests of the session
+    are recorded, if --trace is used.
+    """
+    trace = get_active_trace()
+    session = TracedSession(trace) if trace else Session()
+    # compressed responses are always asked, brotli is added if its package is installed
+    accept_encoding = make_headers(accept_encoding=True)['accept-encoding']
+    session.headers.update({'Authorization': f'Bearer {token}', 'Accept-Encoding': accept_encoding})
+    adapter = ApiHTTPAdapter(
+        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+        pool_maxsize=pool_maxsize,
+        max_retries=get_retry_policy(),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -5,15 +5,21 @@
 #  This is proprietary source code of DataRobot, Inc. and its affiliates.
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
+import hashlib
 import io
 import os
+import tarfile
+import zlib
 from pathlib import Path
-from typing import BinaryIO, List, Tuple, Union
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from click import UsageError
 from pathspec import pathspec
 
 ENTRYPOINT_SCRIPT_NAME = 'start-app.sh'
+IGNORE_FILE_NAME = '.dr_apps_ignore'
+ARCHIVE_READ_BLOCK_SIZE = 64 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
 
 
 def file_reader_fix_new_lines(file_path: Path) -> io.BytesIO:
@@ -42,35 +48,200 @@ def check_project(file_folder: Path):
             )
 
 
+def get_file_digest(file_path: Path) -> str:
+    """Calculate sha256 digest of file content."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 def load_ignore_patterns(file_folder: Path) -> pathspec.PathSpec:
-    ignore_file = Path(file_folder) / '.dr_apps_ignore'
+    ignore_file = Path(file_folder) / IGNORE_FILE_NAME
     if not ignore_file.exists():
         return pathspec.PathSpec.from_lines("gitwildmatch", [])
     with ignore_file.open("r") as f:
         return pathspec.PathSpec.from_lines("gitwildmatch", f)
 
 
-def get_project_files_list(file_folder: Path) -> List[Tuple[Path, str]]:
+def get_ignore_patterns_digest(file_folder: Path) -> str:
+    """Calculate digest of ignore file, empty string if project doesn't have it."""
+    ignore_file = Path(file_folder) / IGNORE_FILE_NAME
+    if not ignore_file.exists():
+        return ''
+    return get_file_digest(ignore_file)
+
+
+def _is_ignored(
+    spec: pathspec.PathSpec, relative_path: str, ignore_cache: Optional[Dict[str, bool]]
+) -> bool:
+    if ignore_cache is None:
+        return spec.match_file(relative_path)
+    ignored = ignore_cache.get(relative_path)
+    if ignored is None:
+        ignored = ignore_cache[relative_path] = spec.match_file(relative_path)
+    return ignored
+
+
+def iter_project_entries(
+    file_folder: Path, spec: pathspec.PathSpec, ignore_cache: Optional[Dict[str, bool]] = None
+) -> Iterator[Tuple[os.DirEntry, str]]:
+    """
+    Walk over project folder and yield directory entry and relative (UNIX way) path for every
+    not ignored file. Ignored folders are skipped entirely, without reading their content,
+    unless ignore file has negated (!) patterns, which can bring back files of ignored folder.
+    Ignore decisions can be taken from and stored to ignore_cache.
+    """
+    can_skip_folders = not any(pattern.include is False for pattern in spec.patterns)
+    # folders are processed in depth-first manner, relative paths of folders end with /
+    folders_to_scan = [(str(file_folder), '')]
+    while folders_to_scan:
+        folder_path, relative_folder = folders_to_scan.pop()
+        sub_folders = []
+        with os.scandir(folder_path) as folder_entries:
+            for entry in sorted(folder_entries, key=lambda e: e.name):
+                relative_path = relative_folder + entry.name
+                # symlinks to folders are not followed, the same as Path.rglob does
+                if entry.is_dir(follow_symlinks=False):
+                    if not (
+                        can_skip_folders and _is_ignored(spec, relative_path + '/', ignore_cache)
+                    ):
+                        sub_folders.append((entry.path, relative_path + '/'))
+                elif entry.is_file() and not _is_ignored(spec, relative_path, ignore_cache):
+                    yield entry, relative_path
+        folders_to_scan.extend(reversed(sub_folders))
+
+
+def get_project_files_list(
+    file_folder: Path, ignore_cache: Optional[Dict[str, bool]] = None
+) -> List[Tuple[Path, str]]:
     """Get list of absolute and relative paths for each file in project folder."""
     spec = load_ignore_patterns(file_folder)
-    result = []
-    for file in file_folder.rglob("*"):
-        if not file.is_file():
-            continue
-        relative_path = str(file.relative_to(file_folder))
-        if os.path.sep == '\\':
-            # if we work on Windows, convert relative path to UNIX way
-            relative_path = relative_path.replace('\\', '/')
+    return [
+        (Path(entry.path), relative_path)
+        for entry, relative_path in iter_project_entries(file_folder, spec, ignore_cache)
+    ]
 
-        if spec.match_file(relative_path):
-            continue
-        result.append((file, relative_path))
-    return result
+
+def file_reader_needs_new_lines_fix(file_path: Path) -> bool:
+    """Only entrypoint edited on Windows needs new lines fix."""
+    return file_path.name == ENTRYPOINT_SCRIPT_NAME and os.path.sep == '\\'
 
 
 def get_io_stream(file_path: Path) -> Union[io.BytesIO, BinaryIO]:
-    if file_path.name == ENTRYPOINT_SCRIPT_NAME and os.path.sep == '\\':
+    if file_reader_needs_new_lines_fix(file_path):
         # fixing new lines in Windows edited entrypoint file
         return file_reader_fix_new_lines(file_path)
 
     return file_path.open(mode='rb')
+
+
+def _get_stream_size(stream: Union[io.BytesIO, BinaryIO]) -> int:
+    if isinstance(stream, io.BytesIO):
+        return len(stream.getbuffer())
+    return os.fstat(stream.fileno()).st_size
+
+
+class LazyFileReader:
+    """
+    File-like object for streaming uploads. File is opened on the first read and closed
+    right after it was read completely, so big chunks don't keep many files open.
+    `len` attribute is used by multipart encoder to know how many bytes are left.
+    """
+
+    def __init__(self, file_path: Path, on_read: Optional[Callable[[int], None]] = None):
+        self.file_path = file_path
+        self.on_read = on_read
+        self._stream: Optional[Union[io.BytesIO, BinaryIO]] = None
+        self._size: Optional[int] = None
+        self._bytes_read = 0
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            if file_reader_needs_new_lines_fix(self.file_path):
+                # size of converted content is known only after reading the file
+                self._stream = get_io_stream(self.file_path)
+                self._size = _get_stream_size(self._stream)
+            else:
+                self._size = self.file_path.stat().st_size
+        return self._size
+
+    @property
+    def len(self) -> int:
+        return self.size - self._bytes_read
+
+    def read(self, length: Optional[int] = -1) -> bytes:
+        bytes_left = self.len
+        if bytes_left <= 0:
+            return b''
+        if self._stream is None:
+            self._stream = get_io_stream(self.file_path)
+        if length is None or length < 0 or length > bytes_left:
+            length = bytes_left
+        data = self._stream.read(length)
+        if not data:
+            self.close()
+            raise OSError(f'File {self.file_path} was changed during upload.')
+        self._bytes_read += len(data)
+        if self.on_read:
+            self.on_read(len(data))
+        if self.len <= 0:
+            self.close()
+        return data
+
+    def close(self) -> None:
+        if self._stream is not None and not self._stream.closed:
+            self._stream.close()
+
+
+def iter_project_archive(
+    project_files: List[Tuple[Path, str]],
+    compress: bool = True,
+    on_read: Optional[Callable[[int], None]] = None,
+) -> Iterator[bytes]:
+    """
+    Generate tar archive (gzip compressed if requested) with project files block by block.
+    Files are read one at a time, so memory usage doesn't depend on project size.
+    """
+    # wbits=31 produces gzip container, so result can be read as .tar.gz
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    archive_size = 0
+
+    def encode(data: bytes) -> bytes:
+        nonlocal archive_size
+        archive_size += len(data)
+        return compressor.compress(data) if compressor else data
+
+    for file_path, relative_path in project_files:
+        file_stat = file_path.stat()
+        with get_io_stream(file_path) as stream:
+            tar_info = tarfile.TarInfo(relative_path)
+            tar_info.size = _get_stream_size(stream)
+            tar_info.mtime = int(file_stat.st_mtime)
+            # keep executable bits, entrypoint script needs them
+            tar_info.mode = file_stat.st_mode & 0o777
+            yield encode(tar_info.tobuf(tarfile.PAX_FORMAT, 'utf-8', 'surrogateescape'))
+
+            bytes_left = tar_info.size
+            while bytes_left > 0:
+                block = stream.read(min(ARCHIVE_READ_BLOCK_SIZE, bytes_left))
+                if not block:
+                    # file was truncated while reading, header already has its size
+                    block = tarfile.NUL * bytes_left
+                bytes_left -= len(block)
+                if on_read:
+                    on_read(len(block))
+                yield encode(block)
+        padding = -tar_info.size % tarfile.BLOCKSIZE
+        if padding:
+            yield encode(tarfile.NUL * padding)
+
+    # end of archive marker (two empty blocks) and padding to full tar record
+    end_of_archive = tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+    archive_size_with_end = archive_size + len(end_of_archive)
+    end_of_archive += tarfile.NUL * (-archive_size_with_end % tarfile.RECORDSIZE)
+    yield encode(end_of_archive)
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,268 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+"""
+Asyncio variants of API helpers, so bulk operations can send many concurrent
+requests from one thread. Functions have the same names and error semantics as
+synchronous helpers, but take aiohttp.ClientSession created by create_async_session.
+Requests have the same timeouts and retry policy as synchronous API session and are
+recorded, if --trace is used.
+"""
+import asyncio
+import posixpath
+from time import monotonic, time
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, TypeVar
+
+try:
+    import aiohttp
+except ImportError as import_error:
+    raise ImportError(
+        'Async API client requires aiohttp, install it with `pip install drapps[async]`.'
+    ) from import_error
+
+from .api_session import (
+    API_RETRIES,
+    API_RETRY_BACKOFF_FACTOR,
+    CONNECT_TIMEOUT,
+    MAX_RETRY_AFTER,
+    READ_TIMEOUT,
+    RETRY_METHODS,
+    RETRY_STATUSES,
+    get_retry_policy,
+)
+from .exceptions import ClientResponseError
+from .http_trace import get_active_trace, get_url_template
+
+T = TypeVar('T')
+
+# number of simultaneously opened connections to DataRobot
+CONNECTION_LIMIT = 100
+
+
+def create_async_session(
+    token: str, connection_limit: int = CONNECTION_LIMIT
+) -> aiohttp.ClientSession:
+    """Create session with authorization header. Must be created inside running event loop."""
+    connector = aiohttp.TCPConnector(limit=connection_limit)
+    # same timeouts as synchronous API session
+    timeout = aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={'Authorization': f'Bearer {token}'},
+        timeout=timeout,
+        raise_for_status=False,
+    )
+
+
+async def handle_dr_response(response: aiohttp.ClientResponse, raise_error: bool = True) -> None:
+    """Async version of handle_dr_response, raises ClientResponseError for failed responses."""
+    if 400 <= response.status:
+        try:
+            data = await response.json(content_type=None)
+            message = data.get('message', response.reason)
+            errors = data.get('errors', None)
+        except (ValueError, AttributeError):
+            message = response.reason
+            errors = None
+        exception = ClientResponseError(
+            url=str(response.url), status=response.status, message=message, errors=errors
+        )
+        if raise_error:
+            raise exception
+
+
+def _get_retry_delay(response: Optional[aiohttp.ClientResponse], retries: int) -> float:
+    """Delay before retry, same as urllib3 backoff of synchronous session."""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        return min(get_retry_policy().parse_retry_after(retry_after), MAX_RETRY_AFTER)
+    if retries == 0:
+        return 0
+    return API_RETRY_BACKOFF_FACTOR * 2 ** (retries - 1)
+
+
+async def _request(
+    session: aiohttp.ClientSession, method: str, url: str, **kwargs: Any
+) -> aiohttp.ClientResponse:
+    """
+    Send request with retry policy of synchronous API session: failed connection is always
+    retried, read errors and 429/5xx gateway responses only for idempotent methods.
+    Body of returned response is already read, so connection is released.
+    """
+    record: Dict[str, Any] = {
+        'time': round(time(), 3),
+        'method': method,
+        'urlTemplate': get_url_template(url),
+        'bytesSent': 0,
+    }
+    started = monotonic()
+    retries = 0
+    try:
+        while True:
+            response = None
+            try:
+                response = await session.request(method, url, **kwargs)
+                body = await response.read()
+            except aiohttp.ClientConnectorError:
+                if retries == API_RETRIES:
+                    raise
+            except (
+                asyncio.TimeoutError,
+                aiohttp.ClientPayloadError,
+                aiohttp.ServerDisconnectedError,
+            ):
+                if retries == API_RETRIES or method not in RETRY_METHODS:
+                    raise
+            else:
+                retryable = method in RETRY_METHODS and response.status in RETRY_STATUSES
+                if not retryable or retries == API_RETRIES:
+                    # last response is returned, so handle_dr_response shows the API error
+                    content_length = response.headers.get('Content-Length')
+                    bytes_received = int(content_length) if content_length else len(body)
+                    record.update(status=response.status, bytesReceived=bytes_received)
+                    return response
+            await asyncio.sleep(_get_retry_delay(response, retries))
+            retries += 1
+    except Exception as error:
+        record.update(status=None, error=type(error).__name__, bytesReceived=0)
+        raise
+    finally:
+        trace = get_active_trace()
+        if trace is not None:
+            record['retries'] = retries
+            record['latency'] = round(monotonic() - started, 6)
+            trace.record(record)
+
+
+async def gather_limited(awaitables: Iterable[Awaitable[T]], limit: int) -> List[T]:
+    """Run awaitables concurrently, but no more than limit at the same time."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable[T]) -> T:
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables))
+
+
+async def _get_json(
+    session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, str]] = None
+) -> Any:
+    response = await _request(session, 'GET', url, params=params)
+    await handle_dr_response(response)
+    return await response.json()
+
+
+async def _get_all_pages(
+    session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, str]] = None
+) -> List[Dict[str, Any]]:
+    """Get items from all pages of list API following `next` links."""
+    page = await _get_json(session, url, params)
+    items = list(page['data'])
+    while page.get('next'):
+        # next link already has all query parameters
+        page = await _get_json(session, page['next'])
+        items.extend(page['data'])
+    return items
+
+
+async def get_custom_apps_list(
+    session: aiohttp.ClientSession, endpoint: str, app_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Get a list of custom application with possibility to filter by application name."""
+    url = posixpath.join(endpoint, 'customApplications/')
+    req_params = {}
+    if app_name:
+        req_params['name'] = app_name
+    return await _get_all_pages(session, url, req_params)
+
+
+async def get_custom_app_by_id(
+    session: aiohttp.ClientSession, endpoint: str, app_id: str
+) -> Dict[str, Any]:
+    """Get a custom application by ID."""
+    url = posixpath.join(endpoint, f'customApplications/{app_id}/')
+    return await _get_json(session, url)
+
+
+async def get_custom_app_logs(
+    session: aiohttp.ClientSession, endpoint: str, app_id: str
+) -> Dict[str, Any]:
+    """Get logs of custom application."""
+    url = posixpath.join(endpoint, f'customApplications/{app_id}/logs/')
+    return await _get_json(session, url)
+
+
+async def delete_custom_app(session: aiohttp.ClientSession, endpoint: str, app_id: str) -> None:
+    """Stop and delete custom application."""
+    url = posixpath.join(endpoint, f'customApplications/{app_id}/')
+    response = await _request(session, 'DELETE', url)
+    await handle_dr_response(response)
+
+
+async def check_starting_status(session: aiohttp.ClientSession, status_url: str) -> str:
+    """Get status of custom application start."""
+    response = await _request(session, 'GET', status_url, allow_redirects=False)
+    await handle_dr_response(response)
+    # redirection also mean that app was started successfully
+    if response.status == 303:
+        return 'COMPLETED'
+    return (await response.json())['status']
+
+
+async def get_custom_app_sources_list(
+    session: aiohttp.ClientSession, endpoint: str
+) -> List[Dict[str, Any]]:
+    """Get a list of custom application sources."""
+    url = posixpath.join(endpoint, 'customApplicationSources/')
+    return await _get_all_pages(session, url)
+
+
+async def get_custom_app_source_by_id(
+    session: aiohttp.ClientSession, endpoint: str, source_id: str
+) -> Dict[str, Any]:
+    """Get a custom application source by ID."""
+    url = posixpath.join(endpoint, f'customApplicationSources/{source_id}/')
+    return await _get_json(session, url)
+
+
+async def get_custom_app_source_versions_list(
+    session: aiohttp.ClientSession, endpoint: str, source_id: str
+) -> List[Dict[str, Any]]:
+    """Get a list of versions for specific custom application source."""
+    url = posixpath.join(endpoint, f'customApplicationSources/{source_id}/versions/')
+    return await _get_all_pages(session, url)
+
+
+async def get_execution_environments_list(
+    session: aiohttp.ClientSession, endpoint: str, env_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Get a list of execution environments with possibility to filter by name."""
+    url = posixpath.join(endpoint, 'executionEnvironments/')
+    req_params = {'useCases': 'customApplication'}
+    if env_name:
+        req_params['searchFor'] = env_name
+    env_list = await _get_all_pages(session, url, req_params)
+    if env_name:
+        env_list = [ee for ee in env_list if ee['name'] == env_name]
+    return env_list
+
+
+async def get_execution_environment_by_id(
+    session: aiohttp.ClientSession, endpoint: str, base_env_id: str
+) -> Dict[str, Any]:
+    """Get a execution environment by ID."""
+    url = posixpath.join(endpoint, f'executionEnvironments/{base_env_id}/')
+    return await _get_json(session, url)
+
+
+async def get_execution_environment_version_by_id(
+    session: aiohttp.ClientSession, endpoint: str, base_env_id: str, version_id: str
+) -> Dict[str, Any]:
+    """Get a execution environment version by ID."""
+    url = posixpath.join(endpoint, f'executionEnvironments/{base_env_id}/versions/{version_id}/')
+    return await _get_json(session, url)
@@ -0,0 +1,53 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+CACHE_DIR_ENV = 'DRAPPS_CACHE_DIR'
+
+
+def get_user_cache_dir() -> Path:
+    """Get root folder for drapps local state. Can be changed through DRAPPS_CACHE_DIR env."""
+    custom_dir = os.environ.get(CACHE_DIR_ENV)
+    if custom_dir:
+        return Path(custom_dir)
+
+    if sys.platform == 'win32':
+        base_dir = Path(os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local')
+    elif sys.platform == 'darwin':
+        base_dir = Path.home() / 'Library' / 'Caches'
+    else:
+        base_dir = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache')
+    return base_dir / 'drapps'
+
+
+def get_cache_dir(*parts: str) -> Path:
+    """Get (and create if needed) a sub folder inside drapps cache folder."""
+    cache_dir = get_user_cache_dir().joinpath(*parts)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def write_json_file(path: Path, data: Any) -> None:
+    """
+    Write JSON file atomically, so concurrent runs never see half written file. Temporary
+    file has unique name, so runs writing the same file don't break each other.
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as f:
+        tmp_path = Path(f.name)
+    try:
+        with tmp_path.open('w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
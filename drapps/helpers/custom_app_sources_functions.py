@@ -7,12 +7,24 @@
 #
 import json
 import posixpath
-from typing import Any, Dict, List, Optional
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 from requests import Session
+from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
 
 from .exceptions import ClientResponseError
 from .handle_dr_response import handle_dr_response
+from .metadata_cache import SOURCE_ID, get_by_cached_id, set_cached
+from .pagination import iter_pages, iter_paginated
+
+# sizes of application containers accepted by --cpu-size and deploy manifest
+CPU_SIZES = ('2xsmall', 'xsmall', 'small', 'medium', 'large', 'xlarge', '2xlarge')
+# responses meaning that server can't handle several runtime parameters in one request
+BATCH_REJECTED_STATUSES = {400, 422}
+# multipart body is read by blocks of this size when it is compressed on the fly
+COMPRESS_READ_BLOCK_SIZE = 64 * 1024
 
 
 def create_custom_app_source(session: Session, endpoint: str, name: str) -> Dict[str, Any]:
@@ -20,15 +32,24 @@ def create_custom_app_source(session: Session, endpoint: str, name: str) -> Dict
     url = posixpath.join(endpoint, "customApplicationSources/")
     response = session.post(url, json={"name": name})
     handle_dr_response(response)
-    return response.json()
+    app_source = response.json()
+    set_cached(session, endpoint, SOURCE_ID, name, app_source['id'])
+    return app_source
 
 
-def get_custom_app_sources_list(session: Session, endpoint: str) -> List[Dict[str, Any]]:
-    """Get a list of custom application sources."""
+def iter_custom_app_sources(
+    session: Session,
+    endpoint: str,
+    source_name: Optional[str] = None,
+    page_size: Optional[int] = None,
+    prefetch: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over custom application sources from all pages, optionally filtered by name."""
     url = posixpath.join(endpoint, 'customApplicationSources/')
-    response = session.get(url)
-    handle_dr_response(response)
-    return response.json()['data']
+    req_params = {}
+    if source_name:
+        req_params['name'] = source_name
+    return iter_paginated(session, url, req_params, page_size=page_size, prefetch=prefetch)
 
 
 def get_custom_app_source_by_id(session: Session, endpoint: str, source_id: str) -> Dict[str, Any]:
@@ -42,8 +63,12 @@ def get_custom_app_source_by_id(session: Session, endpoint: str, source_id: str)
 def get_custom_app_source_by_name(
     session: Session, endpoint: str, source_name: str
 ) -> Dict[str, Any]:
-    """Get a custom application source by name."""
-    sources = get_custom_app_sources_list(session, endpoint)
+    """
+    Get a custom application source by name. Name filter is sent to the server, sources are
+    still compared by name, because older API versions ignore the filter and return all pages.
+    Then pages are requested one by one until the source is found.
+    """
+    sources = iter_custom_app_sources(session, endpoint, source_name=source_name, prefetch=False)
     for source in sources:
         if source['name'] == source_name:
             return source
@@ -55,34 +80,166 @@ def get_custom_app_source_by_name(
     )
 
 
+def get_custom_app_source(session: Session, endpoint: str, source_name: str) -> Dict[str, Any]:
+    """Get a custom application source by name, using ID from local metadata cache if possible."""
+    return get_by_cached_id(
+        session,
+        endpoint,
+        SOURCE_ID,
+        source_name,
+        lambda source_id: get_custom_app_source_by_id(session, endpoint, source_id),
+        lambda: get_custom_app_source_by_name(session, endpoint, source_name),
+    )
+
+
 def create_application_source_version(
-    session: Session, endpoint: str, source_id: str, version_label: str
+    session: Session,
+    endpoint: str,
+    source_id: str,
+    version_label: str,
+    base_version_id: Optional[str] = None,
 ) -> Dict[str, Any]:
-    """Create new application source version."""
+    """
+    Create new application source version.
+    If base version is set, new version is seeded with files and settings of base version.
+    """
     url = posixpath.join(endpoint, f"customApplicationSources/{source_id}/versions/")
-    response = session.post(url, json={"label": version_label})
+    payload = {"label": version_label}
+    if base_version_id:
+        payload["baseVersion"] = base_version_id
+    response = session.post(url, json=payload)
     handle_dr_response(response)
     return response.json()
 
 
-def update_application_source_version(
+def get_custom_app_source_version_by_id(
+    session: Session, endpoint: str, source_id: str, version_id: str
+) -> Dict[str, Any]:
+    """Get a custom application source version by source ID and version ID."""
+    url = posixpath.join(endpoint, f"customApplicationSources/{source_id}/versions/{version_id}/")
+    response = session.get(url)
+    handle_dr_response(response)
+    return response.json()
+
+
+def is_custom_app_source_version_present(
+    session: Session, endpoint: str, source_id: str, version_id: str
+) -> bool:
+    """Check that version of custom application source still exists."""
+    try:
+        get_custom_app_source_version_by_id(session, endpoint, source_id, version_id)
+    except ClientResponseError as error:
+        if error.status != 404:
+            raise error
+        return False
+    return True
+
+
+def update_application_source_version_multipart(
+    session: Session,
+    endpoint: str,
+    source_id: str,
+    version_id: str,
+    multipart_data: Union[MultipartEncoder, MultipartEncoderMonitor],
+    compress: bool = False,
+):
+    """
+    Make a change to application source version using streamed multipart form.
+    If compress is set, form is gzip compressed on the fly and sent with Content-Encoding.
+    """
+    url = posixpath.join(endpoint, f"customApplicationSources/{source_id}/versions/{version_id}/")
+    headers = {'Content-Type': multipart_data.content_type}
+    data: Any = multipart_data
+    if compress:
+        # compressed size is not known beforehand, so body is sent with chunked encoding
+        data = iter_gzip_compressed(multipart_data)
+        headers['Content-Encoding'] = 'gzip'
+    response = session.patch(url, data=data, headers=headers)
+    handle_dr_response(response)
+
+
+def iter_gzip_compressed(
+    stream: Any, block_size: int = COMPRESS_READ_BLOCK_SIZE
+) -> Iterator[bytes]:
+    """Read stream block by block and generate gzip compressed data."""
+    compressor = zlib.compressobj(wbits=31)
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _iter_multipart_with_stream(
+    boundary: str,
+    fields: Dict[str, Any],
+    stream_field: str,
+    stream_name: str,
+    stream: Iterable[bytes],
+    stream_content_type: str,
+) -> Iterator[bytes]:
+    """
+    Generate multipart/form-data body, where the last part is sent block by block.
+    Field value can be a list of values or (None, value, content type) tuple.
+    """
+    for name, value in fields.items():
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            content_type_header = ''
+            if isinstance(item, tuple):
+                _, item, content_type = item
+                content_type_header = f'Content-Type: {content_type}\r\n'
+            yield (
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n'
+                f'{content_type_header}\r\n'
+                f'{item}\r\n'
+            ).encode()
+    yield (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="{stream_field}"; filename="{stream_name}"\r\n'
+        f'Content-Type: {stream_content_type}\r\n\r\n'
+    ).encode()
+    for block in stream:
+        if block:
+            yield block
+    yield f'\r\n--{boundary}--\r\n'.encode()
+
+
+def upload_application_source_version_archive(
     session: Session,
     endpoint: str,
     source_id: str,
     version_id: str,
     payload: Dict[str, Any],
+    archive_name: str,
+    archive: Iterable[bytes],
+    archive_content_type: str = 'application/x-tar',
 ):
-    """Make a change to application source version."""
+    """
+    Upload project files to application source version as single tar archive.
+    Archive is streamed to server with chunked transfer encoding.
+    """
     url = posixpath.join(endpoint, f"customApplicationSources/{source_id}/versions/{version_id}/")
-    patch_params: Dict[str, Any] = {'data': payload}
-    if 'file' in payload:
-        files_data = payload.pop('file')
-        files = [("file", file) for file in files_data]
-        patch_params['files'] = files
-    response = session.patch(url, **patch_params)
+    boundary = uuid.uuid4().hex
+    body = _iter_multipart_with_stream(
+        boundary, payload, 'archive', archive_name, archive, archive_content_type
+    )
+    headers = {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+    response = session.patch(url, data=body, headers=headers)
     handle_dr_response(response)
 
 
+def get_runtime_params_payload(runtime_params: List[str]) -> str:
+    """Combine runtime params returned by verify_runtime_env_vars into one JSON list."""
+    return json.dumps(
+        [param for param_value in runtime_params for param in json.loads(param_value)]
+    )
+
+
 def update_runtime_params(
     session: Session,
     endpoint: str,
@@ -90,24 +247,34 @@ def update_runtime_params(
     version_id: str,
     runtime_params: List[str],
 ):
+    """
+    Set runtime parameters of application source version in one request.
+    Each runtime param is JSON list with one parameter, as returned by verify_runtime_env_vars.
+    """
+    if not runtime_params:
+        return
     url = posixpath.join(endpoint, f"customApplicationSources/{source_id}/versions/{version_id}/")
 
+    all_params = get_runtime_params_payload(runtime_params)
+    response = session.patch(url, json={'runtimeParameterValues': all_params})
+    if len(runtime_params) == 1 or response.status_code not in BATCH_REJECTED_STATUSES:
+        handle_dr_response(response)
+        return
+
+    # server doesn't accept several parameters at once, sending them one by one
     for param in runtime_params:
         response = session.patch(url, json={'runtimeParameterValues': param})
         handle_dr_response(response)
 
 
-def update_resources(
-    session: Session,
-    endpoint: str,
-    source_id: str,
-    version_id: str,
+def get_resources_payload(
     service_requests_on_root_path: Optional[bool] = None,
     replicas: Optional[int] = None,
     cpu_size: Optional[str] = None,
     session_affinity: Optional[bool] = None,
-):
-    resources = dict()
+) -> Dict[str, Any]:
+    """Prepare resources settings of application source version."""
+    resources: Dict[str, Any] = dict()
     if replicas is not None:
         resources["replicas"] = replicas
     if cpu_size is not None:
@@ -115,22 +282,60 @@ def update_resources(
             cpu_size = 'nano'
         elif cpu_size == 'xsmall':
             cpu_size = 'micro'
-        resources["resourceLabel"] = f'cpu.{cpu_size}'  # type: ignore
+        resources["resourceLabel"] = f'cpu.{cpu_size}'
     if session_affinity is not None:
         resources["sessionAffinity"] = session_affinity
     if service_requests_on_root_path is not None:
         resources["serviceWebRequestsOnRootPath"] = service_requests_on_root_path
+    return resources
+
+
+def update_resources(
+    session: Session,
+    endpoint: str,
+    source_id: str,
+    version_id: str,
+    service_requests_on_root_path: Optional[bool] = None,
+    replicas: Optional[int] = None,
+    cpu_size: Optional[str] = None,
+    session_affinity: Optional[bool] = None,
+):
+    resources = get_resources_payload(
+        service_requests_on_root_path=service_requests_on_root_path,
+        replicas=replicas,
+        cpu_size=cpu_size,
+        session_affinity=session_affinity,
+    )
     url = posixpath.join(endpoint, f"customApplicationSources/{source_id}/versions/{version_id}/")
     form_data = {"resources": (None, json.dumps(resources), 'application/json')}
     rsp = session.patch(url, files=form_data)
     handle_dr_response(rsp)
 
 
-def get_custom_app_source_versions_list(
-    session: Session, endpoint: str, source_id: str
-) -> List[Dict[str, Any]]:
-    """Get a list of versions for specific custom application source."""
+def iter_custom_app_source_versions(
+    session: Session, endpoint: str, source_id: str, page_size: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over versions of custom application source from all pages."""
     url = posixpath.join(endpoint, f'customApplicationSources/{source_id}/versions/')
-    response = session.get(url)
-    handle_dr_response(response)
-    return response.json()['data']
+    return iter_paginated(session, url, page_size=page_size)
+
+
+def get_custom_app_source_versions_count(session: Session, endpoint: str, source_id: str) -> int:
+    """
+    Get number of versions of custom application source. Only one version is requested and
+    the number is taken from totalCount of the page, so versions are not downloaded.
+    """
+    url = posixpath.join(endpoint, f'customApplicationSources/{source_id}/versions/')
+    pages = iter_pages(session, url, page_size=1, prefetch=False)
+    first_page = next(pages, None)
+    if first_page is None:
+        return 0
+    if 'totalCount' in first_page:
+        return first_page['totalCount']
+    if not first_page.get('next'):
+        return len(first_page['data'])
+    # API doesn't report total count, other versions are counted by pages of default size
+    # without keeping them, single-item next links would cost a request per version
+    offset = len(first_page['data'])
+    pages = iter_pages(session, url, params={'offset': offset}, prefetch=False)
+    return offset + sum(len(page['data']) for page in pages)
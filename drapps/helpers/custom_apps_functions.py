@@ -6,18 +6,25 @@
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
 import posixpath
-import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
 
 import click
+from bson import ObjectId
 from requests import Session
 
-from .exceptions import ClientResponseError
+from .exceptions import ClientResponseError, PollingTimeoutError
 from .handle_dr_response import handle_dr_response
+from .metadata_cache import APP_ID, call_with_cached_id, forget_cached, get_by_cached_id, set_cached
+from .pagination import iter_paginated
+from .poller import poll_until
 
 SUCCESS_STATUSES = {'COMPLETED'}
 FAILED_STATUSES = {'ERROR', 'ABORTED', 'EXPIRED'}
 FINAL_STATUSES = SUCCESS_STATUSES | FAILED_STATUSES
+APP_RUNNING_CHECK_INTERVAL = 5
+APP_RUNNING_TIMEOUT = 500
+
+T = TypeVar('T')
 
 
 def create_custom_app(session: Session, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -29,23 +36,32 @@ def create_custom_app(session: Session, endpoint: str, payload: Dict[str, Any])
     response = session.post(url, json=payload)
     handle_dr_response(response)
     app_data = response.json()
+    if app_data.get('id') and payload.get('name'):
+        set_cached(session, endpoint, APP_ID, payload['name'], app_data['id'])
     # adding URL for status checking
     app_data['statusUrl'] = response.headers.get('Location')
     return app_data
 
 
-def get_custom_apps_list(
-    session: Session, endpoint: str, app_name: Optional[str] = None
-) -> List[Dict[str, Any]]:
-    """Get a list of custom application with possibility to filter by application name."""
+def iter_custom_apps(
+    session: Session,
+    endpoint: str,
+    app_name: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over custom applications from all pages, optionally filtered by name."""
     url = posixpath.join(endpoint, 'customApplications/')
     req_params = {}
     if app_name:
         req_params['name'] = app_name
+    return iter_paginated(session, url, req_params, page_size=page_size)
 
-    response = session.get(url, params=req_params)
-    handle_dr_response(response)
-    return response.json()['data']
+
+def get_custom_apps_list(
+    session: Session, endpoint: str, app_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Get a list of custom application with possibility to filter by application name."""
+    return list(iter_custom_apps(session, endpoint, app_name=app_name))
 
 
 def get_custom_app_by_id(session: Session, endpoint: str, app_id: str) -> Dict[str, Any]:
@@ -58,16 +74,55 @@ def get_custom_app_by_id(session: Session, endpoint: str, app_id: str) -> Dict[s
 
 def get_custom_app_by_name(session: Session, endpoint: str, app_name: str) -> Dict[str, Any]:
     """Get a custom application by name."""
-    apps = get_custom_apps_list(session, endpoint, app_name=app_name)
-    if not apps:
-        # imitating that app is not found
-        error_url = posixpath.join(endpoint, 'customApplications/')
-        raise ClientResponseError(
-            status=404,
-            message=f'Can\'t find custom application "{app_name}" by name.',
-            url=error_url,
-        )
-    return next((app for app in apps if app['name'] == app_name))
+    for app in iter_custom_apps(session, endpoint, app_name=app_name):
+        if app['name'] == app_name:
+            return app
+
+    # imitating that app is not found
+    error_url = posixpath.join(endpoint, 'customApplications/')
+    raise ClientResponseError(
+        status=404,
+        message=f'Can\'t find custom application "{app_name}" by name.',
+        url=error_url,
+    )
+
+
+def get_custom_app(session: Session, endpoint: str, app_id_or_name: str) -> Dict[str, Any]:
+    """
+    Get a custom application by ID or name. Name is resolved through local metadata cache,
+    so one application is requested instead of searching the list. Cached ID is used only
+    if application still exists and has the same name.
+    """
+    if ObjectId.is_valid(app_id_or_name):
+        return get_custom_app_by_id(session, endpoint, app_id_or_name)
+    return get_by_cached_id(
+        session,
+        endpoint,
+        APP_ID,
+        app_id_or_name,
+        lambda app_id: get_custom_app_by_id(session, endpoint, app_id),
+        lambda: get_custom_app_by_name(session, endpoint, app_id_or_name),
+    )
+
+
+def call_with_custom_app_id(
+    session: Session, endpoint: str, app_id_or_name: str, action: Callable[[str], T]
+) -> T:
+    """
+    Call read-only action with ID of application. Names are resolved through local metadata
+    cache, if cached ID is outdated, it is resolved again through API. Changes should use
+    get_custom_app, which checks that cached ID still belongs to application with this name.
+    """
+    if ObjectId.is_valid(app_id_or_name):
+        return action(app_id_or_name)
+    return call_with_cached_id(
+        session,
+        endpoint,
+        APP_ID,
+        app_id_or_name,
+        lookup=lambda: get_custom_app_by_name(session, endpoint, app_id_or_name)['id'],
+        action=action,
+    )
 
 
 def get_custom_app_logs(session: Session, endpoint: str, app_id: str) -> Dict[str, Any]:
@@ -83,6 +138,7 @@ def delete_custom_app(session: Session, endpoint: str, app_id: str) -> None:
     url = posixpath.join(endpoint, f'customApplications/{app_id}/')
     response = session.delete(url)
     handle_dr_response(response)
+    forget_cached(session, endpoint, APP_ID, value=app_id)
 
 
 def is_app_name_in_use(session: Session, endpoint: str, name: str) -> bool:
@@ -110,19 +166,28 @@ def update_running_custom_app(
     url = posixpath.join(endpoint, f'customApplications/{app_id}/')
     response = session.patch(url, json=payload)
     handle_dr_response(response)
+    if payload.get('name'):
+        forget_cached(session, endpoint, APP_ID, value=app_id)
+        set_cached(session, endpoint, APP_ID, payload['name'], app_id)
 
 
 def wait_for_app_to_be_running(session: Session, endpoint: str, app_id: str):
     click.echo("Waiting for publish to complete.")
-    for _ in range(100):
-        app = get_custom_app_by_id(session=session, endpoint=endpoint, app_id=app_id)
-        if app['status'] == 'running':
-            click.echo("New App is ready!")
-            return
-        elif app['status'] == 'failed':
-            click.echo("App failed to start.")
-            return
-        time.sleep(5)
+    try:
+        result = poll_until(
+            check=lambda: get_custom_app_by_id(session=session, endpoint=endpoint, app_id=app_id),
+            is_done=lambda app: app['status'] in ('running', 'failed'),
+            timeout=APP_RUNNING_TIMEOUT,
+            max_interval=APP_RUNNING_CHECK_INTERVAL,
+            description=f'Publishing of application {app_id}',
+        )
+    except PollingTimeoutError as error:
+        # publish itself is done, application is just slow to start
+        raise click.ClickException(f'{error}. Check application status later.') from error
+    if result.value['status'] == 'running':
+        click.echo("New App is ready!")
+    else:
+        click.echo("App failed to start.")
 
 
 def get_history_by_index(
@@ -0,0 +1,131 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import yaml
+from click import BadParameter, UsageError
+
+from .custom_app_sources_functions import CPU_SIZES
+
+APP_KEYS = {
+    'name',
+    'base-env',
+    'path',
+    'image',
+    'replicas',
+    'cpu-size',
+    'use-session-affinity',
+    'service-requests-on-root-path',
+    'stringEnvVar',
+    'numericEnvVar',
+    'booleanEnvVar',
+}
+
+
+class AppSpec(NamedTuple):
+    """Settings of one custom application from deploy manifest."""
+
+    name: str
+    base_env: Optional[str]
+    path: Optional[Path]
+    image: Optional[Path]
+    replicas: int
+    cpu_size: str
+    use_session_affinity: Optional[bool]
+    service_requests_on_root_path: Optional[bool]
+    string_env_vars: Dict[str, str]
+    numeric_env_vars: Dict[str, str]
+    boolean_env_vars: Dict[str, str]
+
+
+def _get_env_vars(app: Dict[str, Any], key: str) -> Dict[str, str]:
+    env_vars = app.get(key) or {}
+    if not isinstance(env_vars, dict):
+        raise UsageError(f'{key} of application {app["name"]} should be a mapping KEY: VALUE.')
+    return {str(name): str(value) for name, value in env_vars.items()}
+
+
+def _get_path(app: Dict[str, Any], key: str, manifest_folder: Path) -> Optional[Path]:
+    if not app.get(key):
+        return None
+    # relative paths are counted from manifest folder, not from current one
+    path = (manifest_folder / app[key]).resolve()
+    if not path.exists():
+        raise UsageError(f'{key} {path} of application {app["name"]} does not exist.')
+    return path
+
+
+def _get_replicas(app: Dict[str, Any], settings: Dict[str, Any]) -> int:
+    value = settings['replicas']
+    try:
+        # bool is an int in Python, but "replicas: yes" is surely a mistake
+        replicas = int(value) if not isinstance(value, (bool, float)) else 0
+    except (TypeError, ValueError):
+        replicas = 0
+    if replicas < 1:
+        message = f'{value!r} of application {app["name"]} is not a positive integer.'
+        raise BadParameter(message, param_hint='replicas')
+    return replicas
+
+
+def _get_cpu_size(app: Dict[str, Any], settings: Dict[str, Any]) -> str:
+    cpu_size = settings['cpu-size']
+    if cpu_size not in CPU_SIZES:
+        sizes = ', '.join(CPU_SIZES)
+        message = f'{cpu_size!r} of application {app["name"]} is not one of: {sizes}.'
+        raise BadParameter(message, param_hint='cpu-size')
+    return cpu_size
+
+
+def read_deploy_manifest(manifest_file: Path, defaults: Dict[str, Any]) -> List[AppSpec]:
+    """
+    Read list of applications from deploy manifest. Values that are not set for
+    application are taken from defaults (command line options).
+    """
+    try:
+        with manifest_file.open('r') as f:
+            manifest = yaml.safe_load(f)
+    except yaml.YAMLError as error:
+        raise UsageError(f'Error parsing deploy manifest: {error}')
+
+    apps = manifest.get('apps') if isinstance(manifest, dict) else None
+    if not apps or not isinstance(apps, list):
+        raise UsageError('Deploy manifest should have non empty list of applications (apps).')
+
+    app_specs = []
+    for app in apps:
+        if not isinstance(app, dict) or not app.get('name'):
+            raise UsageError('Every application in deploy manifest should have a name.')
+        unknown_keys = set(app) - APP_KEYS
+        if unknown_keys:
+            keys = ', '.join(sorted(unknown_keys))
+            raise UsageError(f'Unknown settings of application {app["name"]}: {keys}.')
+        settings = {**defaults, **app}
+        app_specs.append(
+            AppSpec(
+                name=str(app['name']),
+                # default environment makes sense only for applications from project folder
+                base_env=app.get('base-env') if app.get('image') else settings.get('base-env'),
+                path=_get_path(app, 'path', manifest_file.parent),
+                image=_get_path(app, 'image', manifest_file.parent),
+                replicas=_get_replicas(app, settings),
+                cpu_size=_get_cpu_size(app, settings),
+                use_session_affinity=settings.get('use-session-affinity'),
+                service_requests_on_root_path=settings.get('service-requests-on-root-path'),
+                string_env_vars=_get_env_vars(app, 'stringEnvVar'),
+                numeric_env_vars=_get_env_vars(app, 'numericEnvVar'),
+                boolean_env_vars=_get_env_vars(app, 'booleanEnvVar'),
+            )
+        )
+
+    names = [app_spec.name for app_spec in app_specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise UsageError(f'Application names in deploy manifest are not unique: {duplicates}.')
+    return app_specs
@@ -6,7 +6,7 @@
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
 
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 
 class ClientResponseError(Exception):
@@ -22,3 +22,17 @@ class ClientResponseError(Exception):
         if self.errors:
             return f'{self.status}, message={self.message}, url={self.url}, errors={self.errors}'
         return f'{self.status}, message={self.message}, url={self.url}'
+
+
+class PollingTimeoutError(Exception):
+    def __init__(self, description: str, polls: int, elapsed: float, last_value: Any = None):
+        self.description = description
+        self.polls = polls
+        self.elapsed = elapsed
+        self.last_value = last_value
+
+    def __str__(self) -> str:
+        return (
+            f'{self.description} timed out after {self.elapsed:.0f} seconds '
+            f'and {self.polls} status checks, last status: {self.last_value}'
+        )
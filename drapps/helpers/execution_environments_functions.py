@@ -6,18 +6,29 @@
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
 import posixpath
+import re
 from collections import namedtuple
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
 
+from bson import ObjectId
 from requests import Session
 from requests_toolbelt import MultipartEncoder, MultipartEncoderMonitor
 
 from .exceptions import ClientResponseError
 from .handle_dr_response import handle_dr_response
+from .metadata_cache import ENV_ID, ENV_LATEST_VERSION_ID, forget_cached, get_by_cached_id
+from .pagination import iter_paginated
 
 IMAGE_BUILD_SUCCESS_STATUSES = {'success'}
 IMAGE_BUILD_FAILED_STATUSES = {'failed'}
 IMAGE_BUILD_FINAL_STATUSES = IMAGE_BUILD_SUCCESS_STATUSES | IMAGE_BUILD_FAILED_STATUSES
+# build log lines after which image build can't succeed
+BUILD_LOG_FATAL_PATTERNS = (
+    r'ERROR: failed to solve',
+    r'ERROR: (Could not find a version|No matching distribution found)',
+    r'no space left on device',
+    r'returned a non-zero code',
+)
 
 
 def create_execution_environment(
@@ -33,23 +44,32 @@ def create_execution_environment(
     return response.json()
 
 
-def get_execution_environments_list(
-    session: Session, endpoint: str, env_name: Optional[str] = None
-) -> List[Dict[str, Any]]:
-    """Get a list of execution environments with possibility to filter by name."""
+def iter_execution_environments(
+    session: Session,
+    endpoint: str,
+    env_name: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over execution environments for custom applications from all pages.
+    If env_name is set, only environments with exactly this name are returned.
+    """
     url = posixpath.join(endpoint, 'executionEnvironments/')
     req_params = {'useCases': 'customApplication'}
     if env_name:
         req_params['searchFor'] = env_name
 
-    response = session.get(url, params=req_params)
-    handle_dr_response(response)
+    for ee in iter_paginated(session, url, req_params, page_size=page_size):
+        # search is done by substring, so other environments can be in the result
+        if not env_name or ee['name'] == env_name:
+            yield ee
 
-    env_list = response.json()['data']
-    if env_name:
-        env_list = [ee for ee in env_list if ee['name'] == env_name]
 
-    return env_list
+def get_execution_environments_list(
+    session: Session, endpoint: str, env_name: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Get a list of execution environments with possibility to filter by name."""
+    return list(iter_execution_environments(session, endpoint, env_name=env_name))
 
 
 def get_execution_environment_by_id(
@@ -66,14 +86,33 @@ def get_execution_environment_by_name(
     session: Session, endpoint: str, base_env_name: str
 ) -> Dict[str, Any]:
     """Get an execution environment by name."""
-    envs = get_execution_environments_list(session, endpoint, env_name=base_env_name)
-    if not envs:
+    env = next(iter_execution_environments(session, endpoint, env_name=base_env_name), None)
+    if env is None:
         # imitating that environment is not found
         error_url = posixpath.join(endpoint, 'executionEnvironments/')
         raise ClientResponseError(
             status=404, message='Can\'t find execution environment by name.', url=error_url
         )
-    return envs[0]
+    return env
+
+
+def get_execution_environment(
+    session: Session, endpoint: str, env_id_or_name: str
+) -> Dict[str, Any]:
+    """
+    Get an execution environment by ID or name. Name is resolved through local metadata cache,
+    so environment is requested by ID instead of searching the list.
+    """
+    if ObjectId.is_valid(env_id_or_name):
+        return get_execution_environment_by_id(session, endpoint, env_id_or_name)
+    return get_by_cached_id(
+        session,
+        endpoint,
+        ENV_ID,
+        env_id_or_name,
+        lambda env_id: get_execution_environment_by_id(session, endpoint, env_id),
+        lambda: get_execution_environment_by_name(session, endpoint, env_id_or_name),
+    )
 
 
 def create_execution_environment_version(
@@ -88,6 +127,8 @@ def create_execution_environment_version(
         url, data=multipart_data, headers={'Content-Type': multipart_data.content_type}
     )
     handle_dr_response(response)
+    # environment can be cached by any of its names or ID, so all latest versions are dropped
+    forget_cached(session, endpoint, ENV_LATEST_VERSION_ID)
     return response.json()
 
 
@@ -114,3 +155,36 @@ def get_execution_environment_version_buildlog(
     handle_dr_response(response)
     rsp_json = response.json()
     return BuildLog(rsp_json['error'], rsp_json['log'])
+
+
+class BuildLogTail:
+    """
+    Keeps position in build log of execution environment version, so every time only
+    new complete lines are returned. Lines matching abort patterns are remembered.
+    """
+
+    def __init__(self, abort_patterns: Sequence[str] = ()):
+        self.position = 0
+        self.abort_patterns = [re.compile(pattern) for pattern in abort_patterns]
+        self.fatal_line: Optional[str] = None
+
+    def feed(self, log: str, final: bool = False) -> List[str]:
+        """Get new lines from the whole log. Last incomplete line is returned only if final."""
+        if len(log) < self.position:
+            # log was restarted, e.g. by build retry
+            self.position = 0
+        new_text = log[self.position :]
+        if not final:
+            new_text = new_text[: new_text.rfind('\n') + 1]
+        self.position += len(new_text)
+        lines = new_text.splitlines()
+        if self.fatal_line is None:
+            self.fatal_line = next(
+                (
+                    line
+                    for line in lines
+                    if any(pattern.search(line) for pattern in self.abort_patterns)
+                ),
+                None,
+            )
+        return lines
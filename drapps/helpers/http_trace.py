@@ -0,0 +1,193 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+import math
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from time import monotonic, time
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests import PreparedRequest, Response, Session
+from tabulate import tabulate
+
+# IDs in URL paths are replaced, so requests to the same endpoint are grouped together
+OBJECT_ID_PATTERN = re.compile(r'(?<=/)[0-9a-f]{24}(?=/|$)')
+
+_active_trace: Optional['HttpTrace'] = None
+
+
+def get_url_template(url: str) -> str:
+    """Path of URL without query and with {id} instead of IDs."""
+    return OBJECT_ID_PATTERN.sub('{id}', urlsplit(url).path)
+
+
+def _get_body_size(body: Any) -> Optional[int]:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    if isinstance(body, (bytes, bytearray)):
+        return len(body)
+    return None
+
+
+def _get_retries(response: Response) -> int:
+    retries = getattr(response.raw, 'retries', None)
+    return len(retries.history) if retries is not None else 0
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class _CountingIterator:
+    """Streamed request body, which counts bytes that were sent."""
+
+    def __init__(self, body: Iterable[bytes]):
+        self.body = body
+        self.size = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for block in self.body:
+            self.size += len(block)
+            yield block
+
+
+class HttpTrace:
+    """
+    Records every API request as JSON line to trace file and collects statistics
+    for the summary printed at the end of the command.
+    """
+
+    def __init__(self, trace_file: IO[str]):
+        self.trace_file = trace_file
+        self.records: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def record(self, record: Dict[str, Any]) -> None:
+        # uploads are sent from several threads at once
+        with self.lock:
+            self.records.append(record)
+            self.trace_file.write(json.dumps(record) + '\n')
+            self.trace_file.flush()
+
+    def get_summary(self) -> str:
+        """Table with number of requests, bytes and p50/p95 latency per endpoint."""
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for record in self.records:
+            groups[(record['method'], record['urlTemplate'])].append(record)
+
+        rows = []
+        for (method, url_template), records in sorted(groups.items()):
+            latencies = sorted(record['latency'] for record in records)
+            rows.append(
+                (
+                    method,
+                    url_template,
+                    len(records),
+                    sum(record['retries'] for record in records),
+                    sum(record['bytesSent'] or 0 for record in records),
+                    sum(record['bytesReceived'] or 0 for record in records),
+                    f'{_percentile(latencies, 50):.3f}',
+                    f'{_percentile(latencies, 95):.3f}',
+                )
+            )
+        headers = (
+            'method',
+            'endpoint',
+            'requests',
+            'retries',
+            'sent',
+            'received',
+            'p50, s',
+            'p95, s',
+        )
+        table = tabulate(rows, headers=headers, tablefmt='simple')
+        total_sent = sum(row[4] for row in rows)
+        total_received = sum(row[5] for row in rows)
+        return (
+            f'{table}\n'
+            f'{len(self.records)} requests, {total_sent} bytes sent, '
+            f'{total_received} bytes received, '
+            f'{sum(record["latency"] for record in self.records):.3f}s in requests.'
+        )
+
+
+class TracedSession(Session):
+    """Session that reports every sent request to the active trace."""
+
+    def __init__(self, trace: HttpTrace):
+        super().__init__()
+        self.trace = trace
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:  # type: ignore[override]
+        bytes_sent = _get_body_size(request.body)
+        counting_body = None
+        if bytes_sent is None:
+            content_length = request.headers.get('Content-Length')
+            if content_length:
+                bytes_sent = int(content_length)
+            else:
+                # chunked body (e.g. compressed on the fly) is counted while it is sent
+                counting_body = _CountingIterator(request.body)  # type: ignore[arg-type]
+                request.body = counting_body  # type: ignore[assignment]
+
+        record: Dict[str, Any] = {
+            'time': round(time(), 3),
+            'method': request.method,
+            'urlTemplate': get_url_template(str(request.url)),
+        }
+        started = monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as error:
+            record.update(status=None, error=type(error).__name__, retries=0, bytesReceived=0)
+            raise
+        else:
+            content_length = response.headers.get('Content-Length')
+            if content_length:
+                bytes_received: Optional[int] = int(content_length)
+            elif not kwargs.get('stream'):
+                bytes_received = len(response.content)
+            else:
+                bytes_received = None
+            record.update(
+                status=response.status_code,
+                retries=_get_retries(response),
+                bytesReceived=bytes_received,
+            )
+            return response
+        finally:
+            record['bytesSent'] = counting_body.size if counting_body else bytes_sent
+            record['latency'] = round(monotonic() - started, 6)
+            self.trace.record(record)
+
+
+def get_active_trace() -> Optional[HttpTrace]:
+    return _active_trace
+
+
+def start_trace(trace_path: Path) -> HttpTrace:
+    """Start tracing of requests sent by API sessions created after this call."""
+    global _active_trace
+    _active_trace = HttpTrace(trace_path.open('w'))
+    return _active_trace
+
+
+def stop_trace() -> Optional[HttpTrace]:
+    """Stop tracing, close trace file and return the finished trace."""
+    global _active_trace
+    trace, _active_trace = _active_trace, None
+    if trace is not None:
+        trace.trace_file.close()
+    return trace
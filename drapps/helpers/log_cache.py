@@ -0,0 +1,188 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+import os
+from array import array
+from collections import deque
+from datetime import datetime
+from typing import Deque, Iterator, List, Optional, Pattern
+
+from .cache_dir import get_cache_dir, write_json_file
+from .log_cursor import LogCursor, get_line_timestamp
+
+LOGS_FOLDER = 'logs'
+LOG_CACHE_FORMAT_VERSION = 1
+# lines are read from cached log by blocks, so the whole log is never loaded into memory
+QUERY_CHUNK_LINES = 10_000
+# how many lines are read at once when looking for the previous line with timestamp
+TIMESTAMP_LOOKBEHIND_LINES = 100
+
+
+def _format_timestamp(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class LogCache:
+    """
+    Append-only local copy of application log. New lines are appended to <app_id>.log,
+    byte offset of every line is kept in <app_id>.idx, so tail and time window queries
+    read only needed part of the log. Cursor state is kept in <app_id>.json, so next
+    download adds only lines that were not cached yet.
+    """
+
+    def __init__(self, app_id: str):
+        logs_folder = get_cache_dir(LOGS_FOLDER)
+        self.app_id = app_id
+        self.log_path = logs_folder / f'{app_id}.log'
+        self.offsets_path = logs_folder / f'{app_id}.idx'
+        self.state_path = logs_folder / f'{app_id}.json'
+        self.offsets = array('Q')
+        self.size = 0
+        self.cursor = LogCursor()
+
+    @classmethod
+    def load(cls, app_id: str) -> 'LogCache':
+        """Load cached log of application, broken cache is dropped and filled again."""
+        log_cache = cls(app_id)
+        if not log_cache.state_path.exists():
+            return log_cache
+        try:
+            with log_cache.state_path.open('r') as f:
+                state = json.load(f)
+            if state.get('version') != LOG_CACHE_FORMAT_VERSION:
+                raise ValueError('unknown cache format')
+            line_count, size = state['lineCount'], state['size']
+            with log_cache.offsets_path.open('rb') as f:
+                offsets_data = f.read(line_count * log_cache.offsets.itemsize)
+            log_cache.offsets.frombytes(offsets_data)
+            if len(log_cache.offsets) != line_count or log_cache.log_path.stat().st_size < size:
+                raise ValueError('cache is not complete')
+            # lines appended by interrupted run are not in the state, dropping them
+            os.truncate(log_cache.log_path, size)
+            os.truncate(log_cache.offsets_path, len(offsets_data))
+            log_cache.size = size
+            log_cache.cursor.line_count = state['cursor']['lineCount']
+            log_cache.cursor.tail.extend(state['cursor']['tail'])
+        except (OSError, ValueError, KeyError, TypeError):
+            log_cache.clear()
+        return log_cache
+
+    @property
+    def exists(self) -> bool:
+        return self.state_path.exists()
+
+    @property
+    def line_count(self) -> int:
+        return len(self.offsets)
+
+    def clear(self) -> None:
+        """Remove cached log of application."""
+        for path in (self.state_path, self.offsets_path, self.log_path):
+            path.unlink(missing_ok=True)
+        self.offsets = array('Q')
+        self.size = 0
+        self.cursor = LogCursor()
+
+    def append(self, log: str) -> int:
+        """
+        Append lines of fetched log, that were not cached yet. If log was rotated on the server,
+        the new log is appended after the old one. Returns number of appended lines.
+        """
+        # every record returned by API is complete, even without line break at the end
+        if log and not log.endswith(('\n', '\r')):
+            log += '\n'
+        new_lines = self.cursor.update(log).text.splitlines(keepends=True)
+        if not new_lines and self.exists:
+            return 0
+
+        data = [line.encode() for line in new_lines]
+        new_offsets = array('Q')
+        for line_data in data:
+            new_offsets.append(self.size)
+            self.size += len(line_data)
+        with self.log_path.open('ab') as f:
+            f.write(b''.join(data))
+        with self.offsets_path.open('ab') as f:
+            f.write(new_offsets.tobytes())
+        self.offsets.extend(new_offsets)
+        self._save_state()
+        return len(new_lines)
+
+    def _save_state(self) -> None:
+        state = {
+            'version': LOG_CACHE_FORMAT_VERSION,
+            'lineCount': self.line_count,
+            'size': self.size,
+            'cursor': {'lineCount': self.cursor.line_count, 'tail': list(self.cursor.tail)},
+        }
+        # state is written after lines, so it never points to data that was not written
+        write_json_file(self.state_path, state)
+
+    def _read_lines(self, start: int, end: int) -> List[str]:
+        if start >= end:
+            return []
+        end_offset = self.offsets[end] if end < self.line_count else self.size
+        with self.log_path.open('rb') as f:
+            f.seek(self.offsets[start])
+            data = f.read(end_offset - self.offsets[start])
+        return data.decode(errors='replace').splitlines()
+
+    def iter_lines(self, start: int = 0, end: Optional[int] = None) -> Iterator[str]:
+        """Iterate over cached lines with numbers from start till end."""
+        end = self.line_count if end is None else min(end, self.line_count)
+        for chunk_start in range(start, end, QUERY_CHUNK_LINES):
+            yield from self._read_lines(chunk_start, min(chunk_start + QUERY_CHUNK_LINES, end))
+
+    def _get_timestamp_at(self, line_number: int) -> str:
+        """Timestamp of the line, lines without it (e.g. traceback) belong to previous line."""
+        end = line_number + 1
+        while end > 0:
+            start = max(0, end - TIMESTAMP_LOOKBEHIND_LINES)
+            for line in reversed(self._read_lines(start, end)):
+                timestamp = get_line_timestamp(line)
+                if timestamp:
+                    return timestamp
+            end = start
+        return ''
+
+    def find_line(self, moment: datetime) -> int:
+        """
+        Find number of the first line logged at the moment or later. Log lines are
+        expected to be ordered by time, so binary search reads only a few lines.
+        """
+        timestamp = _format_timestamp(moment)
+        low, high = 0, self.line_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._get_timestamp_at(middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def query(
+        self,
+        pattern: Optional[Pattern[str]] = None,
+        tail: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[str]:
+        """
+        Get cached lines logged in [since, until) time window, that match pattern.
+        If tail is set, only tail last of them are returned.
+        """
+        start = self.find_line(since) if since else 0
+        end = self.find_line(until) if until else self.line_count
+        if pattern is None:
+            if tail is not None:
+                start = max(start, end - tail)
+            return list(self.iter_lines(start, end))
+
+        matched: Deque[str] = deque(maxlen=tail)
+        matched.extend(line for line in self.iter_lines(start, end) if pattern.search(line))
+        return list(matched)
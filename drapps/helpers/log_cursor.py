@@ -0,0 +1,107 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import heapq
+import re
+from collections import deque
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# number of last seen lines used for finding our position after log rotation
+TAIL_LINES = 20
+
+
+class LogUpdate(NamedTuple):
+    """New part of the log and flag that log was truncated or rotated since last check."""
+
+    text: str
+    truncated: bool
+
+
+class LogCursor:
+    """
+    Position in application log, that is returned by API as a whole every time.
+    Only line counter and a short tail of seen lines are kept in memory, tail is used
+    for detecting that server truncated or rotated the log.
+    """
+
+    def __init__(self, tail_lines: int = TAIL_LINES):
+        self.line_count = 0
+        # part of the last line, that was emitted before line was completed
+        self.partial = ''
+        self.tail: Deque[str] = deque(maxlen=tail_lines)
+
+    def _find_position(self, lines: List[str]) -> int:
+        """Find number of already seen lines in new log, -1 if we lost our position."""
+        tail = list(self.tail)
+        if not tail:
+            return 0
+        start = self.line_count - len(tail)
+        if start >= 0 and lines[start : self.line_count] == tail:
+            return self.line_count
+        # beginning of the log was dropped, looking for the last seen lines
+        for end in range(min(len(lines), self.line_count), len(tail) - 1, -1):
+            if lines[end - len(tail) : end] == tail:
+                return end
+        return -1
+
+    def update(self, log: str) -> LogUpdate:
+        """Get part of the log that was not returned yet."""
+        lines = log.splitlines(keepends=True)
+        position = self._find_position(lines)
+        truncated = position < 0
+        prefix = ''
+        if truncated:
+            # finishing already emitted part of the line, it won't be completed
+            prefix = '\n' if self.partial else ''
+            position, self.partial = 0, ''
+
+        new_lines = lines[position:]
+        text = ''.join(new_lines)
+        if self.partial and new_lines and new_lines[0].startswith(self.partial):
+            text = text[len(self.partial) :]
+        text = prefix + text
+
+        # incomplete last line is not counted till it is finished
+        if new_lines and not new_lines[-1].endswith(('\n', '\r')):
+            self.partial = new_lines.pop()
+        else:
+            self.partial = ''
+        self.tail.extend(new_lines)
+        self.line_count = position + len(new_lines)
+        return LogUpdate(text=text, truncated=truncated)
+
+
+# ISO-like timestamp at the beginning of log record, e.g. 2024-01-31 12:00:00.123
+TIMESTAMP_PATTERN = re.compile(r'^\[?(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)')
+
+
+def get_line_timestamp(line: str) -> Optional[str]:
+    """Get timestamp from the beginning of log line in a form that can be compared as string."""
+    match = TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    return match.group(1).replace('T', ' ').replace(',', '.')
+
+
+def merge_by_timestamp(lines_by_source: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+    """
+    Merge lines from several logs into one list of (source, line) ordered by leading
+    timestamps. Lines without timestamp (e.g. traceback) stay after the previous line
+    of the same log, order of lines inside one log is never changed.
+    """
+
+    def keyed(source: str, lines: List[str]) -> Iterator[Tuple[str, str, str]]:
+        timestamp = ''
+        for line in lines:
+            timestamp = get_line_timestamp(line) or timestamp
+            yield timestamp, source, line
+
+    merged = heapq.merge(
+        *(keyed(source, lines) for source, lines in lines_by_source.items()),
+        key=lambda item: item[0],
+    )
+    return [(source, line) for _, source, line in merged]
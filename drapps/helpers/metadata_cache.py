@@ -0,0 +1,186 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+"""
+Persistent cache of name -> ID resolutions, so commands don't list entities every time
+they get a name. Cache is only a shortcut: entries expire after TTL, are removed or
+updated when drapps changes the entity, and ID that API doesn't know anymore (404)
+is resolved again through the network.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from requests import Session
+
+from .cache_dir import get_cache_dir
+from .exceptions import ClientResponseError
+
+T = TypeVar('T')
+
+METADATA_CACHE_FILE = 'metadata.sqlite3'
+# set to 0 to always resolve names through API
+METADATA_CACHE_ENV = 'DRAPPS_METADATA_CACHE'
+# kinds of cached values
+APP_ID = 'app'
+SOURCE_ID = 'source'
+ENV_ID = 'env'
+ENV_LATEST_VERSION_ID = 'env_version'
+# names are rarely moved to other entities, but latest environment version can be
+# built by anyone at any moment, so it is kept only for a short time
+KIND_TTL = {
+    APP_ID: 24 * 3600,
+    SOURCE_ID: 24 * 3600,
+    ENV_ID: 24 * 3600,
+    ENV_LATEST_VERSION_ID: 300,
+}
+SQLITE_TIMEOUT = 5
+
+
+def is_metadata_cache_enabled() -> bool:
+    return os.environ.get(METADATA_CACHE_ENV, '1') != '0'
+
+
+def _connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(str(get_cache_dir() / METADATA_CACHE_FILE), timeout=SQLITE_TIMEOUT)
+    connection.execute(
+        'CREATE TABLE IF NOT EXISTS metadata ('
+        'scope TEXT, kind TEXT, name TEXT, value TEXT, updated_at REAL, '
+        'PRIMARY KEY (scope, kind, name))'
+    )
+    return connection
+
+
+def _get_scope(session: Session, endpoint: str) -> str:
+    """Different users and DataRobot installations see different entities."""
+    authorization = str(session.headers.get('Authorization', ''))
+    return hashlib.sha256(f'{endpoint}\n{authorization}'.encode()).hexdigest()
+
+
+def get_cached(session: Session, endpoint: str, kind: str, name: str) -> Optional[str]:
+    """Get cached value, None if it is not cached or expired."""
+    if not is_metadata_cache_enabled():
+        return None
+    try:
+        with closing(_connect()) as connection:
+            row = connection.execute(
+                'SELECT value FROM metadata '
+                'WHERE scope = ? AND kind = ? AND name = ? AND updated_at > ?',
+                (_get_scope(session, endpoint), kind, name, time.time() - KIND_TTL[kind]),
+            ).fetchone()
+    except sqlite3.Error:
+        # broken cache shouldn't break commands
+        return None
+    return row[0] if row else None
+
+
+def set_cached(session: Session, endpoint: str, kind: str, name: str, value: str) -> None:
+    """Store value in the cache."""
+    if not is_metadata_cache_enabled():
+        return
+    try:
+        with closing(_connect()) as connection, connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?)',
+                (_get_scope(session, endpoint), kind, name, value, time.time()),
+            )
+    except sqlite3.Error:
+        pass
+
+
+def forget_cached(
+    session: Session,
+    endpoint: str,
+    kind: str,
+    name: Optional[str] = None,
+    value: Optional[str] = None,
+) -> None:
+    """Remove cached entries by name or by value (e.g. all names of deleted application)."""
+    if not is_metadata_cache_enabled():
+        return
+    query = 'DELETE FROM metadata WHERE scope = ? AND kind = ?'
+    params = [_get_scope(session, endpoint), kind]
+    if name is not None:
+        query += ' AND name = ?'
+        params.append(name)
+    if value is not None:
+        query += ' AND value = ?'
+        params.append(value)
+    try:
+        with closing(_connect()) as connection, connection:
+            connection.execute(query, params)
+    except sqlite3.Error:
+        pass
+
+
+def resolve_cached(
+    session: Session, endpoint: str, kind: str, name: str, lookup: Callable[[], str]
+) -> Tuple[str, bool]:
+    """
+    Get value from cache or from lookup, that goes to API and its result is cached.
+    Returns value and flag that it came from cache.
+    """
+    value = get_cached(session, endpoint, kind, name)
+    if value is not None:
+        return value, True
+    value = lookup()
+    set_cached(session, endpoint, kind, name, value)
+    return value, False
+
+
+def get_by_cached_id(
+    session: Session,
+    endpoint: str,
+    kind: str,
+    name: str,
+    get_by_id: Callable[[str], Dict[str, Any]],
+    get_by_name: Callable[[], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Get entity by name, requesting only one entity by cached ID instead of searching the list.
+    Cached ID is used only if entity still exists and has the same name.
+    """
+    cached_id = get_cached(session, endpoint, kind, name)
+    if cached_id:
+        try:
+            entity = get_by_id(cached_id)
+            if entity['name'] == name:
+                return entity
+        except ClientResponseError as error:
+            if error.status != 404:
+                raise
+        forget_cached(session, endpoint, kind, name=name)
+
+    entity = get_by_name()
+    set_cached(session, endpoint, kind, name, entity['id'])
+    return entity
+
+
+def call_with_cached_id(
+    session: Session,
+    endpoint: str,
+    kind: str,
+    name: str,
+    lookup: Callable[[], str],
+    action: Callable[[str], T],
+) -> T:
+    """
+    Resolve name to ID and call action with it. If API doesn't know cached ID anymore,
+    cache entry is dropped and action is repeated with ID resolved through API.
+    """
+    entity_id, from_cache = resolve_cached(session, endpoint, kind, name, lookup)
+    try:
+        return action(entity_id)
+    except ClientResponseError as error:
+        if error.status != 404 or not from_cache:
+            raise
+    forget_cached(session, endpoint, kind, name=name)
+    entity_id, _ = resolve_cached(session, endpoint, kind, name, lookup)
+    return action(entity_id)
@@ -0,0 +1,71 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional
+
+from requests import Session
+
+from .handle_dr_response import handle_dr_response
+
+
+def _get_page(session: Session, url: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    response = session.get(url, params=params)
+    handle_dr_response(response)
+    return response.json()
+
+
+def iter_pages(
+    session: Session,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    page_size: Optional[int] = None,
+    prefetch: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over pages of list API following `next` links. If prefetch is set, the next page
+    is requested in background thread while the current one is consumed.
+    Page size is the server default, unless page_size is set.
+    """
+    params = dict(params or {})
+    if page_size:
+        params['limit'] = page_size
+    page = _get_page(session, url, params)
+    if not prefetch:
+        while True:
+            yield page
+            if not page.get('next'):
+                return
+            # next link already has all query parameters
+            page = _get_page(session, page['next'], None)
+
+    # single worker keeps pages in order, while consumer works with the previous one
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        while True:
+            next_page: Optional[Future] = None
+            if page.get('next'):
+                next_page = executor.submit(_get_page, session, page['next'], None)
+            yield page
+            if next_page is None:
+                return
+            page = next_page.result()
+    finally:
+        # consumer can stop early, page that is loading is not needed anymore
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_paginated(
+    session: Session,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    page_size: Optional[int] = None,
+    prefetch: bool = True,
+) -> Iterator[Dict[str, Any]]:
+    """Iterate over items from all pages of list API."""
+    for page in iter_pages(session, url, params, page_size=page_size, prefetch=prefetch):
+        yield from page['data']
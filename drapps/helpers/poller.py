@@ -0,0 +1,67 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import random
+from time import monotonic, sleep
+from typing import Any, Callable, NamedTuple, Optional, TypeVar
+
+from .exceptions import PollingTimeoutError
+
+T = TypeVar('T')
+
+# first status check is repeated quickly, most operations finish in a few seconds
+FIRST_POLL_INTERVAL = 1
+POLL_BACKOFF_FACTOR = 1.5
+POLL_JITTER = 0.1
+
+
+class PollResult(NamedTuple):
+    """Last checked value and statistics of polling."""
+
+    value: Any
+    polls: int
+    elapsed: float
+
+
+def poll_until(
+    check: Callable[[], T],
+    is_done: Callable[[T], bool],
+    timeout: float,
+    max_interval: float,
+    first_interval: float = FIRST_POLL_INTERVAL,
+    backoff_factor: float = POLL_BACKOFF_FACTOR,
+    jitter: float = POLL_JITTER,
+    on_poll: Optional[Callable[[T], None]] = None,
+    description: str = 'operation',
+) -> PollResult:
+    """
+    Call check till is_done returns True for its result. First check is made immediately,
+    then interval grows from first_interval to max_interval. Every interval is randomly
+    changed by jitter share, so parallel pollers don't hit API at the same moment.
+    Raises PollingTimeoutError if operation is not done in timeout seconds.
+    """
+    started_at = monotonic()
+    deadline = started_at + timeout
+    interval = min(first_interval, max_interval)
+    polls = 0
+    while True:
+        value = check()
+        polls += 1
+        if is_done(value):
+            return PollResult(value=value, polls=polls, elapsed=monotonic() - started_at)
+        if on_poll:
+            on_poll(value)
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            raise PollingTimeoutError(
+                description=description,
+                polls=polls,
+                elapsed=monotonic() - started_at,
+                last_value=value,
+            )
+        sleep(min(interval * random.uniform(1 - jitter, 1 + jitter), remaining))
+        interval = min(interval * backoff_factor, max_interval)
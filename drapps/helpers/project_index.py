@@ -0,0 +1,112 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .app_projects_functions import get_file_digest, get_ignore_patterns_digest
+from .cache_dir import get_cache_dir, write_json_file
+
+INDEX_FOLDER = 'index'
+INDEX_FORMAT_VERSION = 1
+# limits keep the whole index folder small, dropped entries are just calculated again
+MAX_INDEX_ENTRIES = 100_000
+MAX_INDEXED_PROJECTS = 32
+# files modified right before indexing can be changed again without mtime change
+RACY_MODIFICATION_WINDOW_NS = 2_000_000_000
+
+
+def _get_mtime(path: Path) -> Optional[float]:
+    """Modification time of file, None if file doesn't exist anymore."""
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+class ProjectIndex:
+    """
+    On-disk index of project folder, that keeps content digests of files and ignore decisions
+    from previous runs. Digest is reused while file size, modification time and inode are
+    the same; ignore decisions are reused while ignore file is not changed.
+    """
+
+    def __init__(self, project_folder: Path, index_path: Path, ignore_digest: str):
+        self.project_folder = project_folder
+        self.index_path = index_path
+        self.ignore_digest = ignore_digest
+        # relative path -> [size, mtime_ns, inode, digest]
+        self.files: Dict[str, List[Any]] = {}
+        # relative path (folders end with /) -> is ignored
+        self.ignored: Dict[str, bool] = {}
+        self._used_files: Dict[str, List[Any]] = {}
+
+    @classmethod
+    def load(cls, project_folder: Path) -> 'ProjectIndex':
+        """Load index of project folder, broken or outdated index is silently dropped."""
+        folder_key = hashlib.sha256(str(project_folder.resolve()).encode()).hexdigest()
+        index_path = get_cache_dir(INDEX_FOLDER) / f'{folder_key}.json'
+        index = cls(project_folder, index_path, get_ignore_patterns_digest(project_folder))
+        try:
+            with index_path.open('r') as f:
+                data = json.load(f)
+            if data.get('version') != INDEX_FORMAT_VERSION:
+                return index
+            trusted_mtime_ns = data['savedAt'] - RACY_MODIFICATION_WINDOW_NS
+            index.files = {
+                path: entry for path, entry in data['files'].items() if entry[1] < trusted_mtime_ns
+            }
+            if data['ignoreDigest'] == index.ignore_digest:
+                index.ignored = data['ignored']
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+        return index
+
+    def get_file_digest(self, file_path: Path, relative_path: str) -> str:
+        """Get file content digest, file is read only if it was changed since last indexing."""
+        file_stat = file_path.stat()
+        file_key = [file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino]
+        entry = self.files.get(relative_path)
+        if entry and entry[:3] == file_key:
+            digest = entry[3]
+        else:
+            digest = get_file_digest(file_path)
+        self._used_files[relative_path] = file_key + [digest]
+        return digest
+
+    def save(self) -> None:
+        """Store files used during this run and ignore decisions."""
+        ignored = self.ignored if len(self.ignored) <= MAX_INDEX_ENTRIES else {}
+        files = self._used_files if len(self._used_files) <= MAX_INDEX_ENTRIES else {}
+        data = {
+            'version': INDEX_FORMAT_VERSION,
+            'savedAt': time.time_ns(),
+            'project': str(self.project_folder),
+            'ignoreDigest': self.ignore_digest,
+            'ignored': ignored,
+            'files': files,
+        }
+        try:
+            write_json_file(self.index_path, data)
+        except OSError:
+            # index is just an optimization, never fail because of it
+            return
+        self._remove_old_indexes()
+
+    def _remove_old_indexes(self) -> None:
+        # index of other project can be removed by parallel run at any moment
+        index_mtimes = []
+        for index_file in self.index_path.parent.glob('*.json'):
+            mtime = _get_mtime(index_file)
+            if mtime is not None:
+                index_mtimes.append((mtime, index_file))
+        index_mtimes.sort(reverse=True)
+        for _, index_file in index_mtimes[MAX_INDEXED_PROJECTS:]:
+            index_file.unlink(missing_ok=True)
@@ -71,3 +71,17 @@ def verify_runtime_env_vars(metadata_file, runtime_env_vars) -> List[str]:
             print(f"Undefined parameter: '{field_name}'.")
 
     return valid_params
+
+
+def get_reset_runtime_params(metadata_file, runtime_params: List[str]) -> List[str]:
+    """
+    Runtime parameters defined in metadata.yaml, but not set in runtime_params, with null
+    value, so version seeded from previous one doesn't keep their previous values.
+    """
+    metadata_contents = read_metadata_yaml(metadata_file) or {}
+    set_names = {param['fieldName'] for value in runtime_params for param in json.loads(value)}
+    return [
+        json.dumps([{'fieldName': param['fieldName'], 'type': param['type'], 'value': None}])
+        for param in metadata_contents.get('runtimeParameterDefinitions', [])
+        if param['fieldName'] not in set_names
+    ]
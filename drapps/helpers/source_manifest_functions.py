@@ -0,0 +1,77 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import click
+
+from .app_projects_functions import get_file_digest
+from .cache_dir import get_cache_dir, write_json_file
+from .project_index import ProjectIndex
+
+MANIFESTS_FOLDER = 'manifests'
+
+
+class SourceManifest(NamedTuple):
+    """Content hashes of the files uploaded to a custom application source version."""
+
+    version_id: str
+    files: Dict[str, str]  # relative path -> sha256 digest
+
+
+def get_project_digests(
+    project_files: List[Tuple[Path, str]], index: Optional[ProjectIndex] = None
+) -> Dict[str, str]:
+    """Get content digest for each file in project. Files not changed since indexing aren't read."""
+    if index is None:
+        return {
+            relative_path: get_file_digest(file_path) for file_path, relative_path in project_files
+        }
+    return {
+        relative_path: index.get_file_digest(file_path, relative_path)
+        for file_path, relative_path in project_files
+    }
+
+
+def _get_manifest_path(source_id: str) -> Path:
+    return get_cache_dir(MANIFESTS_FOLDER) / f'{source_id}.json'
+
+
+def load_source_manifest(source_id: str) -> Optional[SourceManifest]:
+    """Load manifest of the last version uploaded to the application source from this machine."""
+    manifest_path = _get_manifest_path(source_id)
+    try:
+        with manifest_path.open('r') as f:
+            data = json.load(f)
+        return SourceManifest(version_id=data['versionId'], files=data['files'])
+    except (OSError, ValueError, KeyError, TypeError):
+        # no manifest or it is broken, anyway we can't rely on it
+        return None
+
+
+def save_source_manifest(source_id: str, manifest: SourceManifest) -> None:
+    """Store manifest of uploaded application source version."""
+    data = {'versionId': manifest.version_id, 'files': manifest.files}
+    try:
+        write_json_file(_get_manifest_path(source_id), data)
+    except OSError as error:
+        # version is already uploaded, without manifest next upload is just not incremental
+        click.echo(f'Warning: cannot save manifest of uploaded files: {error}', err=True)
+
+
+def diff_manifest_files(
+    old_files: Dict[str, str], new_files: Dict[str, str]
+) -> Tuple[List[str], List[str]]:
+    """
+    Compare two sets of file digests.
+    Returns relative paths of added or changed files and relative paths of deleted files.
+    """
+    changed = [path for path, digest in new_files.items() if old_files.get(path) != digest]
+    deleted = [path for path in old_files if path not in new_files]
+    return changed, deleted
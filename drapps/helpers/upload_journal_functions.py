@@ -0,0 +1,60 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+import click
+
+from .cache_dir import get_cache_dir, write_json_file
+
+JOURNALS_FOLDER = 'journals'
+
+
+class UploadJournal(NamedTuple):
+    """State of project upload into application source version, that is not finished yet."""
+
+    source_id: str
+    version_id: str
+    project: str
+    files: Dict[str, str]  # relative path -> sha256 digest of content acknowledged by server
+
+
+def _get_journal_path(source_id: str) -> Path:
+    return get_cache_dir(JOURNALS_FOLDER) / f'{source_id}.json'
+
+
+def load_upload_journal(source_id: str) -> Optional[UploadJournal]:
+    """Load journal of interrupted upload into the application source."""
+    try:
+        with _get_journal_path(source_id).open('r') as f:
+            data = json.load(f)
+        return UploadJournal(
+            source_id=source_id,
+            version_id=data['versionId'],
+            project=data['project'],
+            files=data['files'],
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_upload_journal(journal: UploadJournal) -> None:
+    """Store upload journal, it is called after each acknowledged chunk."""
+    data = {'versionId': journal.version_id, 'project': journal.project, 'files': journal.files}
+    try:
+        # interruption can happen at any moment, so journal is never written partially
+        write_json_file(_get_journal_path(journal.source_id), data)
+    except OSError as error:
+        # upload itself goes on, it just can't be resumed from this point
+        click.echo(f'Warning: cannot save upload journal: {error}', err=True)
+
+
+def remove_upload_journal(source_id: str) -> None:
+    """Remove journal when upload is completed."""
+    _get_journal_path(source_id).unlink(missing_ok=True)
@@ -7,11 +7,14 @@
 #
 import os
 import posixpath
+import re
 from typing import Callable
 
 import click
 import datarobot as dr
 
+from .execution_environments_functions import BUILD_LOG_FATAL_PATTERNS
+
 MIMIC_ATTRIBUTES = ['__click_params__', '__name__', '__doc__']
 
 
@@ -83,3 +86,40 @@ def api_endpoint(command: Callable[..., None]) -> Callable[..., None]:
     )
     option_wrapper = click.option('-E', '--endpoint', type=click.STRING, help=help_text)
     return option_wrapper(wrapper)
+
+
+def build_abort_patterns(command: Callable[..., None]) -> Callable[..., None]:
+    """Attaches options for stopping image build wait when build log has fatal errors"""
+
+    def wrapper(*args, **kwargs) -> None:
+        abort_patterns = list(kwargs.pop('abort_pattern') or ())
+        for pattern in abort_patterns:
+            try:
+                re.compile(pattern)
+            except re.error as error:
+                raise click.BadParameter(
+                    f'Invalid regular expression {pattern}: {error}', param_hint='--abort-pattern'
+                )
+        if kwargs.pop('abort_on_build_error'):
+            abort_patterns.extend(BUILD_LOG_FATAL_PATTERNS)
+        kwargs['abort_patterns'] = abort_patterns
+
+        command(*args, **kwargs)
+
+    for attr in MIMIC_ATTRIBUTES:
+        if hasattr(command, attr):
+            setattr(wrapper, attr, getattr(command, attr))
+
+    pattern_option = click.option(
+        '--abort-pattern',
+        multiple=True,
+        type=click.STRING,
+        help='Stop waiting for image build when build log line matches this regular expression.',
+    )
+    error_option = click.option(
+        '--abort-on-build-error',
+        is_flag=True,
+        default=False,
+        help='Stop waiting for image build when build log has a known fatal error.',
+    )
+    return error_option(pattern_option(wrapper))
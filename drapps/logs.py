@@ -5,17 +5,39 @@
 #  This is proprietary source code of DataRobot, Inc. and its affiliates.
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fnmatch import fnmatchcase
 from time import sleep
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 import click
 from bson import ObjectId
 from requests import Session
 
-from .helpers.custom_apps_functions import get_custom_app_by_name, get_custom_app_logs
+from .helpers.api_session import create_api_session
+from .helpers.custom_apps_functions import (
+    call_with_custom_app_id,
+    get_custom_app_by_name,
+    get_custom_app_logs,
+    get_custom_apps_list,
+)
+from .helpers.log_cache import LogCache
+from .helpers.log_cursor import LogCursor, merge_by_timestamp
 from .helpers.wrappers import api_endpoint, api_token
 
+# maximal and minimal interval between log checks in follow mode
 SLEEP_TIME = 30
+MIN_SLEEP_TIME = 2
+# requests budget shared by all applications followed at once
+LOG_REQUESTS_PER_SECOND = 1
+# logs API returns the whole log every time, so big logs are checked less often
+# and on average no more than this number of bytes is downloaded per second
+LOG_BYTES_PER_SECOND = 10 * 1024
+LOG_FOLLOW_CONCURRENCY = 5
+GLOB_CHARS = set('*?[')
+TIMESTAMP_FORMATS = ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S']
 
 
 def _format_runtime_logs(app_logs: Dict[str, Any]) -> str:
@@ -25,6 +47,195 @@ def _format_runtime_logs(app_logs: Dict[str, Any]) -> str:
     return '\n'.join(runtime_logs)
 
 
+def get_min_interval(log_size: int, requests: int = 0) -> float:
+    """
+    Shortest interval between log checks. It grows with number of requests in one check
+    and with size of downloaded logs, but size alone doesn't make it longer than SLEEP_TIME.
+    """
+    return max(
+        min(MIN_SLEEP_TIME, SLEEP_TIME),
+        requests / LOG_REQUESTS_PER_SECOND,
+        min(log_size / LOG_BYTES_PER_SECOND, SLEEP_TIME),
+    )
+
+
+def follow_logs(
+    session: Session,
+    endpoint: str,
+    app_id: str,
+    log_cursor: LogCursor,
+    log_cache: LogCache,
+    log_size: int,
+) -> None:
+    """
+    Print new log records till interrupted. Logs are checked more often while new records
+    appear and less often when application is idle or its log is big. log_size is size
+    of already downloaded log.
+    """
+    interval = get_min_interval(log_size)
+    while True:
+        sleep(interval)
+        app_logs = get_custom_app_logs(session, endpoint, app_id)
+        runtime_logs = _format_runtime_logs(app_logs)
+        min_interval = get_min_interval(len(runtime_logs))
+        log_cache.append(runtime_logs)
+        log_update = log_cursor.update(runtime_logs)
+        if log_update.truncated:
+            click.echo('--- log was truncated or rotated, showing it from the start ---', err=True)
+        click.echo(log_update.text, nl=False)
+        if log_update.text:
+            interval = min_interval
+        else:
+            interval = min(max(interval * 2, min_interval), SLEEP_TIME)
+
+
+def resolve_apps(session: Session, endpoint: str, identifiers: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    Find applications by IDs, names or name globs. Returns mapping of application ID
+    to label used as prefix of its log records.
+    """
+    apps: Dict[str, str] = {}
+    all_apps = None
+    for identifier in identifiers:
+        if ObjectId.is_valid(identifier):
+            apps.setdefault(identifier, identifier)
+        elif GLOB_CHARS & set(identifier):
+            if all_apps is None:
+                all_apps = get_custom_apps_list(session, endpoint)
+            matched = [app for app in all_apps if fnmatchcase(app['name'], identifier)]
+            if not matched:
+                raise click.BadParameter(
+                    f'No custom applications match "{identifier}".',
+                    param_hint='APPLICATION_ID_OR_NAME',
+                )
+            for app in matched:
+                apps.setdefault(app['id'], app['name'])
+        else:
+            app = get_custom_app_by_name(session, endpoint, app_name=identifier)
+            apps.setdefault(app['id'], app['name'])
+    return apps
+
+
+def _get_new_lines(
+    session: Session, endpoint: str, app_id: str, log_cursor: LogCursor, log_cache: LogCache
+) -> Tuple[List[str], bool, int]:
+    app_logs = get_custom_app_logs(session, endpoint, app_id)
+    runtime_logs = _format_runtime_logs(app_logs)
+    log_size = len(runtime_logs)
+    log_cache.append(runtime_logs)
+    # every record returned by API is complete, merged output is printed line by line
+    if runtime_logs and not runtime_logs.endswith('\n'):
+        runtime_logs += '\n'
+    log_update = log_cursor.update(runtime_logs)
+    return log_update.text.splitlines(), log_update.truncated, log_size
+
+
+def echo_merged_logs(
+    session: Session,
+    endpoint: str,
+    apps: Dict[str, str],
+    log_cursors: Dict[str, LogCursor],
+    log_caches: Dict[str, LogCache],
+    executor: ThreadPoolExecutor,
+    sort_by_time: bool,
+) -> Tuple[bool, int]:
+    """
+    Check logs of all applications concurrently and print new lines prefixed by
+    application label. Returns True if there were new lines and total size of logs.
+    """
+    futures = {
+        app_id: executor.submit(
+            _get_new_lines, session, endpoint, app_id, log_cursors[app_id], log_caches[app_id]
+        )
+        for app_id in apps
+    }
+    lines_by_label = {}
+    logs_size = 0
+    for app_id, future in futures.items():
+        lines, truncated, log_size = future.result()
+        logs_size += log_size
+        if truncated:
+            click.echo(
+                f'--- log of {apps[app_id]} was truncated or rotated, showing it from the start ---',
+                err=True,
+            )
+        lines_by_label[apps[app_id]] = lines
+
+    if sort_by_time:
+        merged = merge_by_timestamp(lines_by_label)
+    else:
+        merged = [(label, line) for label, lines in lines_by_label.items() for line in lines]
+    width = max(len(label) for label in apps.values())
+    for label, line in merged:
+        click.echo(f'{label.ljust(width)} | {line}')
+    return bool(merged), logs_size
+
+
+def show_merged_logs(
+    session: Session, endpoint: str, apps: Dict[str, str], follow: bool, sort_by_time: bool
+) -> None:
+    """
+    Print logs of several applications as one stream. In follow mode all applications
+    are checked in one round, and rounds are done rarely for more applications, so
+    number of requests per second doesn't grow with number of applications.
+    """
+    log_cursors = {app_id: LogCursor() for app_id in apps}
+    log_caches = {app_id: LogCache.load(app_id) for app_id in apps}
+    concurrency = min(len(apps), LOG_FOLLOW_CONCURRENCY)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        _, logs_size = echo_merged_logs(
+            session, endpoint, apps, log_cursors, log_caches, executor, sort_by_time
+        )
+        interval = get_min_interval(logs_size, requests=len(apps))
+        while follow:
+            sleep(interval)
+            has_new_lines, logs_size = echo_merged_logs(
+                session, endpoint, apps, log_cursors, log_caches, executor, sort_by_time
+            )
+            min_interval = get_min_interval(logs_size, requests=len(apps))
+            max_interval = max(SLEEP_TIME, min_interval)
+            if has_new_lines:
+                interval = min_interval
+            else:
+                interval = min(max(interval * 2, min_interval), max_interval)
+
+
+def query_cached_logs(
+    app_id: str,
+    log_cache: LogCache,
+    app_logs: Optional[Dict[str, Any]],
+    pattern: Optional[re.Pattern],
+    tail: Optional[int],
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> None:
+    """
+    Add new lines of downloaded application log to local cache and print lines matching
+    filters. Without downloaded log (--cached), only local cache is queried.
+    """
+    if app_logs is None:
+        if not log_cache.exists:
+            raise click.UsageError(
+                f'There are no cached logs of application {app_id}, run the command without --cached.'
+            )
+    else:
+        log_cache.append(_format_runtime_logs(app_logs))
+
+    for line in log_cache.query(pattern=pattern, tail=tail, since=since, until=until):
+        click.echo(line)
+
+
+def _compile_pattern(
+    ctx: click.Context, param: click.Parameter, value: Optional[str]
+) -> Optional[re.Pattern]:
+    if value is None:
+        return None
+    try:
+        return re.compile(value)
+    except re.error as error:
+        raise click.BadParameter(f'Invalid regular expression {value}: {error}')
+
+
 @click.command()
 @api_token
 @api_endpoint
@@ -36,20 +247,87 @@ def _format_runtime_logs(app_logs: Dict[str, Any]) -> str:
     default=False,
     help='Output append data as new log records appear.',
 )
-@click.argument('application_id_or_name', type=click.STRING)
-def logs(token: str, endpoint: str, follow: bool, application_id_or_name: str) -> None:
-    """Provides logs for custom application."""
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
-
-    if ObjectId.is_valid(application_id_or_name):
-        app_id = application_id_or_name
-    else:
-        app = get_custom_app_by_name(session, endpoint, app_name=application_id_or_name)
-        app_id = app['id']
+@click.option(
+    '--sort-by-time',
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help='Order records of several applications by their leading timestamps.',
+)
+@click.option(
+    '--grep',
+    type=click.STRING,
+    callback=_compile_pattern,
+    help='Show only lines matching regular expression.',
+)
+@click.option('--tail', type=click.IntRange(min=0), help='Show only last N lines.')
+@click.option(
+    '--since',
+    type=click.DateTime(TIMESTAMP_FORMATS),
+    help='Show only lines logged at this time or later.',
+)
+@click.option(
+    '--until',
+    type=click.DateTime(TIMESTAMP_FORMATS),
+    help='Show only lines logged before this time.',
+)
+@click.option(
+    '--cached',
+    is_flag=True,
+    show_default=True,
+    default=False,
+    help='Query logs stored by previous runs without downloading them again.',
+)
+@click.argument('application_id_or_name', type=click.STRING, nargs=-1, required=True)
+def logs(
+    token: str,
+    endpoint: str,
+    follow: bool,
+    sort_by_time: bool,
+    grep: Optional[re.Pattern],
+    tail: Optional[int],
+    since: Optional[datetime],
+    until: Optional[datetime],
+    cached: bool,
+    application_id_or_name: Tuple[str, ...],
+) -> None:
+    """
+    Provides logs for custom application. Several applications or name globs
+    can be passed, their logs are merged and prefixed by application name.
+    """
+    session = create_api_session(token)
+
+    several_apps = len(application_id_or_name) > 1 or GLOB_CHARS & set(application_id_or_name[0])
+    is_query = grep is not None or tail is not None or since or until or cached
+    if is_query and (follow or several_apps):
+        raise click.UsageError(
+            '--grep, --tail, --since, --until and --cached can be used only '
+            'for one application without --follow.'
+        )
+
+    if several_apps:
+        apps = resolve_apps(session, endpoint, application_id_or_name)
+        show_merged_logs(session, endpoint, apps, follow, sort_by_time)
+        return
+
+    app_identifier = application_id_or_name[0]
+    if cached:
+        # log is not downloaded, name is only resolved to ID
+        app_id = call_with_custom_app_id(session, endpoint, app_identifier, lambda app_id: app_id)
+        query_cached_logs(app_id, LogCache.load(app_id), None, grep, tail, since, until)
+        return
+
+    def get_logs(app_id: str) -> Tuple[str, Dict[str, Any]]:
+        return app_id, get_custom_app_logs(session, endpoint, app_id)
+
+    app_id, app_logs = call_with_custom_app_id(session, endpoint, app_identifier, get_logs)
+    log_cache = LogCache.load(app_id)
+    if is_query:
+        query_cached_logs(app_id, log_cache, app_logs, grep, tail, since, until)
+        return
 
-    app_logs = get_custom_app_logs(session, endpoint, app_id)
     runtime_logs = _format_runtime_logs(app_logs)
+    log_cache.append(runtime_logs)
 
     if not runtime_logs and not follow:
         # it looks like we cant find any runtimes logs, lets try to show image build logs
@@ -66,13 +344,9 @@ def logs(token: str, endpoint: str, follow: bool, application_id_or_name: str) -
             click.echo(f'Dependency image build log:\n{image_build_logs}')
         return
 
-    click.echo(runtime_logs, nl=False)
-
-    while follow:
-        sleep(SLEEP_TIME)
-        new_logs = _format_runtime_logs(get_custom_app_logs(session, endpoint, app_id))
-        if new_logs != runtime_logs:
-            click.echo(new_logs[len(runtime_logs) :], nl=False)
-            runtime_logs = new_logs
+    log_cursor = LogCursor()
+    click.echo(log_cursor.update(runtime_logs).text, nl=False)
+    if follow:
+        follow_logs(session, endpoint, app_id, log_cursor, log_cache, len(runtime_logs))
 
     click.echo()
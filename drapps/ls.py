@@ -7,15 +7,16 @@
 #
 from datetime import datetime
 from functools import partial
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
 import click
 from dateutil import parser
 from requests import Session
 from tabulate import tabulate
 
-from .helpers.custom_apps_functions import get_custom_apps_list
-from .helpers.execution_environments_functions import get_execution_environments_list
+from .helpers.api_session import create_api_session
+from .helpers.custom_apps_functions import iter_custom_apps
+from .helpers.execution_environments_functions import iter_execution_environments
 from .helpers.wrappers import api_endpoint, api_token
 
 
@@ -41,7 +42,7 @@ def _list_str_fetcher(field_name: str, entity) -> str:
 
 
 def format_table(
-    data: List[Dict[str, Any]], data_fetchers: Dict[str, Callable[[Dict[str, Any]], str]]
+    data: Iterable[Dict[str, Any]], data_fetchers: Dict[str, Callable[[Dict[str, Any]], str]]
 ) -> str:
     headers = list(data_fetchers.keys())
     rows = []
@@ -50,11 +51,15 @@ def format_table(
     return tabulate(rows, headers=headers, tablefmt='simple')
 
 
-def list_apps(session: Session, endpoint: str, id_only: bool) -> str:
-    apps = get_custom_apps_list(session, endpoint)
+def list_apps(
+    session: Session, endpoint: str, id_only: bool, page_size: Optional[int] = None
+) -> Iterator[str]:
+    """Generate output lines. IDs are printed while next pages are loaded, table needs all rows."""
+    apps = iter_custom_apps(session, endpoint, page_size=page_size)
 
     if id_only:
-        return '\n'.join([app['id'] for app in apps])
+        yield from (app['id'] for app in apps)
+        return
 
     data_fetchers = {
         'id': partial(_string_fetcher, 'id'),
@@ -65,35 +70,44 @@ def list_apps(session: Session, endpoint: str, id_only: bool) -> str:
         'external sharing': partial(_string_fetcher, 'externalAccessEnabled'),
         'external sharing recipients': partial(_list_str_fetcher, 'externalAccessRecipients'),
     }
-    return format_table(apps, data_fetchers)  # type: ignore[arg-type]
+    yield format_table(apps, data_fetchers)  # type: ignore[arg-type]
 
 
-def list_environments(session: Session, endpoint: str, id_only: bool) -> str:
-    envs = get_execution_environments_list(session, endpoint)
+def list_environments(
+    session: Session, endpoint: str, id_only: bool, page_size: Optional[int] = None
+) -> Iterator[str]:
+    """Generate output lines. IDs are printed while next pages are loaded, table needs all rows."""
+    envs = iter_execution_environments(session, endpoint, page_size=page_size)
 
     if id_only:
-        return '\n'.join([ee['id'] for ee in envs])
+        yield from (ee['id'] for ee in envs)
+        return
 
     data_fetchers = {
         'id': partial(_string_fetcher, 'id'),
         'name': partial(_string_fetcher, 'name'),
         'description': partial(_string_fetcher, 'description'),
     }
-    return format_table(envs, data_fetchers)  # type: ignore[arg-type]
+    yield format_table(envs, data_fetchers)  # type: ignore[arg-type]
 
 
 @click.command()
 @api_token
 @api_endpoint
 @click.option('--id-only', is_flag=True, show_default=True, default=False, help='Output only ids')
+@click.option(
+    '--page-size',
+    type=click.IntRange(min=1),
+    help='Number of entities requested from API at once. Default is chosen by server.',
+)
 @click.argument('entity', type=click.Choice(['apps', 'envs']))
-def ls(token: str, endpoint: str, id_only: bool, entity: str) -> None:
+def ls(token: str, endpoint: str, id_only: bool, page_size: Optional[int], entity: str) -> None:
     """Provides list of custom applications or execution environments."""
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
+    session = create_api_session(token)
 
     if entity == 'apps':
-        output = list_apps(session, endpoint, id_only)
+        output = list_apps(session, endpoint, id_only, page_size)
     else:
-        output = list_environments(session, endpoint, id_only)
-    click.echo(output)
+        output = list_environments(session, endpoint, id_only, page_size)
+    for line in output:
+        click.echo(line)
@@ -9,11 +9,10 @@ from typing import Optional
 
 import click
 from bson import ObjectId
-from requests import Session
 
+from drapps.helpers.api_session import create_api_session
 from drapps.helpers.custom_apps_functions import (
-    get_custom_app_by_id,
-    get_custom_app_by_name,
+    get_custom_app,
     get_history_by_index,
     update_running_custom_app,
     wait_for_app_to_be_running,
@@ -64,20 +63,15 @@ def publish(
     the new content of the source version such as code, base environment, runtime params, replicas, resources, etc
     while keeping the application ID fixed.
     """
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
+    session = create_api_session(token)
     payload = {}
     if ObjectId.is_valid(application_to_be_updated):
         app_id = application_to_be_updated
     else:
-        app = get_custom_app_by_name(session, endpoint, app_name=application_to_be_updated)
-        app_id = app['id']
+        app_id = get_custom_app(session, endpoint, application_to_be_updated)['id']
 
     if source_application:
-        if ObjectId.is_valid(source_application):
-            app = get_custom_app_by_id(session, endpoint, source_application)
-        else:
-            app = get_custom_app_by_name(session, endpoint, app_name=source_application)
+        app = get_custom_app(session, endpoint, source_application)
         payload['customApplicationSourceVersionId'] = app['customApplicationSourceVersionId']
 
     if name:
@@ -127,13 +121,11 @@ def revert_publish(
     application_to_be_updated: str,
     skip_wait: bool,
 ):
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
+    session = create_api_session(token)
     if ObjectId.is_valid(application_to_be_updated):
         app_id = application_to_be_updated
     else:
-        app = get_custom_app_by_name(session, endpoint, app_name=application_to_be_updated)
-        app_id = app['id']
+        app_id = get_custom_app(session, endpoint, application_to_be_updated)['id']
     history = get_history_by_index(
         session=session,
         app_id=app_id,
@@ -12,7 +12,8 @@ import click
 from bson import ObjectId
 from requests import Session
 
-from .helpers.custom_apps_functions import delete_custom_app, get_custom_app_by_name
+from .helpers.api_session import create_api_session
+from .helpers.custom_apps_functions import delete_custom_app, get_custom_app
 from .helpers.exceptions import ClientResponseError
 from .helpers.wrappers import api_endpoint, api_token
 
@@ -21,8 +22,7 @@ def remove_app(session: Session, endpoint: str, application_id_or_name: str):
     if ObjectId.is_valid(application_id_or_name):
         app_id = application_id_or_name
     else:
-        app = get_custom_app_by_name(session, endpoint, app_name=application_id_or_name)
-        app_id = app['id']
+        app_id = get_custom_app(session, endpoint, application_id_or_name)['id']
 
     delete_custom_app(session, endpoint, app_id)
 
@@ -63,8 +63,7 @@ class RequiredStringsFromParamsAndStdin(click.Argument):
 @click.argument("application_id_or_name", cls=RequiredStringsFromParamsAndStdin)
 def terminate(token: str, endpoint: str, application_id_or_name: Tuple[str]) -> None:
     """Stops custom application and removes it from the list."""
-    session = Session()
-    session.headers.update({'Authorization': f'Bearer {token}'})
+    session = create_api_session(token)
 
     for app_id_name in application_id_or_name:
         try:
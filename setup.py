@@ -36,8 +36,11 @@ tests_require = [
     'altair==5.4.1',
     'pillow==11.0.0',
     'wordcloud>=1.9.4',
+    'aiohttp>=3.8,<4',
 ]
 
+async_requires = ['aiohttp>=3.8,<4']
+
 setup(
     name=NAME,
     description='CLI client for custom application in Data Robot',
@@ -50,7 +53,7 @@ setup(
     python_requires='>=3.9',
     install_requires=install_requires,
     tests_require=tests_require,
-    extras_require={'test': tests_require},
+    extras_require={'test': tests_require, 'async': async_requires},
     scripts=['bin/drapps'],
     classifiers=[
         'Programming Language :: Python',
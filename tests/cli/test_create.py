@@ -5,19 +5,51 @@
 #  This is proprietary source code of DataRobot, Inc. and its affiliates.
 #  Released under the terms of DataRobot Tool and Utility Agreement.
 #
+import hashlib
+import io
 import json
 import logging
+import tarfile
+import threading
+import zlib
 from pathlib import Path
+from typing import Dict, List
 from unittest.mock import patch
 
 import pytest
 import responses
+import yaml
 from bson import ObjectId
 from click.testing import CliRunner
+from requests import ConnectionError as RequestsConnectionError, ReadTimeout, Session
+from requests_toolbelt import MultipartEncoder
 from requests_toolbelt.multipart import decoder
 from responses import matchers
+from urllib3.exceptions import MaxRetryError, NewConnectionError
 
-from drapps.create import create
+from drapps.create import create, upload_file_chunk
+from drapps.helpers.exceptions import ClientResponseError
+
+
+def read_streamed_request_bodies():
+    """
+    Responses doesn't read streamed request bodies, so they are read here
+    while project files still exist.
+    """
+    for call in responses.calls:
+        if isinstance(call.request.body, MultipartEncoder):
+            call.request.body = call.request.body.to_string()
+
+
+def get_multipart_fields(request) -> Dict[str, List[str]]:
+    """Decode multipart/form-data request body into field name -> list of values."""
+    fields: Dict[str, List[str]] = {}
+    content_type = request.headers['Content-Type']
+    for part in decoder.MultipartDecoder(request.body, content_type).parts:
+        disposition = part.headers[b'Content-Disposition'].decode()
+        name = disposition.split('name="', 1)[1].split('"', 1)[0]
+        fields.setdefault(name, []).append(part.text)
+    return fields
 
 
 @responses.activate
@@ -66,6 +98,12 @@ def test_create_from_docker_image(api_endpoint_env, api_token_env, wait_till_rea
         ee_environment_version_url, json={'buildStatus': 'processing'}, match=[auth_matcher]
     )
     responses.get(ee_environment_version_url, json={'buildStatus': 'success'}, match=[auth_matcher])
+    # build log is printed while image is built, incomplete line is printed at the end
+    build_log_url = f'{ee_environment_version_url}buildLog/'
+    responses.get(build_log_url, json={'error': '', 'log': '#1 load context\n#2 FROM'})
+    responses.get(
+        build_log_url, json={'error': '', 'log': '#1 load context\n#2 FROM base\n#3 done'}
+    )
 
     # request for creating custom app
     status_check_url = 'http://ho.st/status/status_id'
@@ -92,6 +130,9 @@ def test_create_from_docker_image(api_endpoint_env, api_token_env, wait_till_rea
         f'Uploading {image_name} to Data Robot.\n'
         'Upload progress:\n'
         'Waiting till image is ready:\n'
+        '#1 load context\n'
+        '#2 FROM base\n'
+        '#3 done\n'
         f'Starting {app_name} custom application.\n'
     )
     if wait_till_ready:
@@ -185,9 +226,11 @@ def test_create_from_project(
             match=[auth_matcher, params_matcher],
         )
 
-    # request for checking if custom app source exists
+    # request for checking if custom app source exists, name filter is done by server
     responses.get(
-        f'{api_endpoint_env}/customApplicationSources/', json={'data': []}, match=[auth_matcher]
+        f'{api_endpoint_env}/customApplicationSources/',
+        json={'data': []},
+        match=[auth_matcher, matchers.query_param_matcher({'name': f'{app_name}Source'})],
     )
     # request for creating new application source
     custom_app_source_id = str(ObjectId())
@@ -206,9 +249,8 @@ def test_create_from_project(
         match=[auth_matcher, source_version_data_matcher],
     )
 
-    responses.patch(
-        f'{api_endpoint_env}/customApplicationSources/{custom_app_source_id}/versions/{custom_app_source_version_id}/',
-    )
+    version_url = f'{api_endpoint_env}/customApplicationSources/{custom_app_source_id}/versions/{custom_app_source_version_id}/'
+    responses.patch(version_url)
 
     # request for creating custom app
     status_check_url = 'http://ho.st/status/status_id'
@@ -292,26 +334,29 @@ def test_create_from_project(
 
         with patch('drapps.create.CHECK_STATUS_WAIT_TIME', 0):
             result = runner.invoke(create, cli_parameters)
+            read_streamed_request_bodies()
 
     assert result.exit_code == 0, result.output
     assert result.output == expected_output
     # Assertions to check if the environment variables were correctly passed
     assert len(responses.calls) > 0
-    env_var_requests = [
-        call
+    patch_requests = [
+        call.request
         for call in responses.calls
         if call.request.url.endswith(f'/versions/{custom_app_source_version_id}/')
         and call.request.method == 'PATCH'  # noqa: W503
-        and 'runtimeParameterValues' in call.request.body.decode('utf-8')  # noqa: W503
     ]
+    # files, runtime params and resources are sent in one request
+    assert len(patch_requests) == 1
+    sent_fields = get_multipart_fields(patch_requests[0])
+    assert sorted(sent_fields['filePath']) == ['metadata.yaml', 'start-app.sh']
+    assert sent_fields['baseEnvironmentVersionId'] == [ee_last_version_id]
+    sent_params = json.loads(sent_fields['runtimeParameterValues'][0])
+    sent_payload = json.loads(sent_fields['resources'][0])
 
-    assert len(env_var_requests) == len(string_env_vars) + len(numeric_env_vars) + len(
-        boolean_env_vars
-    )
+    assert len(sent_params) == len(string_env_vars) + len(numeric_env_vars) + len(boolean_env_vars)
 
-    for call in env_var_requests:
-        body = json.loads(call.request.body.decode('utf-8'))
-        param = json.loads(body['runtimeParameterValues'])[0]
+    for param in sent_params:
         if param['fieldName'] in string_env_vars:
             assert param['type'] == 'string'
             assert param['value'] == string_env_vars[param['fieldName']]
@@ -324,25 +369,6 @@ def test_create_from_project(
         else:
             pytest.fail(f"Unexpected environment variable: {param['fieldName']}")
     # Assertions to verify instances were properly specified
-    resource_request = [
-        call
-        for call in responses.calls
-        if call.request.url.endswith(f'/versions/{custom_app_source_version_id}/')
-        and call.request.method == 'PATCH'  # noqa: W503
-        and '"resources"' in call.request.body.decode('utf-8')  # noqa: W503
-    ]
-    assert len(resource_request) == 1
-
-    content_type = resource_request[0].request.headers["Content-Type"]
-    sent_payload = json.loads(
-        next(
-            part
-            for part in decoder.MultipartDecoder(
-                resource_request[0].request.body, content_type
-            ).parts
-            if b'name="resources' in part.headers[b'Content-Disposition']
-        ).text
-    )
     assert sent_payload.get('replicas') == n_instances or 1
     assert sent_payload.get("resourceLabel") == "cpu.nano" or 'cpu.small'
     if use_session_affinity is not None:
@@ -531,6 +557,7 @@ def test_create_app_with_drappsignore(api_endpoint_env, ee_id, auth_matcher):
             app_name,
         ]
         result = runner.invoke(create, cli_parameters)
+        read_streamed_request_bodies()
         logger = logging.getLogger()
         if result.exit_code:
             logger.error(result.output)
@@ -568,3 +595,861 @@ def test_create_app_with_drappsignore(api_endpoint_env, ee_id, auth_matcher):
     assert '.env' not in files_uploaded, files_uploaded
     # verify we can filter out files by extension
     assert not any(file_uploaded.endswith('.md') for file_uploaded in files_uploaded)
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize('seeded_content_matches', (True, False))
+def test_create_app_with_incremental_upload(
+    api_endpoint_env, ee_id, auth_matcher, cache_dir, seeded_content_matches
+):
+    """
+    Checks that new source version is based on the previous one, when we know its content,
+    and only changed files are uploaded while removed ones are deleted. Settings of
+    previous version, that are not set now, are reset.
+    """
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    source_id = str(ObjectId())
+    previous_version_id = str(ObjectId())
+    new_version_id = str(ObjectId())
+    removed_item_id = str(ObjectId())
+    metadata_yaml = (
+        'runtimeParameterDefinitions:\n' '  - fieldName: GREETING\n' '    type: string\n'
+    )
+
+    responses.get(
+        f'{api_endpoint_env}/customApplications/nameCheck/',
+        json={'inUse': False},
+        match=[matchers.query_param_matcher({'name': app_name})],
+    )
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    responses.get(
+        f'{api_endpoint_env}/customApplicationSources/',
+        json={'data': [{'id': source_id, 'name': f'{app_name}Source'}]},
+        match=[auth_matcher],
+    )
+    # only one version is requested to get the number of versions
+    responses.get(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/',
+        json={'data': [{'id': previous_version_id}], 'totalCount': 1},
+        match=[auth_matcher, matchers.query_param_matcher({'limit': 1})],
+    )
+    responses.get(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/{previous_version_id}/',
+        json={'id': previous_version_id},
+    )
+    responses.post(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/',
+        json={'id': new_version_id},
+        match=[
+            auth_matcher,
+            matchers.json_params_matcher({'label': 'v2', 'baseVersion': previous_version_id}),
+        ],
+    )
+    version_url = (
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/{new_version_id}/'
+    )
+    seeded_items = [
+        {'id': str(ObjectId()), 'filePath': 'start-app.sh'},
+        {'id': str(ObjectId()), 'filePath': 'metadata.yaml'},
+        {'id': removed_item_id, 'filePath': 'old.py'},
+    ]
+    stale_item_id = str(ObjectId())
+    if seeded_content_matches:
+        seeded_items.append({'id': str(ObjectId()), 'filePath': 'app.py'})
+    else:
+        # content of the version doesn't match manifest, e.g. it was changed by other user
+        seeded_items.append({'id': stale_item_id, 'filePath': 'stale.py'})
+    responses.get(version_url, json={'id': new_version_id, 'items': seeded_items})
+    responses.patch(version_url)
+    responses.post(
+        f'{api_endpoint_env}/customApplications/',
+        json={'id': str(ObjectId())},
+        match=[matchers.json_params_matcher({'name': app_name, 'applicationSourceId': source_id})],
+    )
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path(project_folder).mkdir()
+        Path(project_folder, 'start-app.sh').write_bytes(b'#!/usr/bin/env bash run app')
+        Path(project_folder, 'app.py').write_bytes(b'print("new version")')
+        Path(project_folder, 'metadata.yaml').write_text(metadata_yaml)
+
+        manifests_folder = cache_dir / 'manifests'
+        manifests_folder.mkdir(parents=True)
+        start_script_digest = hashlib.sha256(b'#!/usr/bin/env bash run app').hexdigest()
+        manifest = {
+            'versionId': previous_version_id,
+            'files': {
+                'start-app.sh': start_script_digest,
+                'app.py': hashlib.sha256(b'print("old version")').hexdigest(),
+                'old.py': hashlib.sha256(b'print("removed")').hexdigest(),
+                'metadata.yaml': hashlib.sha256(metadata_yaml.encode()).hexdigest(),
+            },
+        }
+        (manifests_folder / f'{source_id}.json').write_text(json.dumps(manifest))
+
+        cli_parameters = ['--base-env', ee_id, '--path', project_folder, '--skip-wait', app_name]
+        result = runner.invoke(create, cli_parameters)
+        read_streamed_request_bodies()
+
+    assert result.exit_code == 0, result.output
+    if seeded_content_matches:
+        assert '1 of 3 files changed, 1 removed since previous version.' in result.output
+    else:
+        assert 'Files of previous version are not available' in result.output
+
+    upload_calls = [
+        call
+        for call in responses.calls
+        if call.request.method == 'PATCH' and b'name="filePath"' in call.request.body
+    ]
+    assert len(upload_calls) == 1
+    content_type = upload_calls[0].request.headers['Content-Type']
+    fields = {}
+    for part in decoder.MultipartDecoder(upload_calls[0].request.body, content_type).parts:
+        disposition = part.headers[b'Content-Disposition'].decode()
+        field_name = disposition.split('name="')[1].split('"')[0]
+        fields.setdefault(field_name, []).append(part.content)
+    if seeded_content_matches:
+        assert fields['filePath'] == [b'app.py']
+        assert fields['file'] == [b'print("new version")']
+        assert fields['filesToDelete'] == [removed_item_id.encode()]
+    else:
+        assert sorted(fields['filePath']) == [b'app.py', b'metadata.yaml', b'start-app.sh']
+        # items that are not in the project are removed, others are uploaded again
+        assert fields['filesToDelete'] == [removed_item_id.encode(), stale_item_id.encode()]
+    assert fields['baseEnvironmentVersionId'] == [ee_id.encode()]
+    # settings are not inherited from previous version
+    resources = json.loads(fields['resources'][0])
+    assert resources['sessionAffinity'] is False
+    assert resources['serviceWebRequestsOnRootPath'] is False
+    assert json.loads(fields['runtimeParameterValues'][0]) == [
+        {'fieldName': 'GREETING', 'type': 'string', 'value': None}
+    ]
+
+    # manifest now describes the new version
+    saved_manifest = json.loads((cache_dir / 'manifests' / f'{source_id}.json').read_text())
+    assert saved_manifest['versionId'] == new_version_id
+    assert saved_manifest['files']['app.py'] == hashlib.sha256(b'print("new version")').hexdigest()
+    assert 'old.py' not in saved_manifest['files']
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize('chunk_failure_status', (503, 422))
+def test_create_app_with_parallel_upload(api_endpoint_env, ee_id, chunk_failure_status):
+    """
+    Checks that project chunks are uploaded by several workers, server failures are retried
+    and client errors stop the upload.
+    """
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+
+    responses.get(f'{api_endpoint_env}/customApplications/nameCheck/', json={'inUse': False})
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    responses.get(f'{api_endpoint_env}/customApplicationSources/', json={'data': []})
+    responses.post(f'{api_endpoint_env}/customApplicationSources/', json={'id': source_id})
+    responses.post(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/',
+        json={'id': version_id},
+    )
+    version_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/{version_id}/'
+    # first upload request fails, the rest are fine
+    responses.patch(version_url, status=chunk_failure_status, json={'message': 'Failure'})
+    responses.patch(version_url)
+    responses.post(f'{api_endpoint_env}/customApplications/', json={'id': str(ObjectId())})
+
+    file_names = ['start-app.sh', 'app.py', 'utils.py', 'config.py']
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path(project_folder).mkdir()
+        for file_name in file_names:
+            Path(project_folder, file_name).write_bytes(b'#!/usr/bin/env bash')
+
+        cli_parameters = [
+            '--base-env',
+            ee_id,
+            '--path',
+            project_folder,
+            '--upload-concurrency',
+            '3',
+            '--skip-wait',
+            app_name,
+        ]
+        with patch('drapps.create.UPLOAD_CHUNK_MAX_FILES', 1), patch(
+            'drapps.create.UPLOAD_RETRY_WAIT_TIME', 0
+        ):
+            result = runner.invoke(create, cli_parameters)
+            read_streamed_request_bodies()
+
+    uploaded_files = set()
+    for call in responses.calls:
+        if call.request.method != 'PATCH' or call.response.status_code != 200:
+            continue
+        content_type = call.request.headers['Content-Type']
+        for part in decoder.MultipartDecoder(call.request.body, content_type).parts:
+            if b'name="filePath"' in part.headers[b'Content-Disposition']:
+                uploaded_files.add(part.content.decode())
+
+    # version settings go with the last chunk, after all other chunks are uploaded
+    patch_calls = [call for call in responses.calls if call.request.method == 'PATCH']
+    finalize_calls = [call for call in patch_calls if b'name="resources"' in call.request.body]
+    if chunk_failure_status == 503:
+        assert result.exit_code == 0, result.output
+        assert uploaded_files == set(file_names)
+        assert finalize_calls == patch_calls[-1:]
+    else:
+        assert result.exit_code == 1
+        assert result.exception.status == chunk_failure_status
+        assert len(uploaded_files) < len(file_names)
+        assert not finalize_calls
+
+
+@responses.activate
+@pytest.mark.parametrize('failure', ('read_timeout', 'connect_failed', 503))
+def test_upload_chunk_with_deletions_is_retried_only_if_not_processed(
+    api_endpoint, tmp_path, failure
+):
+    """Chunk that removes files is not sent again, if server could process the failed request."""
+    version_url = f'{api_endpoint}/customApplicationSources/source_id/versions/version_id/'
+    if failure == 'read_timeout':
+        responses.patch(version_url, body=ReadTimeout())
+    elif failure == 'connect_failed':
+        reason = NewConnectionError(None, 'Connection refused')
+        responses.patch(version_url, body=RequestsConnectionError(MaxRetryError(None, '/', reason)))
+    else:
+        responses.patch(version_url, status=failure, json={'message': 'Unavailable'})
+    responses.patch(version_url)
+    file_path = Path(tmp_path, 'app.py')
+    file_path.write_text('pass')
+
+    def upload() -> bool:
+        return upload_file_chunk(
+            Session(),
+            api_endpoint,
+            'source_id',
+            'version_id',
+            ((file_path, 'app.py'),),
+            {'filesToDelete': ['item_id']},
+            on_read=lambda n_bytes: None,
+        )
+
+    with patch('drapps.create.UPLOAD_RETRY_WAIT_TIME', 0):
+        if failure == 'read_timeout':
+            with pytest.raises(ReadTimeout):
+                upload()
+            assert len(responses.calls) == 1
+        else:
+            upload()
+            assert len(responses.calls) == 2
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_create_app_with_separate_finalize_requests(api_endpoint_env, ee_id, metadata_yaml_content):
+    """Checks that settings are sent separately when server rejects them together with files."""
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+
+    responses.get(f'{api_endpoint_env}/customApplications/nameCheck/', json={'inUse': False})
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    responses.get(f'{api_endpoint_env}/customApplicationSources/', json={'data': []})
+    responses.post(f'{api_endpoint_env}/customApplicationSources/', json={'id': source_id})
+    responses.post(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/',
+        json={'id': version_id},
+    )
+    version_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/{version_id}/'
+
+    def patch_callback(request):
+        body = request.body.to_string() if hasattr(request.body, 'to_string') else request.body
+        request.body = body
+        if b'name="filePath"' in body and b'name="resources"' in body:
+            return 422, {}, json.dumps({'message': 'Unexpected field resources'})
+        return 200, {}, ''
+
+    responses.add_callback(responses.PATCH, version_url, callback=patch_callback)
+    responses.post(f'{api_endpoint_env}/customApplications/', json={'id': str(ObjectId())})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path(project_folder).mkdir()
+        Path(project_folder, 'start-app.sh').write_text('#!/usr/bin/env bash')
+        Path(project_folder, 'metadata.yaml').write_text(metadata_yaml_content)
+        cli_parameters = [
+            '--base-env',
+            ee_id,
+            '--path',
+            project_folder,
+            '--stringEnvVar',
+            'FOO=BAR',
+            '--replicas',
+            '2',
+            '--skip-wait',
+            app_name,
+        ]
+        result = runner.invoke(create, cli_parameters)
+
+    assert result.exit_code == 0, result.output
+    patch_calls = [call for call in responses.calls if call.request.method == 'PATCH']
+    assert [call.response.status_code for call in patch_calls] == [422, 200, 200, 200]
+    file_fields = get_multipart_fields(patch_calls[1].request)
+    assert sorted(file_fields['filePath']) == ['metadata.yaml', 'start-app.sh']
+    assert 'resources' not in file_fields
+    resources_fields = get_multipart_fields(patch_calls[2].request)
+    assert json.loads(resources_fields['resources'][0])['replicas'] == 2
+    sent_params = json.loads(json.loads(patch_calls[3].request.body)['runtimeParameterValues'])
+    assert sent_params == [{'fieldName': 'FOO', 'type': 'string', 'value': 'BAR'}]
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_create_app_resumes_interrupted_upload(api_endpoint_env, ee_id, cache_dir):
+    """Checks that --resume uploads only missing files into version of interrupted upload."""
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+    stale_item_id = str(ObjectId())
+
+    responses.get(f'{api_endpoint_env}/customApplications/nameCheck/', json={'inUse': False})
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    # second run checks that cached environment version still exists
+    responses.get(
+        f'{api_endpoint_env}/executionEnvironments/{ee_id}/versions/{ee_id}/', json={'id': ee_id}
+    )
+    sources_url = f'{api_endpoint_env}/customApplicationSources/'
+    responses.get(sources_url, json={'data': []})
+    responses.post(sources_url, json={'id': source_id})
+    # created source is cached, so resumed upload requests it by ID
+    source_data = {'id': source_id, 'name': f'{app_name}Source'}
+    responses.get(f'{sources_url}{source_id}/', json=source_data)
+    versions_url = f'{sources_url}{source_id}/versions/'
+    responses.get(versions_url, json={'data': [{'id': version_id}]})
+    version_post = responses.post(versions_url, json={'id': version_id})
+    # second chunk fails, so upload is interrupted
+    version_url = f'{versions_url}{version_id}/'
+    responses.patch(version_url)
+    responses.patch(version_url, status=403, json={'message': 'Failure'})
+    responses.patch(version_url)
+    responses.post(f'{api_endpoint_env}/customApplications/', json={'id': str(ObjectId())})
+
+    file_names = ['app.py', 'start-app.sh', 'utils.py']
+    cli_parameters = [
+        '--base-env',
+        ee_id,
+        '--path',
+        project_folder,
+        '--upload-concurrency',
+        '1',
+        '--skip-wait',
+        app_name,
+    ]
+    runner = CliRunner()
+    with runner.isolated_filesystem(), patch('drapps.create.UPLOAD_CHUNK_MAX_FILES', 1):
+        Path(project_folder).mkdir()
+        for file_name in file_names:
+            Path(project_folder, file_name).write_text(f'#!/usr/bin/env bash\n# {file_name}')
+
+        result = runner.invoke(create, cli_parameters)
+        assert result.exit_code == 1, result.output
+
+        journal = json.loads((cache_dir / 'journals' / f'{source_id}.json').read_text())
+        assert journal['versionId'] == version_id
+        # chunks which were in progress during failure can be acknowledged too
+        uploaded_paths = set(journal['files'])
+        assert 0 < len(uploaded_paths) < len(file_names)
+
+        version_items = [{'id': str(ObjectId()), 'filePath': path} for path in uploaded_paths]
+        version_items.append({'id': stale_item_id, 'filePath': 'stale.py'})
+        responses.get(version_url, json={'id': version_id, 'items': version_items})
+        calls_before_resume = len(responses.calls)
+        result = runner.invoke(create, cli_parameters + ['--resume'])
+        read_streamed_request_bodies()
+
+    assert result.exit_code == 0, result.output
+    assert f'Resuming upload to {app_name}Source custom application source.' in result.output
+    left_count = len(file_names) - len(uploaded_paths)
+    assert f'{left_count} of 3 files left to upload, 1 to remove.' in result.output
+    assert version_post.call_count == 1
+
+    resumed_fields: Dict[str, List[str]] = {}
+    for call in responses.calls[calls_before_resume:]:
+        if call.request.method == 'PATCH':
+            for name, values in get_multipart_fields(call.request).items():
+                resumed_fields.setdefault(name, []).extend(values)
+    assert sorted(resumed_fields['filePath']) == sorted(set(file_names) - uploaded_paths)
+    assert resumed_fields['filesToDelete'] == [stale_item_id]
+    assert not (cache_dir / 'journals' / f'{source_id}.json').exists()
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_create_apps_from_manifest(api_endpoint_env, ee_id, entrypoint_script_content):
+    """
+    Checks that applications from deploy manifest are created with shared environment
+    lookup, failure of one application doesn't stop others and summary is printed.
+    """
+    ee_name = 'ExecutionEnv'
+    ee_data = {'id': ee_id, 'name': ee_name, 'latestVersion': {'id': ee_id}}
+    ee_lookup = responses.get(
+        f'{api_endpoint_env}/executionEnvironments/',
+        json={'data': [ee_data]},
+        match=[
+            matchers.query_param_matcher({'useCases': 'customApplication', 'searchFor': ee_name})
+        ],
+    )
+    for app_name, in_use in (('app-a', False), ('app-b', False), ('app-c', True)):
+        responses.get(
+            f'{api_endpoint_env}/customApplications/nameCheck/',
+            json={'inUse': in_use},
+            match=[matchers.query_param_matcher({'name': app_name})],
+        )
+    responses.get(f'{api_endpoint_env}/customApplicationSources/', json={'data': []})
+    for app_name in ('app-a', 'app-b'):
+        source_id = str(ObjectId())
+        version_id = str(ObjectId())
+        responses.post(
+            f'{api_endpoint_env}/customApplicationSources/',
+            json={'id': source_id},
+            match=[matchers.json_params_matcher({'name': f'{app_name}Source'})],
+        )
+        versions_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/'
+        responses.post(versions_url, json={'id': version_id})
+        responses.patch(f'{versions_url}{version_id}/')
+        status_url = f'http://ho.st/status/{app_name}'
+        responses.post(
+            f'{api_endpoint_env}/customApplications/',
+            headers={'Location': status_url},
+            json={'id': str(ObjectId()), 'applicationUrl': f'http://ho.st/{app_name}/'},
+            match=[
+                matchers.json_params_matcher({'name': app_name, 'applicationSourceId': source_id})
+            ],
+        )
+        responses.get(status_url, json={'status': 'COMPLETED'})
+
+    manifest = {
+        'apps': [
+            {'name': 'app-a', 'path': 'app-a', 'replicas': 2},
+            {'name': 'app-b', 'path': 'app-b', 'stringEnvVar': {'FOO': 'BAR'}},
+            {'name': 'app-c', 'path': 'app-a'},
+        ]
+    }
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        for folder in ('app-a', 'app-b'):
+            Path(folder).mkdir()
+            Path(folder, 'start-app.sh').write_text(entrypoint_script_content)
+        Path('apps.yaml').write_text(json.dumps(manifest))
+
+        cli_parameters = ['--manifest', 'apps.yaml', '--base-env', ee_name, '--parallel', '2']
+        with patch('drapps.create.CHECK_STATUS_WAIT_TIME', 0):
+            result = runner.invoke(create, cli_parameters)
+            read_streamed_request_bodies()
+
+    assert result.exit_code == 1, result.output
+    assert '1 of 3 applications were not deployed.' in result.output
+    assert ee_lookup.call_count == 1
+
+    summary = {
+        line.split()[0]: line.split()[1]
+        for line in result.output.splitlines()
+        if line.startswith('app-')
+    }
+    assert summary == {'app-a': 'COMPLETED', 'app-b': 'COMPLETED', 'app-c': 'FAILED'}
+    assert 'Name app-c is used by other custom application' in result.output
+    # applications are deployed in parallel, so only overall progress is drawn
+    assert 'Deploying applications:' in result.output
+    assert 'Uploading project:' not in result.output
+    assert 'Waiting till app is ready:' not in result.output
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize('use_manifest', (False, True))
+def test_create_app_start_timeout(api_endpoint_env, ee_id, entrypoint_script_content, use_manifest):
+    """Checks that application which doesn't start in time is reported without traceback."""
+    app_name = 'new_app'
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+    responses.get(f'{api_endpoint_env}/customApplications/nameCheck/', json={'inUse': False})
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    responses.get(f'{api_endpoint_env}/customApplicationSources/', json={'data': []})
+    responses.post(f'{api_endpoint_env}/customApplicationSources/', json={'id': source_id})
+    versions_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/'
+    responses.post(versions_url, json={'id': version_id})
+    responses.patch(f'{versions_url}{version_id}/')
+    status_url = 'http://ho.st/status/status_id'
+    responses.post(
+        f'{api_endpoint_env}/customApplications/',
+        headers={'Location': status_url},
+        json={'id': str(ObjectId()), 'applicationUrl': 'http://ho.st/app/'},
+    )
+    responses.get(status_url, json={'status': 'INITIALIZING'})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path('project-folder').mkdir()
+        Path('project-folder', 'start-app.sh').write_text(entrypoint_script_content)
+        if use_manifest:
+            manifest = {'apps': [{'name': app_name, 'path': 'project-folder'}]}
+            Path('apps.yaml').write_text(json.dumps(manifest))
+            cli_parameters = ['--manifest', 'apps.yaml', '--base-env', ee_id]
+        else:
+            cli_parameters = ['--base-env', ee_id, '--path', 'project-folder', app_name]
+        with patch('drapps.create.APP_START_TIMEOUT', 0):
+            result = runner.invoke(create, cli_parameters)
+            read_streamed_request_bodies()
+
+    assert result.exit_code == 1, result.output
+    assert isinstance(result.exception, SystemExit)
+    assert 'Custom application start' in result.output
+    assert 'Check application status later.' in result.output
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env', 'api_endpoint_env')
+@pytest.mark.parametrize(
+    'settings, expected_error',
+    (
+        ({'replicas': 'two'}, "Invalid value for replicas: 'two' of application app-a"),
+        ({'replicas': 0}, 'Invalid value for replicas: 0 of application app-a'),
+        ({'cpu-size': 'huge'}, "Invalid value for cpu-size: 'huge' of application app-a"),
+    ),
+)
+def test_create_apps_from_manifest_with_invalid_settings(
+    entrypoint_script_content, settings, expected_error
+):
+    manifest = {'apps': [{'name': 'app-a', 'path': 'app-a', **settings}]}
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path('app-a').mkdir()
+        Path('app-a', 'start-app.sh').write_text(entrypoint_script_content)
+        Path('apps.yaml').write_text(json.dumps(manifest))
+        result = runner.invoke(create, ['--manifest', 'apps.yaml', '--base-env', 'env'])
+
+    assert result.exit_code == 2, result.output
+    assert expected_error in result.output
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize('name_in_use', (False, True))
+def test_create_runs_preflight_lookups_concurrently(
+    api_endpoint_env, ee_id, entrypoint_script_content, name_in_use
+):
+    """
+    Checks that name check, environment and source lookups are sent at the same time:
+    every response waits till all three requests arrive.
+    """
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+    lookups_barrier = threading.Barrier(3, timeout=5)
+
+    def concurrent_callback(payload):
+        def callback(request):
+            lookups_barrier.wait()
+            return 200, {}, json.dumps(payload)
+
+        return callback
+
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    lookups = {
+        'customApplications/nameCheck/': {'inUse': name_in_use},
+        f'executionEnvironments/{ee_id}/': ee_data,
+        'customApplicationSources/': {'data': []},
+    }
+    for path, payload in lookups.items():
+        responses.add_callback(
+            responses.GET, f'{api_endpoint_env}/{path}', callback=concurrent_callback(payload)
+        )
+    source_post = responses.post(
+        f'{api_endpoint_env}/customApplicationSources/', json={'id': source_id}
+    )
+    versions_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/'
+    responses.post(versions_url, json={'id': version_id})
+    responses.patch(f'{versions_url}{version_id}/')
+    responses.post(f'{api_endpoint_env}/customApplications/', json={'id': str(ObjectId())})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path(project_folder).mkdir()
+        Path(project_folder, 'start-app.sh').write_text(entrypoint_script_content)
+        cli_parameters = ['--base-env', ee_id, '--path', project_folder, '--skip-wait', app_name]
+        result = runner.invoke(create, cli_parameters)
+        read_streamed_request_bodies()
+
+    if name_in_use:
+        assert result.exit_code == 2, result.output
+        assert f'Name {app_name} is used by other custom application' in result.output
+        # nothing is created on server if name check fails
+        assert source_post.call_count == 0
+    else:
+        assert result.exit_code == 0, result.output
+        assert source_post.call_count == 1
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_create_reports_project_error_while_lookups_fail(
+    api_endpoint_env, ee_id, entrypoint_script_content
+):
+    """Checks that error found in project folder is not hidden by errors of API lookups."""
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    for path in ('customApplications/nameCheck/', 'customApplicationSources/'):
+        responses.get(f'{api_endpoint_env}/{path}', status=500, json={'message': 'Oops'})
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', status=404)
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path(project_folder).mkdir()
+        Path(project_folder, 'start-app.sh').write_text(entrypoint_script_content)
+        Path(project_folder, 'metadata.yaml').write_text('runtimeParameterDefinitions: [')
+        cli_parameters = [
+            '--base-env',
+            ee_id,
+            '--path',
+            project_folder,
+            '--stringEnvVar',
+            'FOO=bar',
+            '--skip-wait',
+            app_name,
+        ]
+        result = runner.invoke(create, cli_parameters)
+
+    assert result.exit_code == 1, result.output
+    assert isinstance(result.exception, yaml.YAMLError)
+    assert 'Error parsing metadata.yaml' in str(result.exception)
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize('compression', ('gzip', 'none'))
+@pytest.mark.parametrize('archive_support', ('supported', 'rejected', 'ignored'))
+def test_create_app_with_archive_upload(api_endpoint_env, ee_id, compression, archive_support):
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+    project_content = {
+        'start-app.sh': b'#!/usr/bin/env bash\nstreamlit run app.py',
+        'app.py': b'print("hello")',
+        'pages/page.py': b'0' * 70000,  # bigger than one read block
+    }
+
+    responses.get(f'{api_endpoint_env}/customApplications/nameCheck/', json={'inUse': False})
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    responses.get(f'{api_endpoint_env}/customApplicationSources/', json={'data': []})
+    responses.post(f'{api_endpoint_env}/customApplicationSources/', json={'id': source_id})
+    responses.post(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/',
+        json={'id': version_id},
+    )
+    version_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/{version_id}/'
+    if archive_support == 'rejected':
+        responses.patch(version_url, status=422, json={'message': 'Unknown field archive'})
+    responses.patch(version_url)
+    # server that doesn't know archive field can ignore it
+    version_items = [] if archive_support == 'ignored' else list(project_content)
+    responses.get(
+        version_url,
+        json={
+            'id': version_id,
+            'items': [{'id': str(ObjectId()), 'filePath': path} for path in version_items],
+        },
+    )
+    responses.post(f'{api_endpoint_env}/customApplications/', json={'id': str(ObjectId())})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path(project_folder, 'pages').mkdir(parents=True)
+        for relative_path, content in project_content.items():
+            Path(project_folder, relative_path).write_bytes(content)
+
+        cli_parameters = [
+            '--base-env',
+            ee_id,
+            '--path',
+            project_folder,
+            '--archive',
+            '--archive-compression',
+            compression,
+            '--skip-wait',
+            app_name,
+        ]
+        result = runner.invoke(create, cli_parameters)
+        read_streamed_request_bodies()
+        assert result.exit_code == 0, result.output
+
+        patch_calls = [call for call in responses.calls if call.request.method == 'PATCH']
+        archive_call = patch_calls[0]
+        assert archive_call.request.headers['Transfer-Encoding'] == 'chunked'
+        # responses doesn't read streamed body, so do it while project files still exist
+        archive_body = b''.join(archive_call.request.body)
+
+    content_type = archive_call.request.headers['Content-Type']
+    fields = {}
+    for part in decoder.MultipartDecoder(archive_body, content_type).parts:
+        disposition = part.headers[b'Content-Disposition'].decode()
+        fields[disposition.split('name="')[1].split('"')[0]] = part
+    assert fields['baseEnvironmentVersionId'].text == ee_id
+    # resources are sent with the archive
+    assert fields['resources'].headers[b'Content-Type'] == b'application/json'
+    assert json.loads(fields['resources'].text) == {'replicas': 1, 'resourceLabel': 'cpu.small'}
+    expected_name = 'project.tar.gz' if compression == 'gzip' else 'project.tar'
+    assert (
+        f'filename="{expected_name}"' in fields['archive'].headers[b'Content-Disposition'].decode()
+    )
+
+    with tarfile.open(fileobj=io.BytesIO(fields['archive'].content), mode='r:*') as tar:
+        archived_content = {
+            member.name: tar.extractfile(member).read() for member in tar.getmembers()
+        }
+    assert archived_content == project_content
+
+    if archive_support == 'supported':
+        assert len(patch_calls) == 1
+    else:
+        if archive_support == 'rejected':
+            assert 'Archive upload was rejected' in result.output
+        else:
+            assert 'Archive was not unpacked by server' in result.output
+        # files and resources are sent in one request after rejected archive
+        assert len(patch_calls) == 2
+        file_fields = get_multipart_fields(patch_calls[1].request)
+        assert len(file_fields['filePath']) == len(project_content)
+        assert 'resources' in file_fields
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize(
+    'compression_error',
+    (None, (415, 'Unsupported media type'), (400, 'Unsupported Content-Encoding: gzip')),
+    ids=('supported', 'unsupported-media-type', 'unsupported-encoding'),
+)
+def test_create_app_with_compressed_uploads(api_endpoint_env, ee_id, compression_error):
+    app_name = 'new_app'
+    project_folder = 'project-folder'
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+    project_content = {
+        'start-app.sh': b'#!/usr/bin/env bash\nstreamlit run app.py',
+        'app.py': b'print("hello")\n' * 10000,
+    }
+
+    responses.get(f'{api_endpoint_env}/customApplications/nameCheck/', json={'inUse': False})
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    responses.get(f'{api_endpoint_env}/customApplicationSources/', json={'data': []})
+    responses.post(f'{api_endpoint_env}/customApplicationSources/', json={'id': source_id})
+    responses.post(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/',
+        json={'id': version_id},
+    )
+    version_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/{version_id}/'
+    sent_sizes = []
+
+    def patch_callback(request):
+        # body is read here, while project files still exist
+        if request.headers.get('Content-Encoding') == 'gzip':
+            compressed = b''.join(request.body)
+            sent_sizes.append(len(compressed))
+            if compression_error:
+                status, message = compression_error
+                return status, {}, json.dumps({'message': message})
+            request.body = zlib.decompress(compressed, wbits=31)
+        else:
+            request.body = request.body.to_string()
+            sent_sizes.append(len(request.body))
+        return 200, {}, ''
+
+    responses.add_callback(responses.PATCH, version_url, callback=patch_callback)
+    responses.post(f'{api_endpoint_env}/customApplications/', json={'id': str(ObjectId())})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path(project_folder).mkdir()
+        for relative_path, content in project_content.items():
+            Path(project_folder, relative_path).write_bytes(content)
+        cli_parameters = [
+            '--base-env',
+            ee_id,
+            '--path',
+            project_folder,
+            '--compress-uploads',
+            '--skip-wait',
+            app_name,
+        ]
+        result = runner.invoke(create, cli_parameters)
+
+    assert result.exit_code == 0, result.output
+    patch_calls = [call for call in responses.calls if call.request.method == 'PATCH']
+    if not compression_error:
+        assert len(patch_calls) == 1
+        assert sent_sizes[0] < sum(len(content) for content in project_content.values()) / 10
+    else:
+        # compressed request is rejected once, then body is sent as is
+        assert [call.response.status_code for call in patch_calls] == [compression_error[0], 200]
+        assert 'Content-Encoding' not in patch_calls[1].request.headers
+    fields = get_multipart_fields(patch_calls[-1].request)
+    assert sorted(fields['filePath']) == sorted(project_content)
+    assert dict(zip(fields['filePath'], fields['file']))['app.py'] == 'print("hello")\n' * 10000
+    assert 'resources' in fields
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_create_app_with_compressed_uploads_reports_bad_request(api_endpoint_env, ee_id):
+    """Checks that bad request not related to compression doesn't turn compression off."""
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+    responses.get(f'{api_endpoint_env}/customApplications/nameCheck/', json={'inUse': False})
+    ee_data = {'id': ee_id, 'name': 'Test ExecEnv', 'latestVersion': {'id': ee_id}}
+    responses.get(f'{api_endpoint_env}/executionEnvironments/{ee_id}/', json=ee_data)
+    responses.get(f'{api_endpoint_env}/customApplicationSources/', json={'data': []})
+    responses.post(f'{api_endpoint_env}/customApplicationSources/', json={'id': source_id})
+    responses.post(
+        f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/',
+        json={'id': version_id},
+    )
+    version_url = f'{api_endpoint_env}/customApplicationSources/{source_id}/versions/{version_id}/'
+    responses.patch(version_url, status=400, json={'message': 'Invalid file path'})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        Path('project-folder').mkdir()
+        Path('project-folder', 'start-app.sh').write_text('#!/usr/bin/env bash')
+        cli_parameters = [
+            '--base-env',
+            ee_id,
+            '--path',
+            'project-folder',
+            '--compress-uploads',
+            '--skip-wait',
+            'new_app',
+        ]
+        result = runner.invoke(create, cli_parameters)
+
+    assert result.exit_code == 1, result.output
+    assert isinstance(result.exception, ClientResponseError)
+    assert result.exception.message == 'Invalid file path'
+    patch_calls = [call for call in responses.calls if call.request.method == 'PATCH']
+    # second request is sent without version settings, both are still compressed
+    assert len(patch_calls) == 2
+    assert all(call.request.headers['Content-Encoding'] == 'gzip' for call in patch_calls)
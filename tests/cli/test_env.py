@@ -81,3 +81,80 @@ def test_create_env_with_version(
         assert exec_env_logs_rsp['error'] in result.exception.args[0]
         assert exec_env_logs_rsp['log'] in result.exception.args[0]
         assert result.exit_code != 0, result.exception
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize(
+    'abort_options',
+    (['--abort-on-build-error'], ['--abort-pattern', r'failed to s\w+']),
+    ids=('known-errors', 'custom-pattern'),
+)
+def test_create_env_aborts_on_fatal_build_log(api_endpoint_env, abort_options):
+    execution_environments_id = str(ObjectId())
+    version_id = str(ObjectId())
+    exec_env_url = f'{api_endpoint_env}/executionEnvironments/'
+    responses.post(exec_env_url, json={'id': execution_environments_id})
+    versions_url = f'{exec_env_url}{execution_environments_id}/versions/'
+    responses.post(versions_url, json={'id': version_id})
+    # build is never finished on server side
+    version_status = responses.get(
+        f'{versions_url}{version_id}/', json={'buildStatus': 'processing'}
+    )
+    build_log_url = f'{versions_url}{version_id}/buildLog/'
+    responses.get(build_log_url, status=404, json={'message': 'Not found'})
+    responses.get(build_log_url, json={'error': '', 'log': '#1 [internal] load build context\n'})
+    failed_log = '#1 [internal] load build context\n#2 ERROR: failed to solve: base image\n'
+    responses.get(build_log_url, json={'error': '', 'log': failed_log})
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open('dockerfile.tgz', 'wb') as image_file:
+            image_file.write(b'Some data')
+
+        with patch('drapps.create.CHECK_STATUS_WAIT_TIME', 0), patch(
+            'drapps.create.BUILD_LOG_WAIT_TIME', 0
+        ):
+            result = runner.invoke(
+                create_env, ['--name', 'env', '-i', 'dockerfile.tgz', *abort_options]
+            )
+
+    assert result.exit_code == 1
+    assert 'was aborted, build log has fatal error: #2 ERROR: failed to solve' in str(
+        result.exception
+    )
+    # every build log line is printed once
+    assert result.output.count('#1 [internal] load build context') == 1
+    assert version_status.call_count == 3
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_create_env_downloads_build_log_less_often_than_status(api_endpoint_env):
+    """Checks that the whole build log is not downloaded again on every status check."""
+    execution_environments_id = str(ObjectId())
+    version_id = str(ObjectId())
+    exec_env_url = f'{api_endpoint_env}/executionEnvironments/'
+    responses.post(exec_env_url, json={'id': execution_environments_id})
+    versions_url = f'{exec_env_url}{execution_environments_id}/versions/'
+    responses.post(versions_url, json={'id': version_id})
+    version_url = f'{versions_url}{version_id}/'
+    for build_status in ('processing', 'processing', 'processing', 'success'):
+        responses.get(version_url, json={'buildStatus': build_status})
+    build_log = responses.get(
+        f'{versions_url}{version_id}/buildLog/', json={'error': '', 'log': '#1 done\n'}
+    )
+
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open('dockerfile.tgz', 'wb') as image_file:
+            image_file.write(b'Some data')
+
+        with patch('drapps.create.CHECK_STATUS_WAIT_TIME', 0):
+            result = runner.invoke(create_env, ['--name', 'env', '-i', 'dockerfile.tgz'])
+
+    assert result.exit_code == 0, result.output
+    assert [call.request.url for call in responses.calls].count(version_url) == 4
+    # log is downloaded on the first status check and once more when build is finished
+    assert build_log.call_count == 2
+    assert result.output.count('#1 done') == 1
@@ -13,6 +13,8 @@ from bson import ObjectId
 from click.testing import CliRunner
 from responses import matchers
 
+from drapps.helpers.log_cache import LogCache
+from drapps.helpers.log_cursor import LogCursor, LogUpdate
 from drapps.logs import logs
 
 
@@ -103,3 +105,213 @@ def test_logs_with_follow(api_endpoint_env):
         result = runner.invoke(logs, ['-f', app_id])
 
     assert result.output == log_1 + log_2
+
+
+def test_log_cursor_returns_only_new_part():
+    cursor = LogCursor(tail_lines=2)
+
+    assert cursor.update('line 1\nline 2\nline') == LogUpdate('line 1\nline 2\nline', False)
+    # incomplete line is finished
+    assert cursor.update('line 1\nline 2\nline 3\nline 4\n') == LogUpdate(' 3\nline 4\n', False)
+    assert cursor.update('line 1\nline 2\nline 3\nline 4\n') == LogUpdate('', False)
+    # server dropped beginning of the log
+    assert cursor.update('line 3\nline 4\nline 5\n') == LogUpdate('line 5\n', False)
+    # log was restarted
+    assert cursor.update('new 1\n') == LogUpdate('new 1\n', True)
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_logs_follow_adapts_interval(api_endpoint_env):
+    app_id = str(ObjectId())
+    logs_url = f'{api_endpoint_env}/customApplications/{app_id}/logs/'
+
+    # API returns list of log lines
+    responses.get(logs_url, json={'logs': ['First log line.']})
+    responses.get(logs_url, json={'logs': ['First log line.', 'Second log line.']})
+    for _ in range(4):
+        responses.get(logs_url, json={'logs': ['First log line.', 'Second log line.']})
+    responses.get(logs_url, json={'logs': ['Rotated log line.']})
+    responses.get(logs_url, body=KeyboardInterrupt())
+
+    runner = CliRunner(mix_stderr=False)
+    with patch('drapps.logs.SLEEP_TIME', 10), patch('drapps.logs.sleep') as sleep_mock:
+        result = runner.invoke(logs, ['-f', app_id])
+
+    assert result.stdout == 'First log line.\nSecond log line.\nRotated log line.'
+    assert 'log was truncated or rotated' in result.stderr
+    # interval grows while log is idle and is reset when new lines appear
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [2, 2, 4, 8, 10, 10, 2]
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_logs_follow_checks_big_log_less_often(api_endpoint_env):
+    """Whole log is downloaded every time, so interval grows with log size."""
+    app_id = str(ObjectId())
+    logs_url = f'{api_endpoint_env}/customApplications/{app_id}/logs/'
+    responses.get(logs_url, json={'logs': ['First log line.']})
+    responses.get(logs_url, json={'logs': ['First log line.', 'Second log line.']})
+    responses.get(logs_url, body=KeyboardInterrupt())
+
+    runner = CliRunner()
+    with patch('drapps.logs.LOG_BYTES_PER_SECOND', 1), patch('drapps.logs.sleep') as sleep_mock:
+        result = runner.invoke(logs, ['-f', app_id])
+
+    assert result.output == 'First log line.\nSecond log line.'
+    # 15 and 32 bytes of log are downloaded, interval is not longer than for idle application
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [15, 30]
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_logs_follow_several_apps(api_endpoint_env):
+    web_1, web_2, worker = (str(ObjectId()) for _ in range(3))
+    apps = [
+        {'id': web_1, 'name': 'web-1'},
+        {'id': web_2, 'name': 'web-2'},
+        {'id': worker, 'name': 'worker'},
+    ]
+    # glob is resolved with one list request without name filter
+    responses.get(
+        f'{api_endpoint_env}/customApplications/',
+        json={'count': 3, 'data': apps},
+        match=[matchers.query_param_matcher({})],
+    )
+    responses.get(
+        f'{api_endpoint_env}/customApplications/',
+        json={'count': 1, 'data': [apps[2]]},
+        match=[matchers.query_param_matcher({'name': 'worker'})],
+    )
+
+    def logs_url(app_id):
+        return f'{api_endpoint_env}/customApplications/{app_id}/logs/'
+
+    responses.get(logs_url(web_1), json={'logs': ['2024-01-01 10:00:01 web 1 started']})
+    responses.get(
+        logs_url(web_1),
+        json={'logs': ['2024-01-01 10:00:01 web 1 started', '2024-01-01 10:00:05 web 1 request']},
+    )
+    responses.get(logs_url(web_1), body=KeyboardInterrupt())
+    responses.get(logs_url(web_2), json={'logs': ['2024-01-01 10:00:00 web 2 started']})
+    responses.get(logs_url(worker), json={'logs': []})
+    responses.get(
+        logs_url(worker),
+        json={'logs': ['2024-01-01 10:00:03 worker failed', 'Traceback: error']},
+    )
+
+    runner = CliRunner()
+    with patch('drapps.logs.sleep') as sleep_mock:
+        # web-1 is also passed by ID, but its logs are checked only once per round
+        result = runner.invoke(logs, ['-f', '--sort-by-time', 'web-*', 'worker', web_1])
+
+    assert result.output == (
+        'web-2  | 2024-01-01 10:00:00 web 2 started\n'
+        'web-1  | 2024-01-01 10:00:01 web 1 started\n'
+        'worker | 2024-01-01 10:00:03 worker failed\n'
+        'worker | Traceback: error\n'
+        'web-1  | 2024-01-01 10:00:05 web 1 request\n'
+    )
+    # each app is checked once per round, round interval grows with number of apps
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [3, 3]
+    logs_calls = [call for call in responses.calls if call.request.url.endswith('/logs/')]
+    assert len(logs_calls) == 9
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_logs_queries_local_cache(api_endpoint_env):
+    app_id = str(ObjectId())
+    logs_url = f'{api_endpoint_env}/customApplications/{app_id}/logs/'
+    first_logs = [
+        '2024-01-01 10:00:00 INFO started',
+        '2024-01-01 10:01:00 ERROR request failed',
+        'Traceback: error',
+        '2024-01-01 10:02:00 INFO request',
+    ]
+    # server log was rotated between runs, old lines stay in the cache
+    second_logs = ['2024-01-01 10:03:00 ERROR restarted', '2024-01-01 10:04:00 INFO ok']
+    responses.get(logs_url, json={'logs': first_logs})
+    responses.get(logs_url, json={'logs': second_logs})
+
+    runner = CliRunner()
+    result = runner.invoke(logs, ['--tail', '1', app_id])
+    assert result.exit_code == 0, result.output
+    assert result.output == '2024-01-01 10:02:00 INFO request\n'
+    result = runner.invoke(logs, ['--grep', 'ERROR', app_id])
+    assert result.output == (
+        '2024-01-01 10:01:00 ERROR request failed\n2024-01-01 10:03:00 ERROR restarted\n'
+    )
+
+    # cached queries don't send requests
+    responses.get(logs_url, body=ConnectionError('should not be called'))
+    queries = (
+        (['--since', '2024-01-01 10:01:00', '--until', '2024-01-01 10:03:00'], first_logs[1:]),
+        (['--since', '2024-01-01 10:01:30', '--tail', '2'], second_logs),
+        (['--grep', 'request', '--tail', '1'], [first_logs[3]]),
+        (['--until', '2024-01-01'], []),
+    )
+    for options, expected_lines in queries:
+        result = runner.invoke(logs, ['--cached', *options, app_id])
+        assert result.exit_code == 0, result.output
+        assert result.output.splitlines() == expected_lines
+
+
+@responses.activate
+@pytest.mark.parametrize(
+    'options',
+    (['-f', '--tail', '5', str(ObjectId())], ['--grep', 'x', 'app-*'], ['--grep', '(', 'app']),
+)
+@pytest.mark.usefixtures('api_token_env', 'api_endpoint_env')
+def test_logs_query_with_wrong_options(options):
+    result = CliRunner().invoke(logs, options)
+    assert result.exit_code == 2
+
+
+def test_log_cache_drops_lines_of_interrupted_append():
+    app_id = str(ObjectId())
+    log_cache = LogCache.load(app_id)
+    assert log_cache.append('line 1\nline 2') == 2
+    # lines written to the log, but state was not saved
+    with log_cache.log_path.open('ab') as f:
+        f.write(b'partial line')
+
+    log_cache = LogCache.load(app_id)
+    assert log_cache.append('line 1\nline 2\nline 3\n') == 1
+    assert list(LogCache.load(app_id).iter_lines()) == ['line 1', 'line 2', 'line 3']
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_logs_resolve_name_through_metadata_cache(api_endpoint_env):
+    """Checks that app name is listed once, and cached ID of deleted app is resolved again."""
+    app_name = 'app_name'
+    old_app_id = str(ObjectId())
+    new_app_id = str(ObjectId())
+    app_list_url = f'{api_endpoint_env}/customApplications/'
+    app_list = responses.get(app_list_url, json={'data': [{'id': old_app_id, 'name': app_name}]})
+    responses.get(f'{app_list_url}{old_app_id}/logs/', json={'logs': ['old app log']})
+
+    runner = CliRunner()
+    result = runner.invoke(logs, [app_name])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(logs, [app_name])
+    assert result.exit_code == 0, result.output
+    assert result.output == 'old app log\n'
+    assert app_list.call_count == 1
+
+    # application was deleted and created again with the same name
+    responses.replace(
+        responses.GET, app_list_url, json={'data': [{'id': new_app_id, 'name': app_name}]}
+    )
+    responses.replace(
+        responses.GET, f'{app_list_url}{old_app_id}/logs/', status=404, json={'message': 'Gone'}
+    )
+    responses.get(f'{app_list_url}{new_app_id}/logs/', json={'logs': ['new app log']})
+    result = runner.invoke(logs, [app_name])
+    assert result.exit_code == 0, result.output
+    assert result.output == 'new app log\n'
+    list_calls = [
+        call for call in responses.calls if call.request.url.startswith(f'{app_list_url}?')
+    ]
+    assert len(list_calls) == 2
@@ -139,3 +139,41 @@ def test_ls_envs(api_endpoint_env, api_token_env, ids_only):
 
     assert result.exit_code == 0, result.exception
     assert result.output == expected_output
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+@pytest.mark.parametrize('ids_only', (False, True))
+def test_ls_apps_follows_next_pages(api_endpoint_env, ids_only):
+    app_list_url = f'{api_endpoint_env}/customApplications/'
+    apps = [
+        {'id': f'65980d79eea4fd0eddd59bb{index}', 'name': 'App', 'externalAccessRecipients': []}
+        for index in range(5)
+    ]
+    for offset in range(0, len(apps), 2):
+        next_url = f'{app_list_url}?limit=2&offset={offset + 2}' if offset + 2 < len(apps) else None
+        params = {'limit': '2'} if offset == 0 else {'limit': '2', 'offset': str(offset)}
+        responses.get(
+            app_list_url,
+            json={
+                'count': len(apps[offset : offset + 2]),
+                'next': next_url,
+                'data': apps[offset : offset + 2],
+            },
+            match=[matchers.query_param_matcher(params)],
+        )
+
+    cli_args = ['apps', '--page-size', '2']
+    if ids_only:
+        cli_args.append('--id-only')
+    result = CliRunner().invoke(ls, cli_args)
+
+    assert result.exit_code == 0, result.exception
+    if ids_only:
+        assert result.output.splitlines() == [app['id'] for app in apps]
+    else:
+        assert [line.split()[0] for line in result.output.splitlines()[2:]] == [
+            app['id'] for app in apps
+        ]
+    list_calls = [call for call in responses.calls if call.request.url.startswith(app_list_url)]
+    assert len(list_calls) == 3
@@ -8,6 +8,7 @@
 
 
 import logging
+from unittest.mock import patch
 
 import pytest
 import responses
@@ -154,3 +155,22 @@ def test_revert_publish_by_index(api_token_env, api_endpoint_env, use_name_for_s
         logger.info(result.output)
 
     assert result.exit_code == 0, result.output
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_publish_wait_timeout(api_endpoint_env):
+    """Checks that application which doesn't start in time is reported without traceback."""
+    app_id = str(ObjectId())
+    app_url = f'{api_endpoint_env}/customApplications/{app_id}/'
+    responses.patch(app_url, status=204)
+    responses.get(app_url, json={'id': app_id, 'status': 'initializing'})
+
+    runner = CliRunner()
+    with patch('drapps.helpers.custom_apps_functions.APP_RUNNING_TIMEOUT', 0):
+        result = runner.invoke(publish, ['-i', app_id, '--name', 'new name'])
+
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert f'Error: Publishing of application {app_id}' in result.output
+    assert 'Check application status later.' in result.output
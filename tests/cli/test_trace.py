@@ -0,0 +1,58 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+from pathlib import Path
+
+import pytest
+import responses
+from bson import ObjectId
+from click.testing import CliRunner
+from requests import Response
+from urllib3 import HTTPResponse
+
+from drapps.__main__ import drapps
+from drapps.helpers.api_session import get_retry_policy
+from drapps.helpers.http_trace import _get_retries, get_active_trace, get_url_template
+
+
+def test_get_url_template():
+    app_id = str(ObjectId())
+    url = f'https://api.test.com/api/v2/customApplications/{app_id}/logs/?limit=1'
+    assert get_url_template(url) == '/api/v2/customApplications/{id}/logs/'
+
+
+def test_get_retries_from_urllib3_history():
+    retries = get_retry_policy().increment(method='GET', url='/', response=HTTPResponse(status=503))
+    response = Response()
+    response.raw = HTTPResponse(status=200, retries=retries)
+    assert _get_retries(response) == 1
+
+
+@responses.activate
+@pytest.mark.usefixtures('api_token_env')
+def test_trace_records_requests(api_endpoint_env):
+    """Checks that requests are written to trace file and summary is printed."""
+    app_id = str(ObjectId())
+    responses.delete(f'{api_endpoint_env}/customApplications/{app_id}/', status=204)
+
+    runner = CliRunner(mix_stderr=False)
+    with runner.isolated_filesystem():
+        result = runner.invoke(drapps, ['--trace', 'trace.jsonl', 'terminate', app_id])
+        records = [json.loads(line) for line in Path('trace.jsonl').read_text().splitlines()]
+
+    assert result.exit_code == 0, result.output
+    assert get_active_trace() is None
+    assert len(records) == 1
+    assert records[0]['method'] == 'DELETE'
+    assert records[0]['urlTemplate'] == '/api/v2/customApplications/{id}/'
+    assert records[0]['status'] == 204
+    assert records[0]['retries'] == 0
+    assert records[0]['bytesSent'] == 0
+    assert records[0]['latency'] >= 0
+    assert 'DELETE    /api/v2/customApplications/{id}/' in result.stderr
+    assert '1 requests, 0 bytes sent' in result.stderr
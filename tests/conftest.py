@@ -89,3 +89,11 @@ def entrypoint_script_content():
 @pytest.fixture
 def auth_matcher(api_token_env):
     return matchers.header_matcher({'Authorization': f'Bearer {api_token_env}'})
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(monkeypatch, tmp_path):
+    """Every test gets its own drapps cache folder."""
+    cache_path = tmp_path / 'drapps_cache'
+    monkeypatch.setenv('DRAPPS_CACHE_DIR', str(cache_path))
+    return cache_path
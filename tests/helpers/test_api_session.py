@@ -0,0 +1,53 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import pytest
+import responses
+from urllib3 import HTTPResponse
+
+from drapps.helpers.api_session import (
+    CONNECT_TIMEOUT,
+    MAX_RETRY_AFTER,
+    READ_TIMEOUT,
+    create_api_session,
+    get_retry_policy,
+)
+
+
+@responses.activate
+@pytest.mark.parametrize('status', (429, 503))
+def test_api_session_retries_idempotent_requests(api_endpoint, status):
+    url = f'{api_endpoint}/customApplications/'
+    responses.get(url, status=status, headers={'Retry-After': '0'})
+    responses.get(url, json={'data': []})
+
+    session = create_api_session('TOKEN')
+    response = session.get(url)
+
+    assert response.status_code == 200
+    assert len(responses.calls) == 2
+    assert responses.calls[1].request.headers['Authorization'] == 'Bearer TOKEN'
+    assert 'gzip' in responses.calls[1].request.headers['Accept-Encoding']
+    assert responses.calls[1].request.req_kwargs['timeout'] == (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+@responses.activate
+@pytest.mark.parametrize('method', ('POST', 'PATCH'))
+def test_api_session_does_not_retry_uploads(api_endpoint, method):
+    url = f'{api_endpoint}/customApplicationSources/source_id/versions/version_id/'
+    responses.add(method, url, status=503, headers={'Retry-After': '0'})
+
+    session = create_api_session('TOKEN')
+    response = session.request(method, url, data=b'chunk')
+
+    assert response.status_code == 503
+    assert len(responses.calls) == 1
+
+
+def test_api_retry_limits_retry_after():
+    response = HTTPResponse(status=429, headers={'Retry-After': '3600'})
+    assert get_retry_policy().get_retry_after(response) == MAX_RETRY_AFTER
@@ -0,0 +1,84 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from requests_toolbelt import MultipartEncoder
+
+from drapps.helpers.app_projects_functions import (
+    LazyFileReader,
+    get_io_stream,
+    get_project_files_list,
+)
+
+
+def test_lazy_file_reader_streams_file(tmp_path):
+    file_path = tmp_path / 'model.bin'
+    file_path.write_bytes(os.urandom(100_000))
+    read_sizes = []
+
+    reader = LazyFileReader(file_path, on_read=read_sizes.append)
+    with patch(
+        'drapps.helpers.app_projects_functions.get_io_stream', wraps=get_io_stream
+    ) as open_mock:
+        encoder = MultipartEncoder(
+            fields=[('file', ('model.bin', reader, 'application/octet-stream'))]
+        )
+        # building multipart body doesn't open the file
+        open_mock.assert_not_called()
+        body = b''.join(iter(lambda: encoder.read(8192), b''))
+
+    open_mock.assert_called_once_with(file_path)
+    assert file_path.read_bytes() in body
+    assert sum(read_sizes) == 100_000
+    assert max(read_sizes) <= 8192
+    assert reader.len == 0
+
+
+def test_project_scan_skips_ignored_folders(tmp_path):
+    Path(tmp_path, 'start-app.sh').write_text('#!/usr/bin/env bash')
+    Path(tmp_path, 'pkg', 'sub').mkdir(parents=True)
+    Path(tmp_path, 'pkg', 'module.py').write_text('pass')
+    Path(tmp_path, 'pkg', 'sub', 'notes.md').write_text('notes')
+    Path(tmp_path, '.venv', 'lib').mkdir(parents=True)
+    Path(tmp_path, '.venv', 'lib', 'site.py').write_text('pass')
+    Path(tmp_path, 'node_modules').mkdir()
+    Path(tmp_path, 'node_modules', 'index.js').write_text('')
+    Path(tmp_path, '.dr_apps_ignore').write_text('.venv/\nnode_modules\n*.md\n')
+
+    scanned_folders = []
+    original_scandir = os.scandir
+
+    def scandir_spy(path):
+        scanned_folders.append(Path(path).relative_to(tmp_path).as_posix())
+        return original_scandir(path)
+
+    with patch('drapps.helpers.app_projects_functions.os.scandir', side_effect=scandir_spy):
+        project_files = get_project_files_list(tmp_path)
+
+    assert [relative_path for _, relative_path in project_files] == [
+        '.dr_apps_ignore',
+        'start-app.sh',
+        'pkg/module.py',
+    ]
+    assert all(file_path.is_file() for file_path, _ in project_files)
+    assert scanned_folders == ['.', 'pkg', 'pkg/sub']
+
+
+def test_project_scan_with_negated_ignore_patterns(tmp_path):
+    """Files brought back by negated patterns are found in folders matched by other patterns."""
+    Path(tmp_path, 'start-app.sh').write_text('#!/usr/bin/env bash')
+    Path(tmp_path, 'pkg').mkdir()
+    Path(tmp_path, 'pkg', 'a.py').write_text('pass')
+    Path(tmp_path, 'pkg', 'notes.md').write_text('notes')
+    Path(tmp_path, '.dr_apps_ignore').write_text('*\n!*.py\n!start-app.sh\n')
+
+    project_files = get_project_files_list(tmp_path)
+
+    assert [relative_path for _, relative_path in project_files] == ['start-app.sh', 'pkg/a.py']
@@ -0,0 +1,147 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from drapps.helpers.api_session import API_RETRIES
+from drapps.helpers.exceptions import ClientResponseError
+from drapps.helpers.http_trace import start_trace, stop_trace
+
+pytest.importorskip('aiohttp')
+
+from aiohttp import web  # noqa: E402
+from aiohttp.test_utils import TestServer  # noqa: E402
+
+from drapps.helpers import async_client  # noqa: E402
+
+
+def run_with_server(routes, client_code):
+    """Start local API server with routes and run client_code(session, endpoint) against it."""
+
+    async def main():
+        app = web.Application()
+        app.add_routes(routes)
+        async with TestServer(app) as server:
+            endpoint = str(server.make_url('/api/v2'))
+            async with async_client.create_async_session('TOKEN') as session:
+                return await client_code(session, endpoint)
+
+    return asyncio.run(main())
+
+
+def test_async_client_fans_out_requests():
+    app_ids = [str(ObjectId()) for _ in range(20)]
+    seen_tokens = set()
+
+    async def get_app(request):
+        seen_tokens.add(request.headers['Authorization'])
+        return web.json_response({'id': request.match_info['app_id'], 'status': 'running'})
+
+    async def client_code(session, endpoint):
+        return await async_client.gather_limited(
+            (async_client.get_custom_app_by_id(session, endpoint, app_id) for app_id in app_ids),
+            limit=5,
+        )
+
+    routes = [web.get('/api/v2/customApplications/{app_id}/', get_app)]
+    apps = run_with_server(routes, client_code)
+
+    assert [app['id'] for app in apps] == app_ids
+    assert seen_tokens == {'Bearer TOKEN'}
+
+
+def test_async_client_filters_environments_by_name():
+    async def get_envs(request):
+        assert request.query['useCases'] == 'customApplication'
+        assert request.query['searchFor'] == 'Python'
+        envs = [{'id': '1', 'name': 'Python'}, {'id': '2', 'name': 'Python 3.11'}]
+        return web.json_response({'data': envs})
+
+    async def client_code(session, endpoint):
+        return await async_client.get_execution_environments_list(
+            session, endpoint, env_name='Python'
+        )
+
+    routes = [web.get('/api/v2/executionEnvironments/', get_envs)]
+    assert run_with_server(routes, client_code) == [{'id': '1', 'name': 'Python'}]
+
+
+@pytest.mark.parametrize(
+    'response_kwargs, expected_message',
+    (
+        (
+            {'status': 404, 'body': b'{"message": "Not found", "errors": {"id": "bad"}}'},
+            'Not found',
+        ),
+        ({'status': 500, 'body': b'<html>oops</html>'}, 'Internal Server Error'),
+    ),
+    ids=('json-error', 'html-error'),
+)
+def test_async_client_raises_client_response_error(response_kwargs, expected_message):
+    async def get_source(request):
+        return web.Response(content_type='application/json', **response_kwargs)
+
+    async def client_code(session, endpoint):
+        return await async_client.get_custom_app_source_by_id(session, endpoint, 'source_id')
+
+    routes = [web.get('/api/v2/customApplicationSources/{source_id}/', get_source)]
+    with pytest.raises(ClientResponseError) as error_info:
+        run_with_server(routes, client_code)
+
+    assert error_info.value.status == response_kwargs['status']
+    assert error_info.value.message == expected_message
+    assert error_info.value.url.endswith('/customApplicationSources/source_id/')
+
+
+def test_async_client_retries_like_api_session(tmp_path):
+    """Idempotent requests are retried after gateway errors and every request is traced."""
+    app_id = str(ObjectId())
+    statuses = [503, 502, 200]
+    calls = []
+
+    async def get_app(request):
+        calls.append(request.method)
+        status = statuses[len(calls) - 1]
+        return web.json_response({'id': app_id}, status=status, headers={'Retry-After': '0'})
+
+    async def client_code(session, endpoint):
+        return await async_client.get_custom_app_by_id(session, endpoint, app_id)
+
+    routes = [web.get('/api/v2/customApplications/{app_id}/', get_app)]
+    start_trace(tmp_path / 'trace.jsonl')
+    try:
+        assert run_with_server(routes, client_code) == {'id': app_id}
+    finally:
+        trace = stop_trace()
+
+    assert calls == ['GET', 'GET', 'GET']
+    assert [
+        (record['method'], record['status'], record['retries']) for record in trace.records
+    ] == [('GET', 200, 2)]
+    assert trace.records[0]['urlTemplate'] == '/api/v2/customApplications/{id}/'
+
+
+def test_async_client_returns_last_response_after_retries():
+    calls = []
+
+    async def delete_app(request):
+        calls.append(request.method)
+        return web.json_response({'message': 'Busy'}, status=503, headers={'Retry-After': '0'})
+
+    async def client_code(session, endpoint):
+        return await async_client.delete_custom_app(session, endpoint, 'app_id')
+
+    routes = [web.delete('/api/v2/customApplications/{app_id}/', delete_app)]
+    with pytest.raises(ClientResponseError) as error_info:
+        run_with_server(routes, client_code)
+
+    assert error_info.value.status == 503
+    assert error_info.value.message == 'Busy'
+    assert len(calls) == API_RETRIES + 1
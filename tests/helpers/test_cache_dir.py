@@ -0,0 +1,38 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+from unittest.mock import patch
+
+import pytest
+
+from drapps.helpers.cache_dir import write_json_file
+
+
+def test_write_json_file_uses_unique_temp_file(tmp_path):
+    """Temporary file of other run with the same target doesn't break writing."""
+    path = tmp_path / 'state.json'
+    other_tmp_path = path.with_suffix('.tmp')
+    other_tmp_path.write_text('{"written": "by other run"')
+
+    write_json_file(path, {'a': 1})
+
+    assert json.loads(path.read_text()) == {'a': 1}
+    assert other_tmp_path.read_text() == '{"written": "by other run"'
+    assert sorted(file.name for file in tmp_path.iterdir()) == ['state.json', 'state.tmp']
+
+
+def test_write_json_file_removes_temp_file_on_error(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text('{"a": 1}')
+
+    with patch('drapps.helpers.cache_dir.os.replace', side_effect=PermissionError):
+        with pytest.raises(PermissionError):
+            write_json_file(path, {'a': 2})
+
+    assert json.loads(path.read_text()) == {'a': 1}
+    assert [file.name for file in tmp_path.iterdir()] == ['state.json']
@@ -0,0 +1,48 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import json
+
+import pytest
+import responses
+from bson import ObjectId
+from requests import Session
+
+from drapps.helpers.custom_app_sources_functions import update_runtime_params
+
+
+@responses.activate
+@pytest.mark.parametrize('batch_supported', (True, False))
+def test_update_runtime_params(api_endpoint, batch_supported):
+    source_id = str(ObjectId())
+    version_id = str(ObjectId())
+    version_url = f'{api_endpoint}/customApplicationSources/{source_id}/versions/{version_id}/'
+    runtime_params = [
+        json.dumps([{'fieldName': 'FOO', 'value': 'BAR', 'type': 'string'}]),
+        json.dumps([{'fieldName': 'INT_VAL', 'value': 3, 'type': 'numeric'}]),
+    ]
+
+    def patch_callback(request):
+        params = json.loads(json.loads(request.body)['runtimeParameterValues'])
+        if len(params) > 1 and not batch_supported:
+            return 422, {}, json.dumps({'message': 'Only one parameter is allowed'})
+        return 200, {}, ''
+
+    responses.add_callback(responses.PATCH, version_url, callback=patch_callback)
+
+    session = Session()
+    update_runtime_params(session, api_endpoint, source_id, version_id, runtime_params)
+
+    sent_params = [
+        json.loads(json.loads(call.request.body)['runtimeParameterValues'])
+        for call in responses.calls
+    ]
+    batch = [json.loads(param)[0] for param in runtime_params]
+    if batch_supported:
+        assert sent_params == [batch]
+    else:
+        assert sent_params == [batch, [batch[0]], [batch[1]]]
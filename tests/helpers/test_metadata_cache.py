@@ -0,0 +1,80 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from unittest.mock import patch
+
+import responses
+from bson import ObjectId
+from requests import Session
+
+from drapps.create import get_base_env_version
+from drapps.helpers.custom_apps_functions import get_custom_app
+from drapps.helpers.metadata_cache import (
+    APP_ID,
+    ENV_ID,
+    ENV_LATEST_VERSION_ID,
+    get_cached,
+    set_cached,
+)
+
+
+@responses.activate
+def test_get_custom_app_checks_name_of_cached_app(api_endpoint):
+    """Cached ID of application that was renamed is not used for its old name."""
+    session = Session()
+    app_name = 'app_name'
+    renamed_app_id = str(ObjectId())
+    app_id = str(ObjectId())
+    set_cached(session, api_endpoint, APP_ID, app_name, renamed_app_id)
+    app_url = f'{api_endpoint}/customApplications/'
+    responses.get(f'{app_url}{renamed_app_id}/', json={'id': renamed_app_id, 'name': 'new_name'})
+    app_list = responses.get(app_url, json={'data': [{'id': app_id, 'name': app_name}]})
+
+    assert get_custom_app(session, api_endpoint, app_name)['id'] == app_id
+    assert app_list.call_count == 1
+    assert get_cached(session, api_endpoint, APP_ID, app_name) == app_id
+
+
+@responses.activate
+def test_get_base_env_version_checks_cached_version(api_endpoint):
+    """Cached latest version of environment is not used if it was deleted."""
+    session = Session()
+    env_name = 'env_name'
+    env_id = str(ObjectId())
+    deleted_version_id = str(ObjectId())
+    version_id = str(ObjectId())
+    set_cached(session, api_endpoint, ENV_ID, env_name, env_id)
+    set_cached(session, api_endpoint, ENV_LATEST_VERSION_ID, env_name, deleted_version_id)
+    env_url = f'{api_endpoint}/executionEnvironments/{env_id}/'
+    responses.get(f'{env_url}versions/{deleted_version_id}/', status=404, json={})
+    env_data = {'id': env_id, 'name': env_name, 'latestVersion': {'id': version_id}}
+    env_lookup = responses.get(env_url, json=env_data)
+    version_check = responses.get(f'{env_url}versions/{version_id}/', json={'id': version_id})
+
+    assert get_base_env_version(session, api_endpoint, env_name) == version_id
+    assert get_cached(session, api_endpoint, ENV_LATEST_VERSION_ID, env_name) == version_id
+    # existing version is taken from cache
+    assert get_base_env_version(session, api_endpoint, env_name) == version_id
+    assert env_lookup.call_count == 1
+    assert version_check.call_count == 1
+
+
+def test_metadata_cache_expires_and_can_be_disabled(api_endpoint, monkeypatch):
+    session = Session()
+    set_cached(session, api_endpoint, APP_ID, 'app_name', 'app_id')
+    assert get_cached(session, api_endpoint, APP_ID, 'app_name') == 'app_id'
+    # other users see other applications
+    other_session = Session()
+    other_session.headers['Authorization'] = 'Bearer OTHER_TOKEN'
+    assert get_cached(other_session, api_endpoint, APP_ID, 'app_name') is None
+
+    with patch('drapps.helpers.metadata_cache.time.time', return_value=1e9):
+        set_cached(session, api_endpoint, APP_ID, 'expired', 'app_id')
+    assert get_cached(session, api_endpoint, APP_ID, 'expired') is None
+
+    monkeypatch.setenv('DRAPPS_METADATA_CACHE', '0')
+    assert get_cached(session, api_endpoint, APP_ID, 'app_name') is None
@@ -0,0 +1,87 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import threading
+
+import responses
+from requests import Session
+from responses import matchers
+
+from drapps.helpers.custom_app_sources_functions import (
+    get_custom_app_source_by_name,
+    get_custom_app_source_versions_count,
+)
+from drapps.helpers.pagination import iter_paginated
+
+
+@responses.activate
+def test_iter_paginated_prefetches_next_page(api_endpoint):
+    url = f'{api_endpoint}/customApplicationSources/'
+    second_page_requested = threading.Event()
+
+    def second_page(request):
+        second_page_requested.set()
+        return 200, {}, '{"data": [{"id": "3"}], "next": null}'
+
+    responses.get(url, json={'data': [{'id': '1'}, {'id': '2'}], 'next': f'{url}?offset=2'})
+    responses.add_callback(responses.GET, f'{url}?offset=2', callback=second_page)
+
+    items = iter_paginated(Session(), url)
+    assert next(items) == {'id': '1'}
+    # next page is loaded while the first one is consumed
+    assert second_page_requested.wait(timeout=5)
+    assert [item['id'] for item in items] == ['2', '3']
+
+
+@responses.activate
+def test_iter_paginated_without_prefetch_stops_early(api_endpoint):
+    url = f'{api_endpoint}/customApplicationSources/'
+    responses.get(url, json={'data': [{'id': '1'}], 'next': f'{url}?offset=1'})
+
+    items = iter_paginated(Session(), url, prefetch=False)
+    assert next(items) == {'id': '1'}
+    items.close()
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_get_custom_app_source_by_name_stops_at_first_match(api_endpoint):
+    """If server ignores name filter, pages are searched only until the source is found."""
+    url = f'{api_endpoint}/customApplicationSources/'
+    first_page = {'data': [{'id': '1', 'name': 'otherSource'}], 'next': f'{url}?offset=1'}
+    second_page = {'data': [{'id': '2', 'name': 'appSource'}], 'next': f'{url}?offset=2'}
+    responses.get(url, json=first_page, match=[matchers.query_param_matcher({'name': 'appSource'})])
+    responses.get(f'{url}?offset=1', json=second_page)
+
+    source = get_custom_app_source_by_name(Session(), api_endpoint, 'appSource')
+    assert source['id'] == '2'
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_get_custom_app_source_versions_count(api_endpoint):
+    """Versions are counted by pages if API doesn't report total count."""
+    url = f'{api_endpoint}/customApplicationSources/source_id/versions/'
+    responses.get(
+        url,
+        json={'data': [{'id': '1'}], 'next': f'{url}?offset=1&limit=1'},
+        match=[matchers.query_param_matcher({'limit': 1})],
+    )
+    responses.get(
+        url,
+        json={'data': [{'id': str(i)} for i in range(2, 52)], 'next': f'{url}?offset=51'},
+        match=[matchers.query_param_matcher({'offset': 1})],
+    )
+    responses.get(
+        url,
+        json={'data': [{'id': str(i)} for i in range(52, 61)], 'next': None},
+        match=[matchers.query_param_matcher({'offset': 51})],
+    )
+
+    assert get_custom_app_source_versions_count(Session(), api_endpoint, 'source_id') == 60
+    # other versions are counted from the first page by pages of default size
+    assert len(responses.calls) == 3
@@ -0,0 +1,50 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from unittest.mock import patch
+
+import pytest
+
+from drapps.helpers.exceptions import PollingTimeoutError
+from drapps.helpers.poller import poll_until
+
+
+def test_poll_until_backs_off_till_done():
+    statuses = iter(['BUILDING', 'BUILDING', 'BUILDING', 'success'])
+    with patch('drapps.helpers.poller.sleep') as sleep_mock:
+        result = poll_until(
+            check=lambda: next(statuses),
+            is_done=lambda status: status == 'success',
+            timeout=60,
+            max_interval=2,
+            first_interval=1,
+            backoff_factor=2,
+            jitter=0,
+        )
+
+    assert result.value == 'success'
+    assert result.polls == 4
+    assert [call.args[0] for call in sleep_mock.call_args_list] == [1, 2, 2]
+
+
+def test_poll_until_raises_timeout_error():
+    clock = iter(range(0, 100, 10))
+    with patch('drapps.helpers.poller.sleep'), patch(
+        'drapps.helpers.poller.monotonic', side_effect=lambda: next(clock)
+    ):
+        with pytest.raises(PollingTimeoutError) as error_info:
+            poll_until(
+                check=lambda: 'BUILDING',
+                is_done=lambda status: status == 'success',
+                timeout=25,
+                max_interval=5,
+                description='Image build',
+            )
+
+    assert error_info.value.polls == 3
+    assert error_info.value.last_value == 'BUILDING'
+    assert str(error_info.value).startswith('Image build timed out after')
@@ -0,0 +1,72 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from drapps.helpers.app_projects_functions import get_file_digest, get_project_files_list
+from drapps.helpers.project_index import ProjectIndex
+from drapps.helpers.source_manifest_functions import get_project_digests
+
+
+def test_project_index_reuses_digests(tmp_path):
+    project_folder = tmp_path / 'project'
+    project_folder.mkdir()
+    old_mtime_ns = time.time_ns() - 3600 * 10**9
+    for file_name in ('start-app.sh', 'app.py', 'utils.py'):
+        file_path = project_folder / file_name
+        file_path.write_text(f'content of {file_name}')
+        os.utime(file_path, ns=(old_mtime_ns, old_mtime_ns))
+
+    index = ProjectIndex.load(project_folder)
+    first_digests = get_project_digests(get_project_files_list(project_folder), index)
+    index.save()
+
+    # one file is changed, another one removed
+    (project_folder / 'app.py').write_text('new content')
+    (project_folder / 'utils.py').unlink()
+
+    index = ProjectIndex.load(project_folder)
+    with patch(
+        'drapps.helpers.project_index.get_file_digest', wraps=get_file_digest
+    ) as digest_mock:
+        second_digests = get_project_digests(get_project_files_list(project_folder), index)
+    index.save()
+
+    digest_mock.assert_called_once_with(project_folder / 'app.py')
+    assert second_digests == {
+        'start-app.sh': first_digests['start-app.sh'],
+        'app.py': get_file_digest(project_folder / 'app.py'),
+    }
+    assert set(ProjectIndex.load(project_folder).files) == {'start-app.sh'}
+
+
+def test_project_index_cleanup_skips_removed_indexes(tmp_path):
+    """Index removed by parallel run while old indexes are cleaned up doesn't break saving."""
+    projects = [tmp_path / f'project_{number}' for number in range(3)]
+    for project_folder in projects:
+        project_folder.mkdir()
+        ProjectIndex.load(project_folder).save()
+
+    index = ProjectIndex.load(projects[0])
+    removed_index = ProjectIndex.load(projects[1]).index_path
+    original_glob = Path.glob
+
+    def glob_and_remove(path, pattern):
+        found = list(original_glob(path, pattern))
+        removed_index.unlink()
+        return found
+
+    with patch('drapps.helpers.project_index.MAX_INDEXED_PROJECTS', 1), patch.object(
+        Path, 'glob', glob_and_remove
+    ):
+        index.save()
+
+    assert index.index_path.exists()
+    assert not ProjectIndex.load(projects[2]).index_path.exists()
@@ -0,0 +1,39 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from drapps.helpers.source_manifest_functions import (
+    SourceManifest,
+    load_source_manifest,
+    save_source_manifest,
+)
+
+
+def test_save_source_manifest():
+    source_id = str(ObjectId())
+    manifest = SourceManifest(str(ObjectId()), {'app.py': 'digest'})
+
+    save_source_manifest(source_id, manifest)
+
+    assert load_source_manifest(source_id) == manifest
+
+
+def test_save_source_manifest_warns_on_write_error(capsys):
+    """Failed cache write doesn't fail deploy of version that is already uploaded."""
+    source_id = str(ObjectId())
+    manifest = SourceManifest(str(ObjectId()), {'app.py': 'digest'})
+
+    with patch(
+        'drapps.helpers.source_manifest_functions.write_json_file', side_effect=OSError('No space')
+    ):
+        save_source_manifest(source_id, manifest)
+
+    assert 'cannot save manifest of uploaded files: No space' in capsys.readouterr().err
+    assert load_source_manifest(source_id) is None
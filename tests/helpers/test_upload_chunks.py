@@ -0,0 +1,35 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from drapps.create import plan_upload_chunks
+
+
+def test_plan_upload_chunks(tmp_path):
+    file_sizes = {
+        'a.py': 40,
+        'b.py': 40,
+        'model.bin': 500,
+        'c.py': 30,
+        'd.py': 10,
+        'e.py': 10,
+        'f.py': 10,
+    }
+    project_files = []
+    for file_name, file_size in file_sizes.items():
+        file_path = tmp_path / file_name
+        file_path.write_bytes(b'0' * file_size)
+        project_files.append((file_path, file_name))
+
+    chunks = plan_upload_chunks(project_files, max_chunk_bytes=100, max_chunk_files=3)
+
+    chunk_names = [[relative_path for _, relative_path in chunk] for chunk in chunks]
+    assert chunk_names == [
+        ['model.bin'],  # big files go alone
+        ['a.py', 'b.py'],  # c.py doesn't fit by size
+        ['c.py', 'd.py', 'e.py'],  # limited by number of files
+        ['f.py'],
+    ]
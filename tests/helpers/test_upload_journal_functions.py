@@ -0,0 +1,40 @@
+#
+#  Copyright 2024 DataRobot, Inc. and its affiliates.
+#
+#  All rights reserved.
+#  This is proprietary source code of DataRobot, Inc. and its affiliates.
+#  Released under the terms of DataRobot Tool and Utility Agreement.
+#
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from drapps.helpers.upload_journal_functions import (
+    UploadJournal,
+    load_upload_journal,
+    remove_upload_journal,
+    save_upload_journal,
+)
+
+
+def test_save_upload_journal(tmp_path):
+    journal = UploadJournal(str(ObjectId()), str(ObjectId()), str(tmp_path), {'app.py': 'digest'})
+
+    save_upload_journal(journal)
+    assert load_upload_journal(journal.source_id) == journal
+
+    remove_upload_journal(journal.source_id)
+    assert load_upload_journal(journal.source_id) is None
+
+
+def test_save_upload_journal_warns_on_write_error(tmp_path, capsys):
+    """Failed cache write doesn't stop upload, it just can't be resumed."""
+    journal = UploadJournal(str(ObjectId()), str(ObjectId()), str(tmp_path), {'app.py': 'digest'})
+
+    with patch(
+        'drapps.helpers.upload_journal_functions.write_json_file', side_effect=OSError('No space')
+    ):
+        save_upload_journal(journal)
+
+    assert 'cannot save upload journal: No space' in capsys.readouterr().err
+    assert load_upload_journal(journal.source_id) is None